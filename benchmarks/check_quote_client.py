@@ -0,0 +1,172 @@
+"""
+Checks methods.quote_client against the local stub server (benchmarks/quote_stub_server.py): payloads recorded from
+synthetic snapshots (benchmarks/synthetic.py) must give the same Stock rows, be stored in the fundamentals cache, and
+symbols without a quote, without a payload or in a failed quote batch must be reported as failed and not cached.
+
+    python benchmarks/check_quote_client.py [--tickers 20] [--rate-limited 0.2]
+"""
+import argparse
+import atexit
+import datetime
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+# set before the methods modules read them at import
+CACHE_DIR = tempfile.mkdtemp(prefix="stock_predictor_quote_check_")
+atexit.register(shutil.rmtree, CACHE_DIR, ignore_errors=True)
+os.environ["STOCK_PREDICTOR_CACHE_DIR"] = CACHE_DIR
+
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, "..", "src"))
+sys.path.insert(0, current_dir)
+
+from methods.fundamentals_cache import FundamentalsCache
+from methods.quote_client import fetch_snapshots
+from methods.screener_methods import Stock
+from methods.snapshot import StockSnapshot
+from quote_stub_server import make_handler, serve
+from synthetic import make_universe
+
+# info keys answered by the v7 quote endpoint, the rest comes from the quoteSummary modules
+QUOTE_FIELDS = [
+    "symbol", "shortName", "longName", "currency", "exchange", "quoteType", "regularMarketPreviousClose",
+    "epsTrailingTwelveMonths", "fiftyDayAverage", "fiftyDayAverageChangePercent", "twoHundredDayAverage",
+    "twoHundredDayAverageChangePercent", "fiftyTwoWeekLow", "fiftyTwoWeekHigh", "marketCap", "sharesOutstanding",
+]
+PROFILE_FIELDS = [
+    "address1", "city", "zip", "country", "website", "industry", "sector", "longBusinessSummary", "fullTimeEmployees",
+    "companyOfficers",
+]
+INSIDER_KEYS = [
+    "buyInfoShares", "sellInfoShares", "netInfoShares", "totalInsiderShares", "netPercentInsiderShares",
+    "buyPercentInsiderShares", "sellPercentInsiderShares",
+]
+INSIDER_COUNTS = ["buyInfoCount", "sellInfoCount", "netInfoCount"]
+
+def _timestamp(date: datetime.date) -> int:
+    # noon local time, read back with datetime.fromtimestamp as the same date
+    return int(datetime.datetime.combine(date, datetime.time(12)).timestamp())
+
+def _value(value):
+    return None if pd.isna(value) else value.item() if hasattr(value, "item") else value
+
+def record(snapshot: StockSnapshot, directory: str, with_quote: bool = True) -> None:
+    """Write snapshot as the <symbol>.json the stub serves, shaped like QuoteSummaryClient(record_dir=...) does."""
+    info = snapshot.info
+    insider = snapshot.insider
+    activity = {"period": insider.columns[0].removeprefix("Insider Purchases Last ")}
+    activity.update({key: _value(value) for key, value in zip(INSIDER_KEYS, insider["Shares"])})
+    activity.update({key: _value(value) for key, value in zip(INSIDER_COUNTS, insider["Trans"])})
+    summary = {
+        "assetProfile": {key: info[key] for key in PROFILE_FIELDS if key in info},
+        "summaryDetail": {key: value for key, value in info.items() if key not in PROFILE_FIELDS and key not in QUOTE_FIELDS},
+        "netSharePurchaseActivity": activity,
+    }
+    calendar = snapshot.calendar or {}
+    if calendar:
+        summary["calendarEvents"] = {
+            "dividendDate": _timestamp(calendar["Dividend Date"]),
+            "earnings": {
+                "earningsDate": [_timestamp(date) for date in calendar["Earnings Date"]],
+                "earningsHigh": calendar["Earnings High"], "earningsLow": calendar["Earnings Low"],
+                "earningsAverage": calendar["Earnings Average"],
+            },
+        }
+    quote = {key: info[key] for key in QUOTE_FIELDS if key in info} if with_quote else None
+    with open(os.path.join(directory, f"{snapshot.symbol}.json"), "w", encoding="utf-8") as f:
+        json.dump({"quoteSummary": summary, "quote": quote}, f)
+
+def serve_failing_quotes(directory: str) -> ThreadingHTTPServer:
+    """The stub with every v7 quote request answered by 503."""
+    class Handler(make_handler(directory)):
+        def do_GET(self):
+            if self.path.startswith("/v7/finance/quote"):
+                return self._send(503, "Service Unavailable", "text/plain")
+            return super().do_GET()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run(server: ThreadingHTTPServer, symbols: list[str], name: str, **client_args) -> tuple[dict, FundamentalsCache, float]:
+    cache = FundamentalsCache(os.path.join(CACHE_DIR, f"{name}.sqlite"))
+    start = time.perf_counter()
+    results = fetch_snapshots(symbols, cache=cache, base_url=f"http://127.0.0.1:{server.server_address[1]}", cookie_url=None, **client_args)
+    return results, cache, time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=20)
+    parser.add_argument("--rate-limited", type=float, default=0.2, help="share of requests answered with 429 in the retry case")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    universe = make_universe(args.tickers, seed=args.seed)
+    expected = {snapshot.symbol: snapshot for snapshot in universe.snapshots}
+    directory = tempfile.mkdtemp(dir=CACHE_DIR)
+    for snapshot in universe.snapshots[1:]:
+        record(snapshot, directory)
+    # recorded without a v7 quote, and one symbol that was never recorded
+    no_quote = universe.snapshots[0].symbol
+    record(universe.snapshots[0], directory, with_quote=False)
+    symbols = universe.symbols + ["MISSING"]
+    complete = universe.symbols[1:]
+
+    failures = []
+    def check(case: str, results: dict, cache: FundamentalsCache, ok: list[str], seconds: float) -> None:
+        problems = []
+        for symbol in symbols:
+            result = results.get(symbol)
+            if symbol not in ok:
+                if not isinstance(result, Exception):
+                    problems.append(f"{symbol} not reported as failed")
+                if cache.get(symbol):
+                    problems.append(f"{symbol} cached")
+                continue
+            if not isinstance(result, StockSnapshot):
+                problems.append(f"{symbol}: {result}")
+                continue
+            try:
+                # read back from the cache like Stock(symbol) does
+                cached = StockSnapshot.fetch(symbol, cache=cache)
+                for snapshot in (result, cached):
+                    pd.testing.assert_frame_equal(Stock(symbol, snapshot=snapshot).summary(), Stock(symbol, snapshot=expected[symbol]).summary())
+            except Exception as e:
+                problems.append(f"{symbol}: {type(e).__name__} {e}")
+        n_failed = sum(isinstance(result, Exception) for result in results.values())
+        print(f"{case:<14} {len(results) - n_failed} fetched, {n_failed} failed in {seconds:.2f}s{'  ' + problems[0] if problems else ''}")
+        failures.extend(f"{case}: {problem}" for problem in problems)
+
+    server = serve(directory)
+    results, cache, seconds = run(server, symbols, "stub")
+    check("stub", results, cache, complete, seconds)
+    server.shutdown()
+
+    # the crumb and every endpoint answer 429 now and then, the client retries them
+    server = serve(directory, rate_limited=args.rate_limited)
+    results, cache, seconds = run(server, symbols, "rate_limited", max_retries=10)
+    check("rate limited", results, cache, complete, seconds)
+    server.shutdown()
+
+    # a failed quote batch fails its symbols instead of caching snapshots without prices
+    server = serve_failing_quotes(directory)
+    results, cache, seconds = run(server, symbols, "failed_quotes", max_retries=0)
+    check("failed quotes", results, cache, [], seconds)
+    server.shutdown()
+
+    print(f"{3 - len({failure.split(':')[0] for failure in failures})}/3 cases passed, {no_quote} had no quote")
+    for failure in failures:
+        print(f"FAILED {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
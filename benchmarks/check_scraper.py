@@ -0,0 +1,97 @@
+"""
+Checks scraper.Ticker.key_financial_ratios against the local fixture server: server rendered pages are parsed from
+plain http, pages without a table or without the quarterly columns go to the browser. The browser is a stand-in
+that returns the fixtures' browser*.html pages, so no Chrome is needed.
+
+    python benchmarks/check_scraper.py
+"""
+import os
+import sys
+import time
+
+# read by the scraper at import
+os.environ["STOCK_PREDICTOR_NO_CACHE"] = "1"
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, "..", "src"))
+sys.path.insert(0, current_dir)
+
+from stockanalysis_fixture_server import FIXTURES_DIR, page_path, serve
+
+class FixtureBrowser:
+    """Answers like PatchedSeleniumInterface with the rendered pages of the fixtures."""
+    def __init__(self, directory: str = FIXTURES_DIR):
+        self.directory = directory
+        self.urls = []
+
+    def _page(self, url: str) -> str:
+        self.urls.append(url)
+        path = page_path(self.directory, url, browser=True)
+        if path is None:
+            return ""
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def get_html_content(self, url: str) -> str:
+        return self._page(url)
+
+    def get_html_content_with_quarterly_toggle(self, url: str) -> str:
+        return self._page(url)
+
+# ticker, frequency, use_browser, expected source
+CASES = [
+    ("AAPL", "annual", False, "http"),
+    ("AAPL", "quarterly", False, "http"),
+    ("NOVO-B.CO", "quarterly", False, "http"),
+    ("TOGL", "annual", False, "http"),
+    ("TOGL", "quarterly", False, "browser"),
+    ("JSAPP", "annual", False, "browser"),
+    ("JSAPP", "quarterly", False, "browser"),
+    ("AAPL", "quarterly", True, "browser"),
+]
+
+def main(argv=None):
+    server = serve()
+    os.environ["STOCKANALYSIS_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    from methods.scraper import Ticker, is_quarterly
+
+    failures = []
+    for symbol, frequency, use_browser, expected in CASES:
+        ticker = Ticker(symbol)
+        ticker.selenium_interface = browser = FixtureBrowser()
+        start = time.perf_counter()
+        try:
+            data = ticker.key_financial_ratios(frequency=frequency, use_browser=use_browser)
+        except Exception as e:
+            failures.append(f"{symbol} {frequency}: {e}")
+            continue
+        seconds = time.perf_counter() - start
+        problems = []
+        if ticker.source != expected:
+            problems.append(f"source {ticker.source}, expected {expected}")
+        if is_quarterly(data) != (frequency == "quarterly"):
+            problems.append("wrong periods")
+        if "PE Ratio" not in data.columns or data.empty:
+            problems.append("no ratio table")
+        if (expected == "browser") != bool(browser.urls):
+            problems.append(f"browser used for {browser.urls}")
+        print(f"{symbol:<10} {frequency:<9} {ticker.source:<8} {data.shape} {seconds*1000:.1f} ms{'  ' + ', '.join(problems) if problems else ''}")
+        failures += [f"{symbol} {frequency}: {problem}" for problem in problems]
+
+    # a missing page is neither served nor rendered
+    ticker = Ticker("MISSING")
+    ticker.selenium_interface = FixtureBrowser()
+    try:
+        ticker.key_financial_ratios(frequency="annual")
+        failures.append("MISSING annual: no error")
+    except Exception:
+        pass
+
+    server.shutdown()
+    print(f"{len(CASES) + 1 - len(failures)}/{len(CASES) + 1} checks passed")
+    for failure in failures:
+        print(f"FAILED {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
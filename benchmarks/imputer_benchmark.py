@@ -0,0 +1,107 @@
+"""
+Checks that model_methods.imputer gives the same frames as the row by row version it replaced and times both.
+The inputs are the cached quarterly datasets turned back into scraped looking tables: ratios as strings,
+percentages with "%", random "-" cells and gaps at the edges.
+
+    python benchmarks/imputer_benchmark.py [--seeds 5] [--share 0.3]
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, "..", "src"))
+sys.path.insert(0, current_dir)
+
+from legacy_imputer import legacy_imputer
+from methods.model_methods import imputer
+
+DATA_PATH = os.path.join(current_dir, "..", "data", "model_results", "quarterly_data_cache.pkl")
+PERCENT_WORDS = ("Growth", "Yield", "Return", "Dilution")
+
+def load_frames(path: str = DATA_PATH) -> list[pd.DataFrame]:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+def raw_like(frame: pd.DataFrame, rng: np.random.Generator, missing: float = 0.08) -> pd.DataFrame:
+    """An imputer input as get_data builds it, derived from an already imputed frame."""
+    df = frame.copy()
+    ratio_columns = [column for column in df.columns if column not in ("Ticker", "Close Price", "Future Change%")]
+    for column in ratio_columns:
+        values = pd.to_numeric(df[column], errors="coerce").to_numpy()
+        suffix = "%" if any(word in column for word in PERCENT_WORDS) else ""
+        text = np.array([f"{value:.2f}{suffix}" for value in values], dtype=object)
+        text[rng.random(len(text)) < missing] = "-"
+        if rng.random() < 0.2:
+            # gaps that touch the first or last rows
+            n = int(rng.integers(1, 4))
+            if rng.random() < 0.5:
+                text[:n] = "-"
+            else:
+                text[-n:] = ""
+        # object like the transposed read_html table, not the str dtype pandas would infer
+        df[column] = pd.Series(text, index=df.index, dtype=object)
+    if rng.random() < 0.3:
+        df.iloc[int(rng.integers(0, len(df))), df.columns.get_loc("Close Price")] = np.nan
+    if rng.random() < 0.3:
+        # a row that is mostly missing and gets dropped
+        row = int(rng.integers(0, len(df)))
+        df.iloc[row, 3:] = "-"
+    return df
+
+def _run(function, df: pd.DataFrame, share: float):
+    start = time.perf_counter()
+    try:
+        result = function(df.copy(), share)
+    except (ValueError, ZeroDivisionError):
+        result = None
+    return result, time.perf_counter() - start
+
+def same(legacy: pd.DataFrame | None, new: pd.DataFrame | None) -> bool:
+    if legacy is None or new is None:
+        return legacy is None and new is None
+    if not legacy.index.equals(new.index) or list(legacy.columns) != list(new.columns):
+        return False
+    if (legacy["Ticker"] != new["Ticker"]).any() or not legacy.dtypes.equals(new.dtypes):
+        return False
+    a = legacy.drop(columns="Ticker").to_numpy(dtype=float)
+    b = new.drop(columns="Ticker").to_numpy(dtype=float)
+    return bool(np.array_equal(a, b, equal_nan=True))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seeds", type=int, default=5, help="degraded copies per cached frame")
+    parser.add_argument("--share", type=float, default=0.3, help="max_nans_share passed to the imputer")
+    args = parser.parse_args(argv)
+
+    frames = load_frames()
+    legacy_seconds = new_seconds = 0.0
+    checked = mismatches = skipped = 0
+    for seed in range(args.seeds):
+        rng = np.random.default_rng(seed)
+        for frame in frames:
+            df = raw_like(frame, rng)
+            new, seconds = _run(imputer, df, args.share)
+            new_seconds += seconds
+            if new is not None and new.drop(columns=["Ticker", "Future Change%"], errors="ignore").isna().any().any():
+                # a kept column without any valid value, the old neighbour search never terminates on those
+                skipped += 1
+                continue
+            legacy, seconds = _run(legacy_imputer, df, args.share)
+            legacy_seconds += seconds
+            checked += 1
+            if not same(legacy, new):
+                mismatches += 1
+                print(f"Mismatch for {frame['Ticker'].iloc[0]} with seed {seed}")
+
+    print(f"{checked} frames compared, {mismatches} mismatches, {skipped} skipped")
+    print(f"legacy {legacy_seconds:.2f}s, vectorized {new_seconds:.3f}s, {legacy_seconds/max(new_seconds, 1e-9):.0f}x faster")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
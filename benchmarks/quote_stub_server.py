@@ -0,0 +1,92 @@
+"""
+Local stand-in for the Yahoo quote endpoints, serving payloads recorded with QuoteSummaryClient(record_dir=...).
+Every <symbol>.json in the directory holds {"quoteSummary": <result>, "quote": <v7 quote or null>}.
+
+    python benchmarks/quote_stub_server.py recorded/ [--port 8765] [--latency 0.2] [--rate-limited 0.05]
+
+then point the client at it: QuoteSummaryClient(base_url="http://127.0.0.1:8765", cookie_url=None)
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+CRUMB = "stub-crumb"
+
+def make_handler(directory: str, latency: float = 0.0, rate_limited: float = 0.0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body, content_type: str = "application/json") -> None:
+            data = (body if isinstance(body, str) else json.dumps(body)).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _load(self, symbol: str) -> dict | None:
+            path = os.path.join(directory, f"{symbol}.json")
+            if not os.path.exists(path):
+                return None
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if latency:
+                time.sleep(latency)
+            if rate_limited and random.random() < rate_limited:
+                return self._send(429, "Too Many Requests", "text/plain")
+            if url.path == "/v1/test/getcrumb":
+                return self._send(200, CRUMB, "text/plain")
+            if query.get("crumb") != [CRUMB]:
+                return self._send(401, {"finance": {"error": {"code": "Unauthorized", "description": "Invalid Crumb"}}})
+            if url.path.startswith("/v10/finance/quoteSummary/"):
+                symbol = unquote(url.path.rsplit("/", 1)[1])
+                recorded = self._load(symbol)
+                if recorded is None:
+                    error = {"code": "Not Found", "description": f"Quote not found for symbol: {symbol}"}
+                    return self._send(404, {"quoteSummary": {"result": None, "error": error}})
+                return self._send(200, {"quoteSummary": {"result": [recorded["quoteSummary"]], "error": None}})
+            if url.path == "/v7/finance/quote":
+                symbols = query.get("symbols", [""])[0].split(",")
+                quotes = [recorded["quote"] for recorded in map(self._load, symbols) if recorded and recorded.get("quote")]
+                return self._send(200, {"quoteResponse": {"result": quotes, "error": None}})
+            return self._send(404, {"error": "unknown path"})
+
+    return Handler
+
+def serve(directory: str, port: int = 0, latency: float = 0.0, rate_limited: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stub on a daemon thread, port 0 picks a free one. Stop it with server.shutdown()."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(directory, latency, rate_limited))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", help="directory of recorded <symbol>.json payloads")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--rate-limited", type=float, default=0.0, help="share of requests answered with 429")
+    args = parser.parse_args(argv)
+
+    server = serve(args.directory, args.port, args.latency, args.rate_limited)
+    print(f"Serving {args.directory} on http://127.0.0.1:{server.server_address[1]}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Times the screener and dataset stages on synthetic universes (benchmarks/synthetic.py) and compares them to the
+saved baseline. Runs offline on CPU only, the caches are pointed at a temporary directory.
+Every case is timed as the median of --repeat runs, the baseline holds medians too.
+Exits with 1 when a case is slower than its baseline times the threshold plus MIN_SLACK seconds.
+
+    python benchmarks/run_benchmarks.py [--sizes 100 2000 6223] [--cases imputer ...] [--repeat 5] [--threshold 2.0]
+    python benchmarks/run_benchmarks.py --save-baseline
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# set before the methods modules read them at import
+CACHE_DIR = tempfile.mkdtemp(prefix="stock_predictor_benchmarks_")
+atexit.register(shutil.rmtree, CACHE_DIR, ignore_errors=True)
+os.environ["STOCK_PREDICTOR_CACHE_DIR"] = CACHE_DIR
+os.environ["STOCK_PREDICTOR_NO_CACHE"] = "1"
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, "..", "src"))
+sys.path.insert(0, os.path.join(current_dir, ".."))
+sys.path.insert(0, current_dir)
+
+from methods.model_methods import add_targets, imputer
+from methods.price_store import PriceStore
+from methods.scoring import raw_frame, score_frame
+from methods.scraper import Ticker
+from methods.screener_methods import Stock
+from run_batch_screener import detect_changes
+from synthetic import SIZES, make_universe, previous_summary
+
+BASELINE_PATH = os.path.join(current_dir, "baseline.json")
+# a case regresses when it takes longer than baseline*threshold + MIN_SLACK, single runs on the one CPU machine
+# the baseline was recorded on still came out up to 1.6x slower without any code change
+THRESHOLD = 2.0
+MIN_SLACK = 0.02
+# cases bound by the file system vary more between runs
+THRESHOLDS = {"price_history": 2.5}
+REPEAT = 5
+# the full universe takes a few minutes per case, pass --sizes 6223 to time it
+DEFAULT_SIZES = [100, 2000]
+WARM_UP_SIZE = 20
+
+def _stocks(universe) -> list[Stock]:
+    return [Stock(snapshot.symbol, snapshot=snapshot) for snapshot in universe.snapshots]
+
+def _summary(universe) -> pd.DataFrame:
+    summary = getattr(universe, "summary", None)
+    if summary is None:
+        summary = universe.summary = score_frame(raw_frame(_stocks(universe)))
+    return summary
+
+def _tables(universe) -> list[pd.DataFrame]:
+    tables = getattr(universe, "tables", None)
+    if tables is None:
+        tables = universe.tables = [Ticker(symbol)._parse_ratios(page, symbol) for symbol, page in zip(universe.symbols, universe.pages)]
+    return tables
+
+# every case's setup builds its inputs outside the timed call and returns that call
+def stock_summary(universe):
+    snapshots = universe.snapshots
+    return lambda: [Stock(snapshot.symbol, snapshot=snapshot).summary() for snapshot in snapshots]
+
+def score_frame_case(universe):
+    stocks = _stocks(universe)
+    return lambda: score_frame(raw_frame(stocks))
+
+def detect_changes_case(universe):
+    current = _summary(universe)
+    previous = previous_summary(current, np.random.default_rng(len(universe)))
+    return lambda: detect_changes(current, previous)
+
+def parse_tables(universe):
+    tickers = [Ticker(symbol) for symbol in universe.symbols]
+    return lambda: [ticker._parse_ratios(page, ticker.ticker) for ticker, page in zip(tickers, universe.pages)]
+
+def imputer_case(universe):
+    frames = [add_targets(table.copy(), symbol) for symbol, table in zip(universe.symbols, _tables(universe))]
+    return lambda: [imputer(df, max_nans_share=0.3) for df in frames]
+
+def get_data_post(universe):
+    # add_targets inserts into its input, every run gets its own copies
+    tables = [table.copy() for table in _tables(universe)]
+    return lambda: [imputer(add_targets(table, symbol), max_nans_share=0.3) for symbol, table in zip(universe.symbols, tables)]
+
+def price_history(universe):
+    store = getattr(universe, "store", None)
+    if store is None:
+        store = universe.store = PriceStore(os.path.join(CACHE_DIR, f"prices_{len(universe)}"))
+        universe.write_prices(store)
+    return lambda: [store.history(symbol, "1y", refresh=False) for symbol in universe.symbols]
+
+CASES = {
+    "stock_summary": stock_summary,
+    "score_frame": score_frame_case,
+    "detect_changes": detect_changes_case,
+    "parse_tables": parse_tables,
+    "imputer": imputer_case,
+    "get_data_post": get_data_post,
+    "price_history": price_history,
+}
+
+def warm_up(cases: list[str], seed: int) -> None:
+    """Run every case once on a small universe, loading lazily imported modules and filling the first name index."""
+    universe = make_universe(WARM_UP_SIZE, seed=seed)
+    for case in cases:
+        CASES[case](universe)()
+
+def time_case(setup, universe, repeat: int = REPEAT) -> float:
+    """Median of repeat runs, a single slow or fast run does not move it."""
+    seconds = []
+    for _ in range(repeat):
+        run = setup(universe)
+        start = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds)
+
+def machine() -> dict:
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {"machine": None, "results": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_baseline(results: dict, path: str = BASELINE_PATH) -> None:
+    """Merge results into the baseline, sizes and cases that were not run keep their saved times."""
+    baseline = load_baseline(path)
+    baseline["machine"] = machine()
+    for size, times in results.items():
+        baseline["results"].setdefault(size, {}).update(times)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def compare(results: dict, baseline: dict, threshold: float | None = None) -> list[str]:
+    """Names of the cases slower than their allowed time, printing one line per case."""
+    regressions = []
+    print(f"{'size':>6} {'case':<16} {'seconds':>9} {'baseline':>9} {'ratio':>6}")
+    for size, times in results.items():
+        for case, seconds in times.items():
+            saved = baseline["results"].get(size, {}).get(case)
+            if saved is None:
+                print(f"{size:>6} {case:<16} {seconds:9.4f} {'-':>9} {'-':>6}")
+                continue
+            allowed = saved*(threshold or THRESHOLDS.get(case, THRESHOLD)) + MIN_SLACK
+            slower = seconds > allowed
+            print(f"{size:>6} {case:<16} {seconds:9.4f} {saved:9.4f} {seconds/saved:6.2f}{'  REGRESSION' if slower else ''}")
+            if slower:
+                regressions.append(f"{case}@{size}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help=f"tickers per universe, e.g. {' '.join(map(str, SIZES))}")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per case, the median counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threshold", type=float, default=None, help=f"allowed slowdown factor, default {THRESHOLD}")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store these times as the new baseline")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    if baseline["machine"] is not None and baseline["machine"] != machine():
+        print(f"Baseline was recorded on {baseline['machine']}, expect the comparison to be off", file=sys.stderr)
+
+    warm_up(args.cases, args.seed)
+    results = {}
+    for size in args.sizes:
+        start = time.perf_counter()
+        universe = make_universe(size, seed=args.seed)
+        print(f"Generated {size} tickers in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        results[str(size)] = {case: time_case(CASES[case], universe, args.repeat) for case in args.cases}
+
+    regressions = compare(results, baseline, args.threshold)
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"Slower than the baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
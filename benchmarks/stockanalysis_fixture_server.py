@@ -0,0 +1,86 @@
+"""
+Local stand-in for the stockanalysis ratio pages the scraper fetches, serving the pages under fixtures/stockanalysis.
+A page lives where its path points: <path>/index.html, and <path>/quarterly.html for ?p=quarterly. Without a
+quarterly.html the annual page is served for ?p=quarterly, like a page that only switches with the toggle click.
+browser*.html files are what the rendered page looks like in Chrome, they are not served.
+
+    python benchmarks/stockanalysis_fixture_server.py [directory] [--port 8766] [--latency 0.2]
+
+then point the scraper at it: STOCKANALYSIS_BASE_URL=http://127.0.0.1:8766
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(current_dir, "fixtures", "stockanalysis")
+
+def page_path(directory: str, url: str, browser: bool = False) -> str | None:
+    """File serving url, or with browser the file the rendered page in Chrome is read from. None when there is none."""
+    parsed = urlparse(url)
+    folder = os.path.normpath(os.path.join(directory, unquote(parsed.path).strip("/")))
+    if not folder.startswith(os.path.normpath(directory)):
+        return None
+    quarterly = parse_qs(parsed.query).get("p") == ["quarterly"]
+    names = ["quarterly.html", "index.html"] if quarterly else ["index.html"]
+    if browser:
+        names = ["browser_quarterly.html", "browser.html"] + names if quarterly else ["browser.html"] + names
+    for name in names:
+        path = os.path.join(folder, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+def make_handler(directory: str, latency: float = 0.0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: str) -> None:
+            data = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            path = page_path(directory, self.path)
+            if path is None:
+                return self._send(404, "<html><body><h1>Page not found</h1></body></html>")
+            with open(path, encoding="utf-8") as f:
+                return self._send(200, f.read())
+
+    return Handler
+
+def serve(directory: str = FIXTURES_DIR, port: int = 0, latency: float = 0.0) -> ThreadingHTTPServer:
+    """Start the server on a daemon thread, port 0 picks a free one. Stop it with server.shutdown()."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(directory, latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", default=FIXTURES_DIR, help="directory of fixture pages")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args(argv)
+
+    server = serve(args.directory, args.port, args.latency)
+    print(f"Serving {args.directory} on http://127.0.0.1:{server.server_address[1]}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
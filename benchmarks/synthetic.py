@@ -0,0 +1,286 @@
+"""
+Synthetic universes for the benchmarks: tickers from data/tickers/tickers.csv with generated Yahoo payloads
+(info dicts with officer lists, insider tables, calendars), stockanalysis quarterly ratio pages and daily closes.
+Everything is derived from one seed, and the ratio tables, prices and momentum fields of a ticker agree with each other.
+
+    universe = make_universe(2000, seed=0)
+"""
+import datetime
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, "..", "src"))
+
+from methods.quote_client import parse_insider
+from methods.snapshot import StockSnapshot
+
+TICKERS_PATH = os.path.join(current_dir, "..", "data", "tickers", "tickers.csv")
+# the default ticker list, the whole European selection and every ticker in tickers.csv
+SIZES = (100, 2000, 6223)
+# trading days of price history per ticker
+PRICE_DAYS = 5*252
+# quarters on a ratio page, "Current" included, like the free stockanalysis tables
+MAX_QUARTERS = 21
+
+COUNTRIES = {
+    "NYSE": "United States", "NASDAQ": "United States", "London Stock Exchange": "United Kingdom",
+    "XETRA": "Germany", "Euronext Paris": "France", "Toronto Stock Exchange": "Canada",
+    "Stockholm Stock Exchange": "Sweden", "SIX Swiss Exchange": "Switzerland", "Copenhagen Stock Exchange": "Denmark",
+    "Helsinki Stock Exchange": "Finland", "Euronext Amsterdam": "Netherlands", "Tokyo Stock Exchange": "Japan",
+    "Euronext Brussels": "Belgium", "Australian Securities Exchange": "Australia", "Hong Kong Stock Exchange": "Hong Kong",
+    "Bolsa de Madrid": "Spain", "Borsa Italiana": "Italy",
+}
+SECTORS = {
+    "Technology": ["Software - Application", "Semiconductors", "Information Technology Services"],
+    "Healthcare": ["Biotechnology", "Drug Manufacturers - General", "Medical Devices"],
+    "Financial Services": ["Banks - Regional", "Asset Management", "Insurance - Diversified"],
+    "Industrials": ["Specialty Industrial Machinery", "Marine Shipping", "Engineering & Construction"],
+    "Consumer Cyclical": ["Apparel Retail", "Auto Parts", "Restaurants"],
+    "Energy": ["Oil & Gas E&P", "Oil & Gas Midstream"],
+    "Utilities": ["Utilities - Renewable", "Utilities - Regulated Electric"],
+}
+SALUTATIONS = ["Mr.", "Ms.", "Mrs.", "Dr.", "Prof."]
+# male, female, androgynous and unknown first names, so every gender_guesser label shows up
+FIRST_NAMES = [
+    "Lars", "Anders", "Timothy", "Michael", "Henrik", "Thomas", "Peter", "Søren", "Jean", "Klaus",
+    "Mette", "Anna", "Sarah", "Karin", "Maria", "Sophie", "Lise", "Ingrid", "Camille", "Julia",
+    "Kim", "Robin", "Alex", "Jordan", "Andrea", "Sasha", "Xiaowei", "Oluwaseun", "Thandiwe", "Rui",
+]
+LAST_NAMES = ["Jensen", "Nielsen", "Smith", "Cook", "Berg", "Olsen", "Müller", "Dubois", "Rossi", "Svensson", "Lee", "Okafor"]
+TITLES = [
+    "CEO & Director", "President, CEO & Director", "CFO & Executive VP", "Chief Financial Officer", "CTO",
+    "Chief Technology Officer", "General Counsel", "Executive VP of Sales", "Chief Operating Officer", "Head of Investor Relations",
+]
+
+# rows of a stockanalysis ratio page in page order: (name, kind, location, scale), missing share drawn per row
+RATIO_ROWS = [
+    ("Market Capitalization", "amount", 8.0, 1.5),
+    ("Market Cap Growth", "percent", 5.0, 30.0),
+    ("Enterprise Value", "amount", 8.0, 1.5),
+    ("Last Close Price", "price", 0.0, 0.0),
+    ("PE Ratio", "ratio", 18.0, 12.0),
+    ("Forward PE", "ratio", 16.0, 10.0),
+    ("PS Ratio", "ratio", 2.5, 2.0),
+    ("PB Ratio", "ratio", 2.5, 2.0),
+    ("P/FCF Ratio", "ratio", 20.0, 15.0),
+    ("P/OCF Ratio", "ratio", 12.0, 8.0),
+    ("PEG Ratio", "ratio", 1.8, 1.2),
+    ("EV/Sales Ratio", "ratio", 2.8, 2.0),
+    ("EV/EBITDA Ratio", "ratio", 11.0, 6.0),
+    ("EV/EBIT Ratio", "ratio", 15.0, 9.0),
+    ("EV/FCF Ratio", "ratio", 22.0, 15.0),
+    ("Debt / Equity Ratio", "ratio", 0.6, 0.5),
+    ("Debt / EBITDA Ratio", "ratio", 2.0, 1.5),
+    ("Debt / FCF Ratio", "ratio", 3.0, 2.5),
+    ("Net Debt / Equity Ratio", "ratio", 0.3, 0.5),
+    ("Net Debt / EBITDA Ratio", "ratio", 1.0, 1.5),
+    ("Net Debt / FCF Ratio", "ratio", 1.5, 2.5),
+    ("Asset Turnover", "ratio", 0.7, 0.4),
+    ("Inventory Turnover", "ratio", 5.0, 3.0),
+    ("Quick Ratio", "ratio", 1.1, 0.5),
+    ("Current Ratio", "ratio", 1.6, 0.6),
+    ("Return on Equity (ROE)", "percent", 12.0, 10.0),
+    ("Return on Assets (ROA)", "percent", 5.0, 5.0),
+    ("Return on Invested Capital (ROIC)", "percent", 8.0, 7.0),
+    ("Return on Capital Employed (ROCE)", "percent", 10.0, 8.0),
+    ("Earnings Yield", "percent", 5.0, 4.0),
+    ("FCF Yield", "percent", 4.0, 4.0),
+    ("Buyback Yield / Dilution", "percent", 0.5, 2.0),
+    ("Total Shareholder Return", "percent", 2.5, 2.5),
+]
+# script and navigation around the table, read_html parses the whole document
+PAGE_SCRIPT = "<script>window.__sveltekit_data={nodes:[" + ",".join(f"{{type:\"data\",uses:{{}},slot:{i}}}" for i in range(400)) + "]};</script>"
+PAGE_NAV = "<nav>" + "".join(f"<a href=\"/stocks/{i}/\">Link {i}</a>" for i in range(150)) + "</nav>"
+PAGE_FOOT = "</main><footer>" + "".join(f"<p>Footer text {i} about data sources and terms.</p>" for i in range(60)) + "</footer></body></html>"
+
+def load_tickers(n: int, rng: np.random.Generator, path: str = TICKERS_PATH) -> pd.DataFrame:
+    """n rows of tickers.csv, a random subset in file order when n is smaller than the file."""
+    tickers = pd.read_csv(path)
+    if n > len(tickers):
+        raise ValueError(f"{path} has {len(tickers)} tickers, asked for {n}")
+    rows = np.sort(rng.choice(len(tickers), size=n, replace=False)) if n < len(tickers) else np.arange(n)
+    return tickers.iloc[rows].reset_index(drop=True)
+
+def price_histories(n: int, rng: np.random.Generator, days: int = PRICE_DAYS, end=None) -> tuple[np.ndarray, np.ndarray]:
+    """Business days ending at end (today) and an n x days matrix of geometric random walk closes."""
+    end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end)
+    dates = pd.bdate_range(end=end, periods=days).to_numpy()
+    start = np.exp(rng.normal(3.5, 1.2, size=(n, 1)))
+    drift = rng.normal(0.0003, 0.0004, size=(n, 1))
+    volatility = rng.uniform(0.008, 0.035, size=(n, 1))
+    returns = drift + volatility*rng.standard_normal((n, days))
+    closes = np.round(start*np.exp(np.cumsum(returns, axis=1)), 2)
+    return dates, np.maximum(closes, 0.01)
+
+def officers(rng: np.random.Generator) -> list:
+    people = []
+    for i in range(int(rng.integers(1, 11))):
+        name = f"{rng.choice(SALUTATIONS)} {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        person = {"maxAge": 1, "name": name if rng.random() > 0.03 else str(rng.choice(LAST_NAMES))}
+        if rng.random() > 0.25:
+            person["age"] = int(rng.integers(32, 78))
+        person["title"] = TITLES[0] if i == 0 else str(rng.choice(TITLES[2:]))
+        if rng.random() > 0.5:
+            person["totalPay"] = int(rng.integers(200_000, 12_000_000))
+        person.update({"exercisedValue": 0, "unexercisedValue": 0})
+        people.append(person)
+    return people
+
+def info_dict(symbol: str, company: str, exchange: str, closes: np.ndarray, rng: np.random.Generator) -> dict:
+    """A Ticker.info like dict, prices and moving average changes taken from the ticker's closes."""
+    current, previous = float(closes[-1]), float(closes[-2])
+    d50, d200 = closes[-50:].mean(), closes[-200:].mean()
+    eps = float(rng.normal(2.5, 4.0))
+    shares = int(10**rng.uniform(7, 10))
+    sector = str(rng.choice(list(SECTORS)))
+    info = {
+        "address1": f"{int(rng.integers(1, 200))} Harbour Street", "city": "Copenhagen", "zip": "2100",
+        "country": COUNTRIES.get(exchange, "United States"), "website": f"https://www.{symbol.lower()}.example",
+        "industry": str(rng.choice(SECTORS[sector])), "sector": sector,
+        "longBusinessSummary": f"{company} " + "develops, manufactures and sells products worldwide. "*int(rng.integers(3, 12)),
+        "fullTimeEmployees": int(rng.integers(20, 200_000)),
+        "companyOfficers": officers(rng),
+        "maxAge": 86400, "currency": "USD", "exchange": exchange, "quoteType": "EQUITY",
+        "symbol": symbol, "shortName": company, "longName": company,
+        "currentPrice": current, "previousClose": previous, "open": previous, "dayLow": min(current, previous),
+        "dayHigh": max(current, previous), "regularMarketPreviousClose": previous,
+        "fiftyTwoWeekLow": float(closes[-252:].min()), "fiftyTwoWeekHigh": float(closes[-252:].max()),
+        "fiftyDayAverage": float(d50), "twoHundredDayAverage": float(d200),
+        "fiftyDayAverageChangePercent": current/d50 - 1, "twoHundredDayAverageChangePercent": current/d200 - 1,
+        "sharesOutstanding": shares, "marketCap": int(current*shares), "beta": float(rng.normal(1.0, 0.4)),
+        "trailingPE": current/eps if eps > 0 else float(rng.uniform(2, 60)),
+        "epsTrailingTwelveMonths": eps, "forwardEps": eps*float(rng.uniform(0.8, 1.3)),
+        "priceToBook": float(rng.lognormal(0.7, 0.8)), "bookValue": current/float(rng.lognormal(0.7, 0.8)),
+        "returnOnAssets": float(rng.normal(0.05, 0.07)), "returnOnEquity": float(rng.normal(0.12, 0.15)),
+        "profitMargins": float(rng.normal(0.08, 0.1)), "revenueGrowth": float(rng.normal(0.05, 0.15)),
+        "recommendationKey": str(rng.choice(["buy", "hold", "strong_buy", "underperform", "none"])),
+    }
+    if rng.random() > 0.15:
+        info["debtToEquity"] = float(rng.lognormal(3.8, 0.9))
+    if rng.random() > 0.4:
+        info["dividendYield"] = float(rng.uniform(0.2, 6))
+    return info
+
+def insider_table(rng: np.random.Generator) -> pd.DataFrame:
+    """Ticker.insider_purchases, without trades and with missing percentages for about a tenth of the tickers."""
+    held = int(10**rng.uniform(4, 8))
+    bought, sold = int(held*rng.uniform(0, 0.05)), int(held*rng.uniform(0, 0.05))
+    if rng.random() < 0.1:
+        return parse_insider({"period": "6m", "buyInfoShares": 0, "sellInfoShares": 0, "netInfoShares": 0,
+                              "totalInsiderShares": held, "netPercentInsiderShares": np.nan})
+    return parse_insider({
+        "period": "6m", "buyInfoShares": bought, "buyInfoCount": int(rng.integers(0, 30)),
+        "sellInfoShares": sold, "sellInfoCount": int(rng.integers(0, 30)),
+        "netInfoShares": bought - sold, "netInfoCount": int(rng.integers(-10, 10)), "totalInsiderShares": held,
+        "netPercentInsiderShares": (bought - sold)/held, "buyPercentInsiderShares": bought/held,
+        "sellPercentInsiderShares": sold/held,
+    })
+
+def calendar(rng: np.random.Generator, today: datetime.date) -> dict:
+    if rng.random() < 0.1:
+        return {}
+    earnings = today + datetime.timedelta(days=int(rng.integers(-20, 90)))
+    return {
+        "Dividend Date": today - datetime.timedelta(days=int(rng.integers(0, 200))),
+        "Earnings Date": [earnings] if rng.random() < 0.7 else [earnings, earnings + datetime.timedelta(days=4)],
+        "Earnings High": float(rng.uniform(0.5, 3)), "Earnings Low": float(rng.uniform(0, 0.5)),
+        "Earnings Average": float(rng.uniform(0.5, 1.5)),
+    }
+
+def _cell(kind: str, value: float) -> str:
+    if kind == "amount":
+        return f"{value:,.0f}"
+    if kind == "percent":
+        return f"{value:.2f}%"
+    return f"{value:.2f}"
+
+def ratio_page(symbol: str, company: str, dates: np.ndarray, closes: np.ndarray, rng: np.random.Generator) -> str:
+    """A quarterly stockanalysis ratios page, Last Close Price taken from the closes at each quarter end."""
+    n_quarters = int(min(MAX_QUARTERS, max(5, rng.normal(19, 4))))
+    last = pd.Timestamp(dates[-1])
+    ends = pd.date_range(end=last, periods=n_quarters - 1, freq="QE")[::-1]
+    # last trading day on or before each quarter end
+    positions = np.concatenate([[len(dates) - 1], np.searchsorted(dates, ends.to_numpy(), side="right") - 1])
+    periods = [("Current", f"{last:%b '%y} {last:%b} {last.day}, {last.year}")]
+    periods += [(f"Q{end.quarter} {end.year}", f"{end:%b '%y} {end:%b} {end.day}, {end.year}") for end in ends]
+
+    head = "".join(f"<th>{quarter}</th>" for quarter, _ in periods)
+    ending = "".join(f"<th>{period}</th>" for _, period in periods)
+    rows = []
+    for name, kind, location, scale in RATIO_ROWS:
+        if kind == "price":
+            values = closes[positions]
+        elif kind == "amount":
+            # millions, price times a share count that drifts a little between quarters
+            shares = 10**(location + rng.normal(0, scale))*(1 + 0.02*rng.standard_normal(n_quarters))
+            values = closes[positions]*shares/1e6
+        else:
+            values = location + scale*rng.standard_normal(n_quarters)
+        cells = [_cell(kind, value) for value in values]
+        # whole rows are missing for some tickers, never the price the targets come from
+        missing = kind != "price" and rng.random() < 0.08
+        for i in range(n_quarters):
+            if missing or rng.random() < 0.03:
+                cells[i] = "-"
+        if kind != "price" and rng.random() < 0.15:
+            # history that starts later than the price history
+            for i in range(n_quarters - int(rng.integers(1, 5)), n_quarters):
+                cells[i] = "-"
+        rows.append(f"<tr><td>{name}</td>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>")
+    table = (
+        f"<table class=\"ratios\"><thead><tr><th>Fiscal Quarter</th>{head}</tr><tr><th>Period Ending</th>{ending}</tr></thead>"
+        f"<tbody>{''.join(rows)}</tbody></table>"
+    )
+    return (
+        f"<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\"><title>{company} ({symbol}) Financial Ratios</title>"
+        f"{PAGE_SCRIPT}</head><body>{PAGE_NAV}<main><h1>{company} ({symbol})</h1>"
+        f"<div class=\"controls\"><button>Annual</button><button>Quarterly</button></div>{table}{PAGE_FOOT}"
+    )
+
+class Universe:
+    """Generated inputs of every benchmarked stage for the tickers of one universe."""
+    def __init__(self, tickers: pd.DataFrame, dates: np.ndarray, closes: np.ndarray, snapshots: list, pages: list):
+        self.tickers = tickers
+        self.symbols = tickers["Ticker"].tolist()
+        self.dates = dates
+        self.closes = closes
+        self.snapshots = snapshots
+        self.pages = pages
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def write_prices(self, store) -> None:
+        """Fill a PriceStore with the generated closes."""
+        for symbol, closes in zip(self.symbols, self.closes):
+            store._write(symbol, self.dates, closes)
+
+def make_universe(n: int, seed: int = 0) -> Universe:
+    rng = np.random.default_rng(seed)
+    tickers = load_tickers(n, rng)
+    dates, closes = price_histories(n, rng)
+    today = pd.Timestamp(dates[-1]).date()
+    snapshots, pages = [], []
+    for (symbol, company, exchange), ticker_closes in zip(tickers.itertuples(index=False), closes):
+        info = info_dict(symbol, company, exchange, ticker_closes, rng)
+        snapshots.append(StockSnapshot(symbol, info, insider_table(rng), calendar(rng, today)))
+        pages.append(ratio_page(symbol, company, dates, ticker_closes, rng))
+    return Universe(tickers, dates, closes, snapshots, pages)
+
+def previous_summary(current: pd.DataFrame, rng: np.random.Generator, changed: float = 0.2) -> pd.DataFrame:
+    """
+    The screener snapshot of an earlier run: a share of changed scores and signals, owned flags flipped for a few
+    tickers, and some tickers missing from one side.
+    """
+    previous = current.sample(frac=0.97, random_state=int(rng.integers(2**31))).sort_index()
+    moved = rng.random(len(previous)) < changed
+    scores = previous["Final Score"].to_numpy(dtype=float) + np.where(moved, rng.normal(0, 0.6, len(previous)), 0.0)
+    previous["Final Score"] = np.round(scores, 2)
+    previous["Signal"] = np.select([scores >= 0.5, scores < 0], ["Buy", "Sell"], "Hold")
+    flipped = rng.random(len(previous)) < 0.01
+    previous["Owned"] = previous["Owned"].to_numpy(dtype=bool) ^ flipped
+    return previous.reset_index(drop=True)
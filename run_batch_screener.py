@@ -3,6 +3,7 @@
 Batch stock screener runner without browser/Streamlit.
 Handles snapshot comparison and Discord notification logic.
 """
+import argparse
 import os
 import sys
 import pandas as pd
@@ -14,13 +15,22 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, os.path.join(current_dir, "src"))
 
 from methods.screener_methods import Stock, BUY_THRESHOLD
+from methods.fetcher import fetch_many
+from methods.alerts import default_rules, diff_snapshots, evaluate_subscribers, load_subscribers
+from methods.collector import ResultCollector
 
 # Configuration
 CACHE_DIR = Path.home() / ".openclaw" / "workspace" / ".cache" / "screener"
 CURRENT_SNAPSHOT = CACHE_DIR / "current.csv"
 PREVIOUS_SNAPSHOT = CACHE_DIR / "previous.csv"
+TIMINGS_FILE = CACHE_DIR / "timings.csv"
+CHECKPOINT_FILE = CACHE_DIR / "checkpoint.csv"
+SUBSCRIBERS_FILE = CACHE_DIR / "subscribers.json"
+DEFAULT_MENTION = "<@326383878157631516>"
 OWNED_THRESHOLD = 0.5  # Same as BUY_THRESHOLD
 MIN_SCORE_CHANGE = 0.5
+MAX_WORKERS = 8
+RATE_PER_SECOND = 4.0
 
 def ensure_cache_dir():
     """Ensure cache directory exists."""
@@ -44,30 +54,44 @@ def load_symbols(list_type="Most interesting (Default)"):
     return list(set(symbols))
 
 def fetch_stock_data(symbol):
-    """Fetch stock data and return summary row."""
-    try:
-        return Stock(symbol).summary()
-    except Exception as e:
-        print(f"[ERROR] {symbol}: {e}", file=sys.stderr)
-        return None
+    """Fetch stock data and return summary row, errors are raised so the fetcher can retry them."""
+    return Stock(symbol).summary()
 
-def run_screener(list_type="Most interesting (Default)"):
-    """Run the screener and return results DataFrame."""
+def report_progress(outcome, n_done, n_total):
+    """Log each finished ticker with its timing."""
+    symbol = outcome["symbol"]
+    if outcome["error"] is None:
+        print(f"[PROGRESS] {n_done}/{n_total}: {symbol} ({outcome['seconds']:.2f}s, {outcome['attempts']} attempt(s))", file=sys.stderr)
+    else:
+        print(f"[ERROR] {symbol}: {outcome['error']}", file=sys.stderr)
+
+def run_screener(list_type="Most interesting (Default)", max_workers=MAX_WORKERS, rate=RATE_PER_SECOND, checkpoint=None, resume=False):
+    """
+    Run the screener and return results DataFrame.
+    Rows are appended to checkpoint as they finish, with resume=True tickers already in it are skipped.
+    """
     symbols = load_symbols(list_type)
+    collector = ResultCollector(checkpoint, resume=resume)
+    done = collector.completed
+    if done:
+        print(f"[INFO] Resuming: {len(done)} symbols already in checkpoint", file=sys.stderr)
+    symbols = [symbol for symbol in symbols if symbol not in done]
     print(f"[INFO] Running screener for {len(symbols)} symbols from '{list_type}'...", file=sys.stderr)
     
-    df = pd.DataFrame()
+    def on_done(outcome, n_done, n_total):
+        if outcome["error"] is None:
+            collector.add(outcome["result"])
+        report_progress(outcome, n_done, n_total)
     
-    for i, symbol in enumerate(symbols):
-        print(f"[PROGRESS] {i+1}/{len(symbols)}: {symbol}", file=sys.stderr)
-        
-        try:
-            summary = fetch_stock_data(symbol)
-            if summary is not None:
-                df = pd.concat([df, summary], ignore_index=True)
-        except Exception as e:
-            print(f"[ERROR] Failed to process {symbol}: {e}", file=sys.stderr)
-            continue
+    results, timings = fetch_many(symbols, fetch_stock_data, max_workers=max_workers, rate=rate, on_done=on_done)
+    
+    if TIMINGS_FILE.parent.exists():
+        timings.to_csv(TIMINGS_FILE, index=False)
+    if not timings.empty:
+        print(f"[INFO] Fetched {len(results)}/{len(symbols)} symbols, mean {timings['Seconds'].mean():.2f}s per ticker, "
+              f"slowest {timings.loc[timings['Seconds'].idxmax(), 'Ticker']} ({timings['Seconds'].max():.2f}s)", file=sys.stderr)
+    
+    df = collector.to_frame()
     
     if not df.empty:
         df = df.sort_values(by="Final Score", ascending=False).reset_index(drop=True)
@@ -94,52 +118,30 @@ def detect_changes(current_df, previous_df):
     
     Returns list of change descriptions.
     """
-    changes = []
-    
-    if previous_df is None or previous_df.empty:
-        return changes  # First run, no comparison
-    
-    # Build lookup dictionaries
-    prev_dict = {row["Ticker"]: row for _, row in previous_df.iterrows()}
-    curr_dict = {row["Ticker"]: row for _, row in current_df.iterrows()}
-    
-    # Check existing tickers
-    for ticker, curr_row in curr_dict.items():
-        if ticker not in prev_dict:
-            continue  # New ticker, not a change
-        
-        prev_row = prev_dict[ticker]
-        is_owned = curr_row["Owned"]
-        
-        prev_score = prev_row["Final Score"]
-        curr_score = curr_row["Final Score"]
-        prev_signal = prev_row["Signal"]
-        curr_signal = curr_row["Signal"]
-        
-        # Check for significant changes
-        if is_owned:
-            # Rule 1: Owned stocks always monitored
-            # Signal change
-            if prev_signal != curr_signal:
-                changes.append(f"🔄 {ticker}: {prev_signal} → {curr_signal} (score {prev_score:.2f} → {curr_score:.2f})")
-            # Score delta >= 0.5
-            elif abs(curr_score - prev_score) >= MIN_SCORE_CHANGE:
-                changes.append(f"📊 {ticker}: Score {prev_score:.2f} → {curr_score:.2f}")
-        else:
-            # Rule 2: Unowned stocks only if entering buy-zone
-            prev_in_buy = prev_signal == "Buy" or prev_score >= BUY_THRESHOLD
-            curr_in_buy = curr_signal == "Buy" or curr_score >= BUY_THRESHOLD
-            
-            if not prev_in_buy and curr_in_buy:
-                changes.append(f"🚀 {ticker}: Entering buy-zone (score {curr_score:.2f})")
-    
-    return changes
+    diff = diff_snapshots(current_df, previous_df)
+    return default_rules(BUY_THRESHOLD, MIN_SCORE_CHANGE).evaluate(diff)["Message"].tolist()
+
+def load_rule_sets():
+    """Subscriber rule sets from SUBSCRIBERS_FILE, or the default rules for a single subscriber."""
+    if SUBSCRIBERS_FILE.exists():
+        return load_subscribers(SUBSCRIBERS_FILE)
+    return {"default": default_rules(BUY_THRESHOLD, MIN_SCORE_CHANGE, mention=DEFAULT_MENTION)}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--list", default="Most interesting (Default)", help="ticker list: 'Most interesting (Default)', Danish, European or All")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted run from its checkpoint")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--rate", type=float, default=RATE_PER_SECOND, help="requests per second")
+    return parser.parse_args(argv)
 
 def main():
+    args = parse_args()
     ensure_cache_dir()
+    resuming = args.resume and CHECKPOINT_FILE.exists()
     
-    # Rotate snapshots: current -> previous
-    if CURRENT_SNAPSHOT.exists():
+    # Rotate snapshots: current -> previous, an interrupted run already rotated them
+    if CURRENT_SNAPSHOT.exists() and not resuming:
         CURRENT_SNAPSHOT.rename(PREVIOUS_SNAPSHOT)
         print(f"[INFO] Rotated snapshot: current → previous", file=sys.stderr)
     
@@ -147,7 +149,7 @@ def main():
     previous_df = load_previous_snapshot()
     
     # Run screener
-    current_df = run_screener("Most interesting (Default)")
+    current_df = run_screener(args.list, max_workers=args.workers, rate=args.rate, checkpoint=CHECKPOINT_FILE, resume=args.resume)
     
     if current_df.empty:
         print("[ERROR] Screener returned no results", file=sys.stderr)
@@ -155,24 +157,32 @@ def main():
     
     # Save current snapshot
     current_df.to_csv(CURRENT_SNAPSHOT, index=False)
+    CHECKPOINT_FILE.unlink(missing_ok=True)
     print(f"[INFO] Saved current snapshot to {CURRENT_SNAPSHOT}", file=sys.stderr)
     
-    # Detect changes
-    changes = detect_changes(current_df, previous_df)
+    # Detect changes for every subscriber
+    rule_sets = load_rule_sets()
+    alerts = evaluate_subscribers(current_df, previous_df, rule_sets)
     
     # Output result
     if previous_df is None or previous_df.empty:
         # First run: baseline established, no Discord message
         print("NO_REPLY", file=sys.stdout)
         print("[INFO] First run: baseline established. No Discord notification.", file=sys.stderr)
-    elif changes:
-        # Changes detected: send Discord message
-        message = f"<@326383878157631516>\n"
-        # Include top 6 lines of changes
-        for change in changes[:6]:
-            message += f"{change}\n"
-        print(message, file=sys.stdout)
-        print(f"[INFO] {len(changes)} significant change(s) detected. Sending Discord message.", file=sys.stderr)
+    elif any(not subscriber_alerts.empty for subscriber_alerts in alerts.values()):
+        # Changes detected: send Discord message, one block per subscriber
+        messages = []
+        for name, subscriber_alerts in alerts.items():
+            if subscriber_alerts.empty:
+                continue
+            message = f"{rule_sets[name].mention}\n"
+            # Include top 6 lines of changes
+            for change in subscriber_alerts["Message"].head(6):
+                message += f"{change}\n"
+            messages.append(message)
+            print(f"[INFO] {name}: {len(subscriber_alerts)} significant change(s) detected.", file=sys.stderr)
+        print("\n".join(messages), file=sys.stdout)
+        print("[INFO] Sending Discord message.", file=sys.stderr)
     else:
         # No changes
         print("NO_REPLY", file=sys.stdout)
@@ -1,8 +1,7 @@
 import streamlit as st # type: ignore
 import pandas as pd
+import numpy as np
 import sys
-import io
-import time
 import os
 from datetime import datetime
 
@@ -12,6 +11,8 @@ if current_dir not in sys.path:
 
 from methods.screener_methods import Stock
 from methods.screener_methods import BUY_THRESHOLD
+from methods.batch_jobs import RESULTS_TTL, BatchJobs
+from methods.search_index import SearchIndex
 
 # Page config
 st.set_page_config(
@@ -23,6 +24,14 @@ st.set_page_config(
 st.title("Stock Screener")
 
 TICKER_LIST_OPTIONS = ["Most interesting (Default)", "Danish", "European", "All"]
+PAGE_SIZES = [25, 50, 100, 250, 500]
+DEFAULT_PAGE_SIZE = 100
+GREEN, YELLOW, RED = "#28a745", "#ffc107", "#dc3545"
+
+@st.cache_resource
+def batch_jobs():
+    """Runs shared by every session, a list that is running or fresh is not crawled again."""
+    return BatchJobs(ttl=RESULTS_TTL)
 
 # Sidebar for settings
 with st.sidebar:
@@ -49,7 +58,12 @@ execution_mode = "list"
 selected_list = sb_symbol_list
 selected_ticker = ""
 
-if 'df_results' not in st.session_state or st.session_state.df_results is None:
+# a run started by another session drops expired runs, this session's one can be among them
+if st.session_state.get('job_name') is not None and batch_jobs().get(st.session_state.job_name) is None:
+    st.session_state.job_name = None
+    st.info("The previous results expired and were cleared, run the screener again.")
+
+if st.session_state.get('job_name') is None:
     st.write("### Quick Start")
     col1, col2 = st.columns([2, 1])
     with col1:
@@ -75,6 +89,7 @@ if sb_run_single:
     else:
         st.warning("Please enter a ticker symbol.")
 
+@st.cache_data
 def load_symbols(list_type):
     # Construct absolute path to data directory
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -92,131 +107,123 @@ def load_symbols(list_type):
         symbols = pd.read_csv(os.path.join(base_path, "simple_tickers.csv"))["Ticker"].tolist()
     return list(set(symbols))
 
-def fetch_stock_data(symbol):
-    """
-    Fetches stock data.
-    """
-    return Stock(symbol).summary()
+@st.cache_resource(ttl=RESULTS_TTL)
+def load_stock(symbol):
+    return Stock(symbol)
+
+@st.cache_data(ttl=RESULTS_TTL)
+def load_price_history(symbol, range):
+    return stock_for(symbol).price_history(range)
+
+def stock_for(symbol):
+    """The Stock a batch run already fetched, otherwise one fetched once for every session."""
+    stock = batch_jobs().find_stock(symbol)
+    return stock if stock is not None else load_stock(symbol)
+
+@st.cache_data(ttl=RESULTS_TTL)
+def results_frame(job_name, finished_at):
+    """Rows of a finished run and their earnings dates, parsed once per run rather than on every rerun."""
+    df = batch_jobs().get(job_name).frame()
+    if "Earnings" not in df.columns:
+        return df, pd.Series(pd.NaT, index=df.index)
+    return df, pd.to_datetime(df["Earnings"].astype(str), format="%d-%m-%Y", errors="coerce")
+
+@st.cache_resource(ttl=RESULTS_TTL)
+def search_index(job_name, finished_at):
+    """Built once per finished run and shared by every session searching it."""
+    return SearchIndex(results_frame(job_name, finished_at)[0])
 
-if 'df_results' not in st.session_state:
-    st.session_state.df_results = None
+def colored(values, positive, negative):
+    """Bold green where positive, red where negative and yellow otherwise, like the rows were always styled."""
+    return "color: " + pd.Series(np.select([positive, negative], [GREEN, RED], YELLOW), index=values.index) + "; font-weight: bold"
+
+def table_styles(page, earnings_dates, today):
+    """Css for every cell of page, computed a column at a time."""
+    styles = pd.DataFrame("", index=page.index, columns=page.columns)
+    if "1d Change" in page.columns:
+        change = pd.to_numeric(page["1d Change"], errors="coerce")
+        styles["1d Change"] = colored(change, change > 0, change < 0)
+    if "Final Score" in page.columns:
+        score = pd.to_numeric(page["Final Score"], errors="coerce")
+        styles["Final Score"] = colored(score, score >= BUY_THRESHOLD, score < 0)
+    if "Signal" in page.columns:
+        styles["Signal"] = colored(page["Signal"], page["Signal"] == "Buy", page["Signal"] == "Sell")
+    if "Earnings" in page.columns:
+        days = (earnings_dates - today).dt.days
+        # red for today and yesterday, yellow for the upcoming week
+        styles["Earnings"] = np.select([days.isin([0, -1]), (days > 0) & (days < 7)], [f"color: {RED}", f"color: {YELLOW}"], "")
+    return styles
+
+if 'job_name' not in st.session_state:
+    st.session_state.job_name = None
 
 if 'results_label' not in st.session_state:
     st.session_state.results_label = "results"
 
 if should_run:
     if execution_mode == "list":
-        st.write(f"Fetching data for **{selected_list}** list...")
         symbols = load_symbols(selected_list)
         st.session_state.results_label = selected_list
+        st.session_state.job_name = f"list:{selected_list}"
     else:
-        st.write(f"Analyzing **{selected_ticker}**...")
         symbols = [selected_ticker]
         st.session_state.results_label = selected_ticker
+        st.session_state.job_name = f"single:{selected_ticker}"
+    batch_jobs().start(st.session_state.job_name, symbols)
 
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    df = pd.DataFrame()
-    
-    for i, symbol in enumerate(symbols):
-        status_text.text(f"Processing {symbol} ({i+1}/{len(symbols)})...")
-        old_stderr = sys.stderr
-        sys.stderr = io.StringIO()
-        try:
-            # Use the cached function
-            summary = fetch_stock_data(symbol)
-            df = pd.concat([df, summary])
-            
-            # Politeness buffer
-            time.sleep(0.5) 
-        except Exception as e:
-            # If we get blocked (Too Many Requests), wait it out
-            if "429" in str(e) or "Too Many Requests" in str(e):
-                status_text.text(f"Rate limited on {symbol}. Cooling down for 1s...")
-                time.sleep(1)
-                # Optional: try one more time?
-                try:
-                    summary = fetch_stock_data(symbol)
-                    df = pd.concat([df, summary])
-                except:
-                    pass
-            else:
-                if debug:
-                    st.error(f"Error processing {symbol}: {e}")
-        finally:
-            sys.stderr = old_stderr
-        
-        progress_bar.progress((i + 1) / len(symbols))
-        
-    status_text.text("Done!")
-    
-    if not df.empty:
-        df = df.sort_values(by="Final Score", ascending=False).reset_index(drop=True)
-        st.session_state.df_results = df
-    else:
+job = batch_jobs().get(st.session_state.job_name) if st.session_state.job_name is not None else None
+
+if job is not None and not job.done:
+    # the fetch runs on a background thread, this fragment polls it and shows the rows finished so far
+    @st.fragment(run_every=1.0)
+    def show_progress():
+        if job.done:
+            st.rerun()
+        st.write(f"Fetching data for **{st.session_state.results_label}**...")
+        st.progress(job.progress(), text=f"Processed {job.n_done}/{len(job.symbols)}")
+        partial = job.frame()
+        if not partial.empty:
+            st.dataframe(partial, width='stretch')
+        if debug:
+            for symbol, error in list(job.errors.items()):
+                st.error(f"Error processing {symbol}: {error}")
+    show_progress()
+
+elif job is not None:
+    df, earnings_dates = results_frame(st.session_state.job_name, job.finished_at)
+    if df.empty:
         st.warning("No data found or all fetches failed.")
+    if debug and not job.timings.empty:
+        st.caption(f"Fetched {len(df)}/{len(job.symbols)} symbols, mean {job.timings['Seconds'].mean():.2f}s per ticker")
 
-if st.session_state.df_results is not None:
-    df = st.session_state.df_results
+if job is not None and job.done and not df.empty:
     st.subheader("Results")
 
     # Search bar
-    search_term = st.text_input("Search (Ticker, Name, or other columns)", "")
+    search_term = st.text_input(
+        "Search (Ticker, Name, or other columns)", "",
+        help="Terms must all match. Use column:text like sector:tech, or numeric filters like score>0.5 or pe<=15.",
+    )
     if search_term:
-        df = df[
-            df.astype(str).apply(lambda x: x.str.contains(search_term, case=False, regex=False)).any(axis=1)
-        ]
+        try:
+            df = df[search_index(st.session_state.job_name, job.finished_at).mask(search_term)]
+        except ValueError as e:
+            st.warning(f"{e}, showing all rows.")
     
-    # Styling the dataframe
-    def style_rows(row):
-        styles = []
-        for col in row.index:
-            style = ''
-            if col == '1d Change':
-                change = row['1d Change']
-                color = '#ffc107'
-                if change > 0:
-                    color = '#28a745'
-                elif change < 0:
-                    color = '#dc3545'
-                style = f'color: {color}; font-weight: bold'
-            if col == 'Final Score':
-                score = row['Final Score']
-                color = '#ffc107'
-                if score >= BUY_THRESHOLD:
-                    color = '#28a745'
-                elif score < 0:
-                    color = '#dc3545'
-                style = f'color: {color}; font-weight: bold'
-            elif col == 'Signal':
-                signal = row['Signal']
-                color = '#ffc107'
-                if signal == 'Buy':
-                    color = '#28a745'
-                elif signal == 'Sell':
-                    color = '#dc3545'
-                style = f'color: {color}; font-weight: bold'
-            elif col == 'Earnings':
-                try:
-                    date_str = str(row['Earnings'])
-                    date_obj = datetime.strptime(date_str, "%d-%m-%Y").date()
-                    today = datetime.now().date()
-                    days_diff = (date_obj - today).days
-                    
-                    if days_diff == 0 or days_diff == -1:
-                        style = 'color: #dc3545' # Red for today and yesterday
-                    elif 0 < days_diff < 7:
-                        style = 'color: #ffc107' # Yellow for upcoming week
-                except:
-                    pass
-            styles.append(style)
-        return styles
+    # pages keep the table the browser receives small, the styles are only computed for the visible page
+    col_rows, col_page, _ = st.columns([1, 1, 4])
+    with col_rows:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE))
+    n_pages = max(1, -(-len(df) // page_size))
+    with col_page:
+        page_number = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+    page = df.iloc[(page_number - 1)*page_size:page_number*page_size]
+    page_styles = table_styles(page, earnings_dates.reindex(page.index), pd.Timestamp(datetime.now().date()))
 
     st.dataframe(
-        df.style
+        page.style
         .format(precision=2)
-        .apply(style_rows, axis=1),
+        .apply(lambda _: page_styles, axis=None),
         width='stretch'
     )
     
@@ -251,10 +258,8 @@ if st.session_state.df_results is not None:
         if selected_ticker:
             with st.spinner(f"Loading details for {selected_ticker}..."):
                 try:
-                    # We re-fetch or reuse if we could store objects, 
-                    # but storing objects in session state might use too much memory.
-                    # Re-fetching is safer for a fresh view.
-                    stock_detail = Stock(selected_ticker)
+                    # the batch run already fetched this ticker, no new download
+                    stock_detail = stock_for(selected_ticker)
                     
                     col1, col2, col3, col4 = st.columns(4)
                     with col1:
@@ -267,7 +272,7 @@ if st.session_state.df_results is not None:
                         st.metric("Earnings", stock_detail.latest_earnings_date)
 
                     st.subheader("Price History (YTD)")
-                    hist = stock_detail.price_history("ytd")
+                    hist = load_price_history(selected_ticker, "ytd")
                     st.line_chart(hist)
                     
                     st.subheader("Full Data")
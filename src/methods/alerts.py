@@ -0,0 +1,137 @@
+import json
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from .screener_methods import BUY_THRESHOLD
+
+DIFF_COLUMNS = ["Ticker", "Owned", "Signal", "Final Score"]
+MIN_SCORE_CHANGE = 0.5
+
+def diff_snapshots(current: pd.DataFrame, previous: pd.DataFrame | None) -> pd.DataFrame:
+    """
+    Join two screener snapshots on Ticker, previous values get a "_prev" suffix.
+    Tickers missing from either snapshot are left out, rows keep the order of current.
+    """
+    if previous is None or previous.empty or current.empty:
+        return pd.DataFrame(columns=DIFF_COLUMNS + [f"{column}_prev" for column in DIFF_COLUMNS[1:]])
+    current = current[DIFF_COLUMNS].drop_duplicates("Ticker", keep="last")
+    previous = previous[DIFF_COLUMNS].drop_duplicates("Ticker", keep="last")
+    diff = current.merge(previous, on="Ticker", how="inner", suffixes=("", "_prev"), sort=False)
+    diff["Owned"] = diff["Owned"].astype(bool)
+    return diff.reset_index(drop=True)
+
+def _in_buy_zone(signal: pd.Series, score: pd.Series, buy_threshold: float) -> pd.Series:
+    return (signal == "Buy") | (score >= buy_threshold)
+
+def signal_flip(diff: pd.DataFrame) -> pd.Series:
+    return diff["Signal_prev"] != diff["Signal"]
+
+def score_delta(diff: pd.DataFrame, min_change: float = MIN_SCORE_CHANGE) -> pd.Series:
+    return (diff["Final Score"] - diff["Final Score_prev"]).abs() >= min_change
+
+def enter_buy_zone(diff: pd.DataFrame, buy_threshold: float = BUY_THRESHOLD) -> pd.Series:
+    was_in = _in_buy_zone(diff["Signal_prev"], diff["Final Score_prev"], buy_threshold)
+    is_in = _in_buy_zone(diff["Signal"], diff["Final Score"], buy_threshold)
+    return ~was_in & is_in
+
+def exit_buy_zone(diff: pd.DataFrame, buy_threshold: float = BUY_THRESHOLD) -> pd.Series:
+    was_in = _in_buy_zone(diff["Signal_prev"], diff["Final Score_prev"], buy_threshold)
+    is_in = _in_buy_zone(diff["Signal"], diff["Final Score"], buy_threshold)
+    return was_in & ~is_in
+
+# rule kind -> (mask over the joined frame, default message template)
+RULE_KINDS = {
+    "signal_flip": (signal_flip, "🔄 {Ticker}: {Signal_prev} → {Signal} (score {Final Score_prev:.2f} → {Final Score:.2f})"),
+    "score_delta": (score_delta, "📊 {Ticker}: Score {Final Score_prev:.2f} → {Final Score:.2f}"),
+    "enter_buy_zone": (enter_buy_zone, "🚀 {Ticker}: Entering buy-zone (score {Final Score:.2f})"),
+    "exit_buy_zone": (exit_buy_zone, "🔻 {Ticker}: Leaving buy-zone (score {Final Score:.2f})"),
+}
+
+class Rule:
+    """
+    One alert rule: a boolean mask over the joined snapshots and the message for matching rows.
+    owned=True only fires for owned tickers, owned=False only for unowned ones, None for all.
+    Extra keyword arguments are passed on to the mask, e.g. min_change or buy_threshold.
+    """
+    def __init__(self, kind: str, owned: bool | None = None, message: str | None = None,
+                 condition: Callable | None = None, **params):
+        if condition is None and kind not in RULE_KINDS:
+            raise ValueError(f"Unknown rule kind '{kind}', expected one of {list(RULE_KINDS)} or a condition")
+        self.kind = kind
+        self.owned = owned
+        self.condition = condition if condition is not None else RULE_KINDS[kind][0]
+        self.message = message if message is not None else RULE_KINDS[kind][1]
+        self.params = params
+
+    @classmethod
+    def from_config(cls, config: dict) -> "Rule":
+        config = dict(config)
+        return cls(config.pop("kind"), **config)
+
+    def mask(self, diff: pd.DataFrame) -> np.ndarray:
+        mask = self.condition(diff, **self.params).fillna(False).to_numpy(dtype=bool)
+        if self.owned is not None:
+            mask = mask & (diff["Owned"].to_numpy(dtype=bool) == self.owned)
+        return mask
+
+class RuleSet:
+    """
+    Ordered rules of one subscriber. With first_match_only a ticker raises at most one alert,
+    the first matching rule in order wins.
+    """
+    def __init__(self, rules: list[Rule], first_match_only: bool = True, mention: str = ""):
+        self.rules = rules
+        self.first_match_only = first_match_only
+        self.mention = mention
+
+    @classmethod
+    def from_config(cls, config: dict) -> "RuleSet":
+        return cls(
+            [Rule.from_config(rule) for rule in config["rules"]],
+            first_match_only=config.get("first_match_only", True),
+            mention=config.get("mention", ""),
+        )
+
+    def evaluate(self, diff: pd.DataFrame) -> pd.DataFrame:
+        """Alerts as a frame of Ticker, Rule and Message in snapshot order."""
+        if diff.empty or not self.rules:
+            return pd.DataFrame(columns=["Ticker", "Rule", "Message"])
+        masks = np.column_stack([rule.mask(diff) for rule in self.rules])
+        if self.first_match_only:
+            rows = np.flatnonzero(masks.any(axis=1))
+            rule_ids = masks[rows].argmax(axis=1)
+        else:
+            rows, rule_ids = np.nonzero(masks)
+        records = diff.iloc[rows].to_dict("records")
+        return pd.DataFrame({
+            "Ticker": [record["Ticker"] for record in records],
+            "Rule": [self.rules[i].kind for i in rule_ids],
+            "Message": [self.rules[i].message.format(**record) for record, i in zip(records, rule_ids)],
+        }, columns=["Ticker", "Rule", "Message"])
+
+def default_rules(buy_threshold: float = BUY_THRESHOLD, min_score_change: float = MIN_SCORE_CHANGE, mention: str = "") -> RuleSet:
+    """
+    Owned tickers alert on signal flips, otherwise on score moves of at least min_score_change.
+    Unowned tickers only alert when entering the buy zone.
+    """
+    return RuleSet([
+        Rule("signal_flip", owned=True),
+        Rule("score_delta", owned=True, min_change=min_score_change),
+        Rule("enter_buy_zone", owned=False, buy_threshold=buy_threshold),
+    ], mention=mention)
+
+def load_subscribers(path) -> dict[str, RuleSet]:
+    """
+    Read subscriber rule sets from json, e.g.
+    {"me": {"mention": "<@123>", "rules": [{"kind": "score_delta", "owned": true, "min_change": 0.3}]}}
+    """
+    with open(path) as f:
+        config = json.load(f)
+    return {name: RuleSet.from_config(subscriber) for name, subscriber in config.items()}
+
+def evaluate_subscribers(current: pd.DataFrame, previous: pd.DataFrame | None, subscribers: dict[str, RuleSet]) -> dict[str, pd.DataFrame]:
+    """Diff the snapshots once and evaluate every subscriber's rule set on it."""
+    diff = diff_snapshots(current, previous)
+    return {name: rules.evaluate(diff) for name, rules in subscribers.items()}
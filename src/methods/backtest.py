@@ -0,0 +1,156 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import screener_methods
+from .scoring import score_frame
+
+# fundamentals the value score is built from, PE and PB are derived from the price when only EPS / book value are given
+FUNDAMENTAL_COLUMNS = ["PE", "ROA", "EPS", "PB", "DE", "insider_buy", "leadership_score"]
+# inputs that add 0 to the score when missing, the history of insider buys and officers is rarely available
+OPTIONAL_COLUMNS = ["insider_buy", "leadership_score"]
+SIGNALS = ["Buy", "Hold", "Sell"]
+CHUNK_DATES = 12
+WORKERS = 4
+
+def rebalance_dates(index: pd.DatetimeIndex, freq: str = "ME") -> pd.DatetimeIndex:
+    """Last trading day of every period, e.g. every month end for "ME"."""
+    last = pd.Series(index, index=index).resample(freq).last().dropna()
+    return pd.DatetimeIndex(last.to_numpy(), name="Date")
+
+def _as_of(fundamentals: pd.DataFrame, column: str, dates: pd.DatetimeIndex, tickers: pd.Index) -> np.ndarray:
+    """Latest reported value of column per ticker at every date, dates x tickers."""
+    wide = fundamentals.pivot_table(index="Date", columns="Ticker", values=column, aggfunc="last")
+    wide = wide.reindex(wide.index.union(dates)).ffill().reindex(index=dates, columns=tickers)
+    return wide.to_numpy(dtype=float)
+
+def _score_chunk(raw: pd.DataFrame, momentum_method: str, buy_threshold: float) -> pd.DataFrame:
+    scores = score_frame(raw, momentum_method, buy_threshold)
+    return pd.DataFrame({
+        "Date": raw["Date"].to_numpy(),
+        "Ticker": scores["Ticker"].to_numpy(),
+        "Final Score": scores["Final Score"].to_numpy(),
+        "Value Score": scores["Value Score"].to_numpy(),
+        "Momentum Score": scores["Momentum Score"].to_numpy(),
+        "Signal": scores["Signal"].to_numpy(),
+        "Forward Return": raw["forward_return"].to_numpy(),
+    })
+
+def run_backtest(
+    prices: pd.DataFrame,
+    fundamentals: pd.DataFrame,
+    freq: str = "ME",
+    momentum_method: str | None = None,
+    buy_threshold: float | None = None,
+    workers: int = WORKERS,
+) -> pd.DataFrame:
+    """
+    Walk-forward backtest of the screener score.
+    prices holds daily closes, dates x tickers. fundamentals is long with Date (when the numbers became known),
+    Ticker and the FUNDAMENTAL_COLUMNS. Without a PE column PE is close/EPS, without PB it is close/book_value.
+    At every rebalance date the latest known fundamentals and the 50d/200d momentum from prices are scored with
+    scoring.score_frame, chunks of dates are scored in parallel. The forward return runs to the next rebalance date.
+    Returns one row per date and listed ticker: Date, Ticker, the scores, Signal and Forward Return.
+    """
+    momentum_method = screener_methods.momentum_method if momentum_method is None else momentum_method
+    buy_threshold = screener_methods.BUY_THRESHOLD if buy_threshold is None else buy_threshold
+    prices = prices.sort_index()
+    dates = rebalance_dates(prices.index, freq)
+    tickers = prices.columns
+
+    # momentum like yfinance's fiftyDayAverageChangePercent, from one rolling pass over the whole matrix
+    close = prices.reindex(dates).to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d50 = close/prices.rolling(50, min_periods=50).mean().reindex(dates).to_numpy() - 1
+        d200 = close/prices.rolling(200, min_periods=200).mean().reindex(dates).to_numpy() - 1
+        forward = np.vstack([close[1:], np.full((1, len(tickers)), np.nan)])/close - 1
+
+    inputs = {}
+    for column in FUNDAMENTAL_COLUMNS:
+        if column in fundamentals.columns:
+            inputs[column] = _as_of(fundamentals, column, dates, tickers)
+        elif column in OPTIONAL_COLUMNS:
+            inputs[column] = np.zeros(close.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if "PE" not in inputs:
+            inputs["PE"] = close/inputs["EPS"]
+        if "PB" not in inputs:
+            inputs["PB"] = close/_as_of(fundamentals, "book_value", dates, tickers)
+
+    listed = ~np.isnan(close)
+    rows, cols = np.nonzero(listed)
+    symbols = tickers.to_numpy()[cols]
+    raw = pd.DataFrame({
+        "Date": dates.to_numpy()[rows],
+        "symbol": symbols,
+        "name": symbols,
+        "earnings": None,
+        "change": np.nan,
+        **{column: values[listed] for column, values in inputs.items()},
+        # fewer than 50 / 200 days of prices adds no momentum rather than a NaN score
+        "d50_momentum": np.nan_to_num(d50[listed], nan=0.0),
+        "d200_momentum": np.nan_to_num(d200[listed], nan=0.0),
+        "sector": None,
+        "industry": None,
+        "country": None,
+        "owned": False,
+        "forward_return": forward[listed],
+    })
+
+    # rows are in date order, so every chunk holds CHUNK_DATES consecutive rebalance dates
+    bounds = np.searchsorted(rows, np.arange(0, len(dates), CHUNK_DATES))
+    chunks = [raw.iloc[start:end] for start, end in zip(bounds, list(bounds[1:]) + [len(raw)]) if end > start]
+    with ThreadPoolExecutor(max(1, workers)) as pool:
+        scored = list(pool.map(lambda chunk: _score_chunk(chunk, momentum_method, buy_threshold), chunks))
+    if not scored:
+        return pd.DataFrame(columns=["Date", "Ticker", "Final Score", "Value Score", "Momentum Score", "Signal", "Forward Return"])
+    return pd.concat(scored, ignore_index=True)
+
+def information_coefficient(panel: pd.DataFrame) -> pd.Series:
+    """Spearman correlation of Final Score and Forward Return per rebalance date."""
+    panel = panel.dropna(subset=["Final Score", "Forward Return"])
+    ranks = panel[["Final Score", "Forward Return"]].groupby(panel["Date"]).rank()
+    score, forward = ranks["Final Score"], ranks["Forward Return"]
+    grouped = pd.DataFrame({
+        "Date": panel["Date"], "s": score, "f": forward, "ss": score*score, "ff": forward*forward, "sf": score*forward,
+    }).groupby("Date")
+    sums, n = grouped.sum(), grouped.size()
+    covariance = sums["sf"] - sums["s"]*sums["f"]/n
+    variance = (sums["ss"] - sums["s"]**2/n)*(sums["ff"] - sums["f"]**2/n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (covariance/np.sqrt(variance)).rename("IC")
+
+def hit_rates(panel: pd.DataFrame) -> pd.Series:
+    """Share of Buy signals followed by a gain, Sell signals followed by a loss, and both together."""
+    panel = panel.dropna(subset=["Forward Return"])
+    buy = panel.loc[panel["Signal"] == "Buy", "Forward Return"]
+    sell = panel.loc[panel["Signal"] == "Sell", "Forward Return"]
+    hits = (buy > 0).sum() + (sell < 0).sum()
+    return pd.Series({
+        "Buy": (buy > 0).mean() if len(buy) else np.nan,
+        "Sell": (sell < 0).mean() if len(sell) else np.nan,
+        "Overall": hits/(len(buy) + len(sell)) if len(buy) + len(sell) else np.nan,
+    }, name="Hit Rate")
+
+def bucket_performance(panel: pd.DataFrame, periods_per_year: int = 12) -> pd.DataFrame:
+    """
+    Forward returns per signal bucket: observations, mean and median return, share of positive returns and the
+    annualized return of holding the bucket equally weighted. A Buy - Sell row holds the long/short spread.
+    """
+    panel = panel.dropna(subset=["Forward Return"])
+    by_date = panel.pivot_table(index="Date", columns="Signal", values="Forward Return", aggfunc="mean").reindex(columns=SIGNALS)
+    by_date["Buy - Sell"] = by_date["Buy"] - by_date["Sell"]
+    grouped = panel.groupby("Signal")["Forward Return"]
+    table = pd.DataFrame({
+        "Count": grouped.size(),
+        "Mean Return": grouped.mean(),
+        "Median Return": grouped.median(),
+        "Positive": grouped.apply(lambda returns: (returns > 0).mean()),
+    }).reindex(SIGNALS + ["Buy - Sell"])
+    table.loc["Buy - Sell", "Mean Return"] = by_date["Buy - Sell"].mean()
+    periods = by_date.notna().sum()
+    growth = (1 + by_date.fillna(0)).prod()
+    table["Annualized"] = (growth**(periods_per_year/periods.where(periods > 0)) - 1).reindex(table.index)
+    table.index.name = "Signal"
+    return table
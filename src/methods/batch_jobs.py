@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Callable
+
+import pandas as pd
+
+from .collector import ResultCollector
+from .fetcher import MAX_WORKERS, fetch_many
+from .screener_methods import Stock
+
+# finished runs are served to every session for this long before a new run is started
+RESULTS_TTL = 15*60
+
+class BatchJob:
+    """
+    One screener run on a background thread. Rows can be read while tickers are still being fetched,
+    and the fetched Stocks are kept so a detail view does not download them again.
+    """
+    def __init__(self, symbols: list[str], fetch: Callable = Stock, max_workers: int = MAX_WORKERS):
+        self.symbols = list(symbols)
+        self.fetch = fetch
+        self.max_workers = max_workers
+        self.collector = ResultCollector()
+        self.stocks = {}
+        self.errors = {}
+        self.timings = pd.DataFrame(columns=["Ticker", "Seconds", "Attempts", "Error"])
+        self.n_done = 0
+        self.started_at = time.time()
+        self.finished_at = None
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name="batch-job", daemon=True)
+        self.thread.start()
+
+    def _fetch(self, symbol: str) -> tuple:
+        stock = self.fetch(symbol)
+        return stock, stock.summary()
+
+    def _on_done(self, outcome: dict, n_done: int, n_total: int) -> None:
+        with self.lock:
+            if outcome["error"] is None:
+                stock, summary = outcome["result"]
+                self.stocks[outcome["symbol"]] = stock
+                self.collector.add(summary)
+            else:
+                self.errors[outcome["symbol"]] = str(outcome["error"])
+            self.n_done = n_done
+
+    def _run(self) -> None:
+        try:
+            _, self.timings = fetch_many(self.symbols, self._fetch, max_workers=self.max_workers, on_done=self._on_done)
+        finally:
+            self.finished_at = time.time()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def progress(self) -> float:
+        return self.n_done/len(self.symbols) if self.symbols else 1.0
+
+    def fresh(self, ttl: float = RESULTS_TTL) -> bool:
+        """Still running or finished less than ttl seconds ago."""
+        return not self.done or time.time() - self.finished_at < ttl # type: ignore
+
+    def frame(self) -> pd.DataFrame:
+        """Rows of the tickers finished so far, best score first."""
+        with self.lock:
+            df = self.collector.to_frame()
+        if df.empty:
+            return df
+        return df.sort_values(by="Final Score", ascending=False).reset_index(drop=True)
+
+    def stock(self, symbol: str) -> Stock | None:
+        return self.stocks.get(symbol)
+
+class BatchJobs:
+    """
+    Screener runs by name shared by every session of the app process.
+    Asking for a name that is running or finished within ttl returns that run instead of starting a new crawl.
+    """
+    def __init__(self, ttl: float = RESULTS_TTL, fetch: Callable = Stock):
+        self.ttl = ttl
+        self.fetch = fetch
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def start(self, name: str, symbols: list[str]) -> BatchJob:
+        with self.lock:
+            # expired runs hold every fetched Stock, they are dropped instead of kept for the life of the process
+            self.jobs = {key: job for key, job in self.jobs.items() if job.fresh(self.ttl)}
+            job = self.jobs.get(name)
+            if job is None:
+                job = self.jobs[name] = BatchJob(symbols, self.fetch)
+            return job
+
+    def get(self, name: str) -> BatchJob | None:
+        return self.jobs.get(name)
+
+    def find_stock(self, symbol: str) -> Stock | None:
+        """The most recently fetched Stock for symbol in any run."""
+        with self.lock:
+            jobs = sorted(self.jobs.values(), key=lambda job: job.started_at, reverse=True)
+        for job in jobs:
+            stock = job.stock(symbol)
+            if stock is not None:
+                return stock
+        return None
@@ -0,0 +1,62 @@
+import os
+
+import pandas as pd
+
+class ResultCollector:
+    """
+    Collects summary rows as tickers finish and builds the results frame once at the end.
+    With a checkpoint path every row is also appended to a csv, so an interrupted run can resume.
+    """
+    def __init__(self, checkpoint_path=None, resume: bool = False, key: str = "Ticker"):
+        self.checkpoint_path = checkpoint_path
+        self.key = key
+        self.rows = []
+        self.columns = None
+        if checkpoint_path is None:
+            return
+        if resume and os.path.exists(checkpoint_path):
+            self._load_checkpoint()
+        elif os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    def _load_checkpoint(self) -> None:
+        try:
+            df = pd.read_csv(self.checkpoint_path, on_bad_lines="skip")
+        except pd.errors.EmptyDataError:
+            return
+        # a crash mid write leaves a short last line, drop rows that did not get their last field
+        df = df[df[df.columns[-1]].notna()]
+        self.columns = list(df.columns)
+        self.rows = df.to_dict("records")
+
+    @property
+    def completed(self) -> set:
+        return {row[self.key] for row in self.rows}
+
+    def add(self, summary) -> None:
+        """Add a Stock.summary() frame or a row dict."""
+        rows = summary.to_dict("records") if isinstance(summary, pd.DataFrame) else [summary]
+        if not rows:
+            return
+        if self.columns is None:
+            self.columns = list(rows[0])
+        self.rows.extend(rows)
+        if self.checkpoint_path is not None:
+            self._append(rows)
+
+    def _append(self, rows: list[dict]) -> None:
+        write_header = not os.path.exists(self.checkpoint_path) or os.path.getsize(self.checkpoint_path) == 0
+        # rows are formatted first and written in one call so a line is never split across writes
+        text = pd.DataFrame(rows).reindex(columns=self.columns).to_csv(index=False, header=write_header)
+        with open(self.checkpoint_path, "a", encoding="utf-8", newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def to_frame(self) -> pd.DataFrame:
+        if not self.rows:
+            return pd.DataFrame()
+        return pd.DataFrame(self.rows, columns=self.columns)
+
+    def __len__(self) -> int:
+        return len(self.rows)
@@ -0,0 +1,81 @@
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from . import scraper
+from .model_methods import get_data
+from .panel_store import PANEL_DIR, PanelStore
+
+PROCESSES = 4
+# concurrent page fetches per host across all worker processes
+PER_HOST = 2
+FAILURES_FILE = "failures.csv"
+
+def _init_worker(limits: dict) -> None:
+    scraper.HOST_LIMITS = limits
+
+def _build_one(ticker: str, frequency: str, cache_only: bool) -> pd.DataFrame:
+    return get_data(ticker, frequency=frequency, cache_only=cache_only)
+
+def _record_failure(out_dir: str, ticker: str, error: str) -> None:
+    path = os.path.join(out_dir, FAILURES_FILE)
+    row = pd.DataFrame([{"Ticker": ticker, "Error": error, "Time": pd.Timestamp.now().round("s")}])
+    row.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+def load_failures(out_dir: str = PANEL_DIR) -> pd.DataFrame:
+    """Last failure of every ticker that has not been built since."""
+    path = os.path.join(out_dir, FAILURES_FILE)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["Ticker", "Error", "Time"])
+    failures = pd.read_csv(path).drop_duplicates("Ticker", keep="last")
+    built = set(PanelStore(out_dir).tickers())
+    return failures[~failures["Ticker"].isin(built)].reset_index(drop=True)
+
+def build_dataset(
+    tickers: list[str],
+    out_dir: str = PANEL_DIR,
+    frequency: str = "quarterly",
+    processes: int = PROCESSES,
+    per_host: int = PER_HOST,
+    force: bool = False,
+    cache_only: bool = False,
+    on_done: Callable | None = None,
+) -> pd.DataFrame:
+    """
+    Run get_data for every ticker across a process pool and upsert each frame into the PanelStore at out_dir
+    as soon as it is done. Tickers already in the store are skipped unless force is set, so an interrupted build
+    picks up where it stopped. Failed tickers are appended to failures.csv with their error and retried on the next build.
+    on_done(ticker, error, n_done, n_total) is called in this process after every ticker.
+    Returns the failures of this build, read the frames with PanelStore.frames.
+    """
+    store = PanelStore(out_dir)
+    tickers = list(dict.fromkeys(tickers))
+    done = set() if force else set(store.tickers())
+    todo = [ticker for ticker in tickers if ticker not in done]
+
+    # one semaphore per host shared by every worker, the scraper holds it while fetching a page
+    ctx = mp.get_context()
+    hosts = {urlparse(scraper.Ticker(ticker)._get_url(ticker)).netloc for ticker in todo}
+    limits = {host: ctx.BoundedSemaphore(per_host) for host in hosts}
+
+    failures = []
+    if todo:
+        with ProcessPoolExecutor(max_workers=processes, mp_context=ctx, initializer=_init_worker, initargs=(limits,)) as pool:
+            futures = {pool.submit(_build_one, ticker, frequency, cache_only): ticker for ticker in todo}
+            for n_done, future in enumerate(as_completed(futures), start=1):
+                ticker = futures[future]
+                error = ""
+                try:
+                    store.upsert(future.result())
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    failures.append({"Ticker": ticker, "Error": error, "Time": pd.Timestamp.now().round("s")})
+                    _record_failure(out_dir, ticker, error)
+                if on_done is not None:
+                    on_done(ticker, error, n_done, len(todo))
+
+    return pd.DataFrame(failures, columns=["Ticker", "Error", "Time"])
@@ -0,0 +1,96 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
+
+import pandas as pd
+
+MAX_WORKERS = 8
+RATE_PER_SECOND = 4.0
+BURST = 8
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+def is_rate_limited(error: Exception) -> bool:
+    return "429" in str(error) or "Too Many Requests" in str(error)
+
+class TokenBucket:
+    """
+    Thread safe token bucket, acquire() blocks until a request is allowed.
+    """
+    def __init__(self, rate: float = RATE_PER_SECOND, burst: int = BURST):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated)*self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens)/self.rate
+            time.sleep(wait)
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    # full jitter: uniform between 0 and the exponential step
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+def fetch_one(symbol: str, fetch: Callable, bucket: TokenBucket, max_retries: int = MAX_RETRIES) -> dict:
+    """Run fetch(symbol) behind the rate limiter, retrying rate limited calls with exponential backoff."""
+    start = time.perf_counter()
+    attempts = 0
+    while True:
+        bucket.acquire()
+        attempts += 1
+        try:
+            result = fetch(symbol)
+            error = None
+            break
+        except Exception as e:
+            if is_rate_limited(e) and attempts <= max_retries:
+                time.sleep(backoff_delay(attempts - 1))
+                continue
+            result = None
+            error = e
+            break
+    return {
+        "symbol": symbol,
+        "result": result,
+        "error": error,
+        "attempts": attempts,
+        "seconds": time.perf_counter() - start,
+    }
+
+def fetch_many(symbols: list[str], fetch: Callable, max_workers: int = MAX_WORKERS, rate: float = RATE_PER_SECOND,
+               burst: int = BURST, max_retries: int = MAX_RETRIES, on_done: Callable | None = None) -> tuple[dict, pd.DataFrame]:
+    """
+    Fetch all symbols on a thread pool sharing one token bucket.
+    on_done(outcome, n_done, n_total) is called from the calling thread as each symbol finishes.
+    Returns the successful results by symbol and a per-ticker timing frame.
+    """
+    bucket = TokenBucket(rate=rate, burst=burst)
+    results = {}
+    timings = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(fetch_one, symbol, fetch, bucket, max_retries) for symbol in symbols]
+        for n_done, future in enumerate(as_completed(futures), start=1):
+            outcome = future.result()
+            if outcome["error"] is None:
+                results[outcome["symbol"]] = outcome["result"]
+            timings.append({
+                "Ticker": outcome["symbol"],
+                "Seconds": round(outcome["seconds"], 3),
+                "Attempts": outcome["attempts"],
+                "Error": "" if outcome["error"] is None else str(outcome["error"]),
+            })
+            if on_done is not None:
+                on_done(outcome, n_done, len(symbols))
+    return results, pd.DataFrame(timings, columns=["Ticker", "Seconds", "Attempts", "Error"])
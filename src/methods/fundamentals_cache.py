@@ -0,0 +1,216 @@
+import argparse
+import datetime
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("STOCK_PREDICTOR_CACHE_DIR", os.path.join(current_dir, "..", "..", "data", "cache"))
+CACHE_PATH = os.path.join(CACHE_DIR, "fundamentals.sqlite")
+
+MINUTE = 60
+HOUR = 60*MINUTE
+DAY = 24*HOUR
+# time to live in seconds per field group
+TTLS = {
+    "quote": 15*MINUTE,
+    "fundamentals": 1*DAY,
+    "officers": 7*DAY,
+    "insider": 1*DAY,
+    "calendar": 1*DAY,
+}
+# groups the yfinance .info dict is split into, all of them come back from one request
+INFO_GROUPS = ("quote", "fundamentals", "officers")
+
+QUOTE_KEYS = {
+    "currentPrice", "previousClose", "open", "volume", "averageVolume", "averageVolume10days", "marketCap",
+    "enterpriseValue", "trailingPE", "forwardPE", "priceToBook", "priceToSalesTrailing12Months",
+    "dividendYield", "trailingAnnualDividendYield", "52WeekChange", "SandP52WeekChange",
+}
+QUOTE_PREFIXES = ("regularMarket", "fiftyDay", "twoHundredDay", "fiftyTwoWeek", "bid", "ask", "day", "preMarket", "postMarket")
+
+def info_group(key: str) -> str:
+    if key == "companyOfficers":
+        return "officers"
+    if key in QUOTE_KEYS or key.startswith(QUOTE_PREFIXES):
+        return "quote"
+    return "fundamentals"
+
+def split_info(info: dict) -> dict:
+    groups = {group: {} for group in INFO_GROUPS}
+    for key, value in info.items():
+        groups[info_group(key)][key] = value
+    return groups
+
+def join_info(groups: dict) -> dict:
+    info = {}
+    for group in INFO_GROUPS:
+        info.update(groups[group])
+    return info
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return {"__date__": value.isoformat()}
+    if pd.isna(value):
+        return None
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Cannot serialize {type(value)}")
+
+def _json_object_hook(value: dict):
+    if set(value) == {"__date__"}:
+        text = value["__date__"]
+        return datetime.datetime.fromisoformat(text) if "T" in text else datetime.date.fromisoformat(text)
+    return value
+
+def encode(group: str, payload) -> str:
+    if group == "insider":
+        return payload.to_json(orient="split", index=False)
+    return json.dumps(payload, default=_json_default)
+
+def decode(group: str, text: str):
+    if group == "insider":
+        # yfinance returns nullable dtypes for this table, restore them after the json round trip
+        return pd.read_json(io.StringIO(text), orient="split").convert_dtypes()
+    return json.loads(text, object_hook=_json_object_hook)
+
+class FundamentalsCache:
+    """
+    On-disk SQLite cache of raw yfinance payloads, one row per ticker and field group.
+    A group is served while it is younger than its TTL.
+    """
+    def __init__(self, path: str = CACHE_PATH, ttls: dict | None = None):
+        self.path = path
+        self.ttls = {**TTLS, **(ttls or {})}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS payloads ("
+                "ticker TEXT NOT NULL, grp TEXT NOT NULL, fetched_at REAL NOT NULL, payload TEXT NOT NULL, "
+                "PRIMARY KEY (ticker, grp))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # one short lived connection per call so the cache can be shared by fetcher threads
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def get(self, ticker: str, now: float | None = None) -> dict:
+        """Fresh payloads of ticker by group, stale and missing groups are left out."""
+        now = time.time() if now is None else now
+        with self._connect() as con:
+            rows = con.execute("SELECT grp, fetched_at, payload FROM payloads WHERE ticker = ?", (ticker,)).fetchall()
+        return {
+            group: decode(group, payload)
+            for group, fetched_at, payload in rows
+            if now - fetched_at < self.ttls.get(group, 0)
+        }
+
+    def get_group(self, group: str, tickers: list[str] | None = None) -> dict:
+        """Payloads of one group by ticker regardless of age, e.g. to rescore without refetching."""
+        with self._connect() as con:
+            rows = con.execute("SELECT ticker, payload FROM payloads WHERE grp = ?", (group,)).fetchall()
+        wanted = set(tickers) if tickers is not None else None
+        return {ticker: decode(group, payload) for ticker, payload in rows if wanted is None or ticker in wanted}
+
+    def put(self, ticker: str, payloads: dict, fetched_at: float | None = None) -> None:
+        """Store payloads by group, info dicts can be passed under "info" and are split into their groups."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        payloads = dict(payloads)
+        if "info" in payloads:
+            payloads.update(split_info(payloads.pop("info")))
+        rows = [(ticker, group, fetched_at, encode(group, payload)) for group, payload in payloads.items() if payload is not None]
+        with self._connect() as con:
+            con.executemany("INSERT OR REPLACE INTO payloads VALUES (?, ?, ?, ?)", rows)
+
+    def inspect(self, tickers: list[str] | None = None, now: float | None = None) -> pd.DataFrame:
+        now = time.time() if now is None else now
+        with self._connect() as con:
+            df = pd.read_sql_query("SELECT ticker, grp, fetched_at, length(payload) AS bytes FROM payloads", con)
+        if tickers:
+            df = df[df["ticker"].isin(tickers)]
+        df["age_hours"] = ((now - df["fetched_at"])/HOUR).round(2)
+        df["fresh"] = (now - df["fetched_at"]) < df["grp"].map(self.ttls).fillna(0)
+        df["fetched_at"] = pd.to_datetime(df["fetched_at"], unit="s").dt.round("s")
+        return df.rename(columns={"grp": "group"}).sort_values(["ticker", "group"]).reset_index(drop=True)
+
+    def purge(self, tickers: list[str] | None = None, expired_only: bool = False, now: float | None = None) -> int:
+        """Delete cached payloads, optionally only for tickers and/or only past their TTL. Returns rows deleted."""
+        now = time.time() if now is None else now
+        with self._connect() as con:
+            rows = con.execute("SELECT ticker, grp, fetched_at FROM payloads").fetchall()
+            doomed = [
+                (ticker, group) for ticker, group, fetched_at in rows
+                if (not tickers or ticker in tickers)
+                and (not expired_only or now - fetched_at >= self.ttls.get(group, 0))
+            ]
+            con.executemany("DELETE FROM payloads WHERE ticker = ? AND grp = ?", doomed)
+        return len(doomed)
+
+@lru_cache(maxsize=None)
+def default_cache() -> FundamentalsCache | None:
+    """Process wide cache used by Stock, disabled by setting STOCK_PREDICTOR_NO_CACHE."""
+    if os.environ.get("STOCK_PREDICTOR_NO_CACHE"):
+        return None
+    return FundamentalsCache()
+
+def _read_symbols(args) -> list[str]:
+    symbols = list(args.tickers)
+    for path in args.csv or []:
+        symbols += pd.read_csv(path)["Ticker"].dropna().astype(str).tolist()
+    return list(dict.fromkeys(symbols))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect, warm and purge the yfinance fundamentals cache.")
+    parser.add_argument("--path", default=CACHE_PATH, help="cache database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    inspect_parser = commands.add_parser("inspect", help="list cached payloads with age and freshness")
+    inspect_parser.add_argument("tickers", nargs="*")
+
+    warm_parser = commands.add_parser("warm", help="fetch tickers whose payloads are missing or stale")
+    warm_parser.add_argument("tickers", nargs="*")
+    warm_parser.add_argument("--csv", action="append", help="ticker csv with a Ticker column, can be repeated")
+    warm_parser.add_argument("--workers", type=int, default=8)
+    warm_parser.add_argument("--rate", type=float, default=4.0, help="requests per second")
+
+    purge_parser = commands.add_parser("purge", help="delete cached payloads")
+    purge_parser.add_argument("tickers", nargs="*")
+    purge_parser.add_argument("--expired", action="store_true", help="only delete payloads past their TTL")
+
+    args = parser.parse_args(argv)
+    cache = FundamentalsCache(args.path)
+
+    if args.command == "inspect":
+        df = cache.inspect(args.tickers or None)
+        with pd.option_context("display.max_rows", None, "display.width", 200):
+            print(df if not df.empty else "Cache is empty.")
+        print(f"{df['ticker'].nunique()} tickers, {len(df)} payloads, {int(df['fresh'].sum())} fresh", file=sys.stderr)
+    elif args.command == "warm":
+        from .fetcher import fetch_many
+        from .snapshot import StockSnapshot
+        symbols = _read_symbols(args)
+        start = time.perf_counter()
+        results, timings = fetch_many(symbols, lambda symbol: StockSnapshot.fetch(symbol, cache=cache), max_workers=args.workers, rate=args.rate)
+        print(f"Warmed {len(results)}/{len(symbols)} tickers in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        for _, row in timings[timings["Error"] != ""].iterrows():
+            print(f"[ERROR] {row['Ticker']}: {row['Error']}", file=sys.stderr)
+    elif args.command == "purge":
+        deleted = cache.purge(args.tickers or None, expired_only=args.expired)
+        print(f"Deleted {deleted} payloads", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
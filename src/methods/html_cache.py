@@ -0,0 +1,124 @@
+import datetime
+import gzip
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from .fundamentals_cache import CACHE_DIR, DAY
+
+HTML_CACHE_DIR = os.path.join(CACHE_DIR, "html")
+# a page younger than this is served instead of fetching it again
+TTL = 7*DAY
+# pages older than this are evicted, the newest ones are kept up to MAX_BYTES of compressed html
+MAX_AGE = 365*DAY
+MAX_BYTES = 512*1024*1024
+
+class HtmlCache:
+    """
+    Gzipped raw html of scraped pages. Blobs are stored once per content hash,
+    an SQLite index maps (url, frequency, fetch date) to the hash.
+    Expired pages stay available for reparsing until they are evicted by age or size.
+    """
+    def __init__(self, path: str = HTML_CACHE_DIR, ttl: float = TTL, max_age: float = MAX_AGE, max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(path, "blobs"), exist_ok=True)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "url TEXT NOT NULL, frequency TEXT NOT NULL, fetch_date TEXT NOT NULL, fetched_at REAL NOT NULL, digest TEXT NOT NULL, "
+                "PRIMARY KEY (url, frequency, fetch_date))"
+            )
+            con.execute("CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, bytes INTEGER NOT NULL)")
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(os.path.join(self.path, "index.sqlite"), timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def _blob(self, digest: str) -> str:
+        return os.path.join(self.path, "blobs", digest[:2], f"{digest}.html.gz")
+
+    def get(self, url: str, frequency: str, max_age: float | None = None, now: float | None = None) -> str | None:
+        """Newest cached html of url younger than max_age (the TTL by default), None if there is none."""
+        now = time.time() if now is None else now
+        max_age = self.ttl if max_age is None else max_age
+        with self._connect() as con:
+            row = con.execute(
+                "SELECT digest, fetched_at FROM pages WHERE url = ? AND frequency = ? ORDER BY fetched_at DESC LIMIT 1",
+                (url, frequency),
+            ).fetchone()
+        if row is None or now - row[1] >= max_age or not os.path.exists(self._blob(row[0])):
+            return None
+        with gzip.open(self._blob(row[0]), "rt", encoding="utf-8") as f:
+            return f.read()
+
+    def put(self, url: str, frequency: str, html: str, fetched_at: float | None = None) -> str:
+        """Store a fetched page and return its content hash, identical pages share one blob."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(gzip.compress(data, mtime=0))
+            os.replace(tmp_path, path)
+        fetch_date = datetime.date.fromtimestamp(fetched_at).isoformat()
+        with self._connect() as con:
+            con.execute("INSERT OR REPLACE INTO blobs VALUES (?, ?)", (digest, os.path.getsize(path)))
+            con.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)", (url, frequency, fetch_date, fetched_at, digest))
+        self.evict()
+        return digest
+
+    def size(self) -> int:
+        """Compressed bytes on disk."""
+        with self._connect() as con:
+            return con.execute("SELECT coalesce(sum(bytes), 0) FROM blobs").fetchone()[0]
+
+    def evict(self, now: float | None = None) -> int:
+        """Drop pages older than max_age, then the oldest pages until the blobs fit in max_bytes. Returns pages deleted."""
+        now = time.time() if now is None else now
+        with self._connect() as con:
+            deleted = con.execute("DELETE FROM pages WHERE fetched_at < ?", (now - self.max_age,)).rowcount
+            total = con.execute("SELECT coalesce(sum(bytes), 0) FROM blobs").fetchone()[0]
+            if total > self.max_bytes:
+                pages = con.execute("SELECT url, frequency, fetch_date, digest FROM pages ORDER BY fetched_at").fetchall()
+                refs = {}
+                for *_, digest in pages:
+                    refs[digest] = refs.get(digest, 0) + 1
+                sizes = dict(con.execute("SELECT digest, bytes FROM blobs").fetchall())
+                doomed = []
+                for url, frequency, fetch_date, digest in pages:
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((url, frequency, fetch_date))
+                    refs[digest] -= 1
+                    if refs[digest] == 0:
+                        total -= sizes.get(digest, 0)
+                con.executemany("DELETE FROM pages WHERE url = ? AND frequency = ? AND fetch_date = ?", doomed)
+                deleted += len(doomed)
+            orphans = [digest for (digest,) in con.execute("SELECT digest FROM blobs WHERE digest NOT IN (SELECT digest FROM pages)")]
+            con.executemany("DELETE FROM blobs WHERE digest = ?", [(digest,) for digest in orphans])
+        for digest in orphans:
+            if os.path.exists(self._blob(digest)):
+                os.remove(self._blob(digest))
+        return deleted
+
+@lru_cache(maxsize=None)
+def default_html_cache() -> HtmlCache | None:
+    """Process wide cache used by scraper.Ticker, disabled by setting STOCK_PREDICTOR_NO_CACHE."""
+    if os.environ.get("STOCK_PREDICTOR_NO_CACHE"):
+        return None
+    return HtmlCache()
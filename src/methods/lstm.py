@@ -0,0 +1,473 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.preprocessing import MinMaxScaler
+
+METRIC_COLUMNS = ["price_mae", "price_rmse", "price_mape", "directional_accuracy", "r2"]
+EVALUATION_COLUMNS = ["ticker", "n_points"] + METRIC_COLUMNS + ["status", "error"]
+
+class NextDayLSTM(nn.Module):
+    """
+    LSTM over a window of scaled closes predicting the next one.
+    With n_heads > 1 every ticker gets its own output layer on top of the shared LSTM, picked by ticker id.
+    """
+    def __init__(self, input_size=1, hidden_size=64, num_layers=2, dropout=0.1, n_heads=1):
+        super().__init__()
+        self.lstm = nn.LSTM(
+            input_size=input_size,
+            hidden_size=hidden_size,
+            num_layers=num_layers,
+            dropout=dropout if num_layers > 1 else 0.0,
+            batch_first=True,
+        )
+        self.fc = nn.Linear(hidden_size, 1)
+        self.head_weight = nn.Parameter(torch.zeros(n_heads, hidden_size)) if n_heads > 1 else None
+        self.head_bias = nn.Parameter(torch.zeros(n_heads)) if n_heads > 1 else None
+
+    def forward(self, x, ticker_ids=None):
+        out, _ = self.lstm(x)
+        last = out[:, -1, :]
+        if self.head_weight is None or ticker_ids is None:
+            return self.fc(last)
+        # per ticker correction on top of the shared output layer
+        return self.fc(last) + ((last*self.head_weight[ticker_ids]).sum(-1) + self.head_bias[ticker_ids]).unsqueeze(-1)
+
+def close_values(dataset, value_column=None):
+    """Float32 closes without NaN and their index from a Series, DataFrame ("Close" or the first numeric column) or array."""
+    if isinstance(dataset, pd.Series):
+        series = dataset.astype(float).dropna()
+        return series.to_numpy(dtype=np.float32), series.index
+
+    if isinstance(dataset, pd.DataFrame):
+        if value_column is None:
+            if "Close" in dataset.columns:
+                value_column = "Close"
+            else:
+                numeric_cols = dataset.select_dtypes(include=[np.number]).columns
+                if len(numeric_cols) == 0:
+                    raise ValueError("DataFrame has no numeric columns.")
+                value_column = numeric_cols[0]
+        series = dataset[value_column].astype(float).dropna()
+        return series.to_numpy(dtype=np.float32), series.index
+
+    arr = np.asarray(dataset, dtype=np.float32).reshape(-1)
+    arr = arr[~np.isnan(arr)]
+    return arr, None
+
+def build_sequences(values: np.ndarray, sequence_length: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Windows of sequence_length values and the value after each, as read only views on values.
+    Row i of X is values[i:i+sequence_length] and y[i] is values[i+sequence_length], nothing is copied.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    if len(values) <= sequence_length:
+        return np.empty((0, sequence_length), dtype=np.float32), np.empty(0, dtype=np.float32)
+    return sliding_window_view(values[:-1], sequence_length), values[sequence_length:]
+
+def _batch(windows: np.ndarray, rows: np.ndarray) -> torch.Tensor:
+    # gathering the rows is the only copy, one batch at a time
+    return torch.from_numpy(windows[rows]).unsqueeze(-1)
+
+def _train_lstm_model(
+    windows,
+    targets,
+    rows=None,
+    hidden_size=64,
+    num_layers=2,
+    dropout=0.1,
+    batch_size=None,
+    epochs=5,
+    learning_rate=1e-3,
+    device=None,
+    verbose=True,
+    log_every=1,
+    ticker_ids=None,
+    n_heads=1,
+    seed=42,
+):
+    """
+    Fit a NextDayLSTM on the windows at rows (all of them by default) of a window view and their targets.
+    batch_size None trains on all rows at once, otherwise on shuffled mini-batches gathered from the view.
+    ticker_ids (one per row) select the output heads.
+    """
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+
+    model = NextDayLSTM(
+        input_size=1,
+        hidden_size=hidden_size,
+        num_layers=num_layers,
+        dropout=dropout,
+        n_heads=n_heads,
+    ).to(device)
+
+    criterion = nn.MSELoss()
+    optimizer = optim.Adam(model.parameters(), lr=learning_rate)
+    losses = []
+    rows = np.arange(len(windows)) if rows is None else np.asarray(rows)
+    n = len(rows)
+    y_all = torch.from_numpy(targets[rows]).unsqueeze(-1)
+    ids_all = torch.from_numpy(np.asarray(ticker_ids, dtype=np.int64)) if ticker_ids is not None else None
+    generator = torch.Generator().manual_seed(seed)
+
+    full_batch = batch_size is None or batch_size >= n
+    if full_batch:
+        xb_full = _batch(windows, rows).to(device)
+    for epoch in range(epochs):
+        model.train()
+        if full_batch:
+            batches = [(xb_full, y_all.to(device), ids_all.to(device) if ids_all is not None else None)]
+        else:
+            order = torch.randperm(n, generator=generator).numpy()
+            batches = (
+                (
+                    _batch(windows, rows[chunk]).to(device),
+                    y_all[chunk].to(device),
+                    ids_all[chunk].to(device) if ids_all is not None else None,
+                )
+                for chunk in np.array_split(order, range(batch_size, n, batch_size))
+            )
+        batch_losses = []
+        for xb, yb, ids in batches:
+            optimizer.zero_grad()
+            pred = model(xb, ids)
+            loss = criterion(pred, yb)
+            loss.backward()
+            optimizer.step()
+            batch_losses.append(loss.item())
+
+        epoch_loss = float(np.mean(batch_losses))
+        losses.append(epoch_loss)
+        if verbose and ((epoch + 1) % log_every == 0 or epoch == 0):
+            print(f"Epoch {epoch + 1}/{epochs} - loss: {epoch_loss:.6f}")
+
+    return model, losses, device
+
+def _predict(model, windows, rows, device, ticker_ids=None, batch_size=65536) -> np.ndarray:
+    model.eval()
+    predictions = []
+    with torch.no_grad():
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start:start + batch_size]
+            ids = torch.from_numpy(ticker_ids[start:start + batch_size]).to(device) if ticker_ids is not None else None
+            predictions.append(model(_batch(windows, chunk).to(device), ids).cpu().numpy().reshape(-1))
+    return np.concatenate(predictions) if predictions else np.empty(0, dtype=np.float32)
+
+def price_metrics(actual: np.ndarray, predicted: np.ndarray, prior: np.ndarray) -> dict:
+    """Metrics of predicted next day prices, prior holds the price before each actual one."""
+    valid_mask = ~np.isnan(actual) & ~np.isnan(predicted)
+    if not np.any(valid_mask):
+        raise ValueError("Unable to compute valid price metrics.")
+    y_true, y_pred, prior = actual[valid_mask], predicted[valid_mask], prior[valid_mask]
+
+    directional_accuracy = float(np.mean(np.sign(y_true - prior) == np.sign(y_pred - prior)))
+    mae = float(np.mean(np.abs(y_true - y_pred)))
+    rmse = float(np.sqrt(np.mean((y_true - y_pred) ** 2)))
+
+    non_zero = np.abs(y_true) > 1e-8
+    if np.any(non_zero):
+        mape = float(np.mean(np.abs((y_true[non_zero] - y_pred[non_zero]) / y_true[non_zero])) * 100)
+    else:
+        mape = np.nan
+
+    ss_res = float(np.sum((y_true - y_pred) ** 2))
+    ss_tot = float(np.sum((y_true - np.mean(y_true)) ** 2))
+    r2 = float(1 - (ss_res / ss_tot)) if ss_tot > 1e-12 else np.nan
+
+    return {
+        "price_mae": mae,
+        "price_rmse": rmse,
+        "price_mape": mape,
+        "directional_accuracy": directional_accuracy,
+        "r2": r2,
+    }
+
+def _split(values: np.ndarray, sequence_length: int, test_size: float) -> int:
+    if len(values) <= sequence_length + 20:
+        raise ValueError("Dataset is too small for the chosen sequence length.")
+    if not 0 < test_size < 1:
+        raise ValueError("test_size must be between 0 and 1.")
+    split_idx = int(len(values) * (1 - test_size))
+    if split_idx <= sequence_length:
+        raise ValueError("Training split is too small. Reduce sequence_length or test_size.")
+    return split_idx
+
+def train_evaluate_lstm_next_day(
+    dataset,
+    value_column=None,
+    sequence_length=60,
+    test_size=0.2,
+    hidden_size=64,
+    num_layers=2,
+    dropout=0.1,
+    batch_size=None,
+    epochs=20,
+    learning_rate=1e-3,
+    device=None,
+    verbose=True,
+    seed=42,
+):
+    """Train one LSTM on the first 1 - test_size of a price series and evaluate next day predictions on the rest."""
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+
+    values, index = close_values(dataset, value_column=value_column)
+    split_idx = _split(values, sequence_length, test_size)
+
+    scaler = MinMaxScaler()
+    scaler.fit(values[:split_idx].reshape(-1, 1))
+    scaled = scaler.transform(values.reshape(-1, 1)).astype(np.float32).reshape(-1)
+
+    # the test windows reach back sequence_length values into the training period for their context
+    windows, targets = build_sequences(scaled, sequence_length)
+    train_rows = np.arange(split_idx - sequence_length)
+    test_rows = np.arange(split_idx - sequence_length, len(windows))
+
+    model, losses, device = _train_lstm_model(
+        windows=windows,
+        targets=targets,
+        rows=train_rows,
+        hidden_size=hidden_size,
+        num_layers=num_layers,
+        dropout=dropout,
+        batch_size=batch_size,
+        epochs=epochs,
+        learning_rate=learning_rate,
+        device=device,
+        verbose=verbose,
+        seed=seed,
+    )
+
+    pred_scaled = _predict(model, windows, test_rows, device)
+    predicted_prices = scaler.inverse_transform(pred_scaled.reshape(-1, 1)).flatten()
+    actual_prices = scaler.inverse_transform(targets[test_rows].reshape(-1, 1)).flatten()
+    metrics = price_metrics(actual_prices, predicted_prices, values[split_idx - 1:-1])
+
+    if verbose:
+        print("Evaluation metrics (prices):")
+        for name, value in metrics.items():
+            if np.isnan(value):
+                print(f"  {name}: nan")
+            elif "directional_accuracy" in name:
+                print(f"  {name}: {value:.2%}")
+            elif "mape" in name:
+                print(f"  {name}: {value:.2f}%")
+            else:
+                print(f"  {name}: {value:.4f}")
+
+    return {
+        "model": model,
+        "scaler": scaler,
+        "losses": losses,
+        "actual_prices": actual_prices,
+        "predicted_prices": predicted_prices,
+        "price_index": index[split_idx:] if index is not None else np.arange(len(actual_prices)),
+        "metrics": metrics,
+    }
+
+def predict_next_day_price(
+    dataset,
+    value_column=None,
+    sequence_length=40,
+    hidden_size=64,
+    num_layers=2,
+    dropout=0.1,
+    batch_size=32,
+    epochs=5,
+    learning_rate=1e-3,
+    device=None,
+    verbose=False,
+    seed=42,
+):
+    """Train on price series and predict next-day price."""
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+
+    values, index = close_values(dataset, value_column=value_column)
+    if len(values) <= sequence_length:
+        raise ValueError("Dataset is too small for the chosen sequence length.")
+
+    scaler = MinMaxScaler()
+    scaled_values = scaler.fit_transform(values.reshape(-1, 1)).astype(np.float32).flatten()
+    X_all, y_all = build_sequences(scaled_values, sequence_length)
+
+    model, losses, device = _train_lstm_model(
+        windows=X_all,
+        targets=y_all,
+        hidden_size=hidden_size,
+        num_layers=num_layers,
+        dropout=dropout,
+        batch_size=batch_size,
+        epochs=epochs,
+        learning_rate=learning_rate,
+        device=device,
+        verbose=verbose,
+        seed=seed,
+    )
+
+    latest_window = sliding_window_view(scaled_values, sequence_length)
+    next_scaled = _predict(model, latest_window, np.array([len(latest_window) - 1]), device)[0]
+
+    predicted_next_price = float(
+        scaler.inverse_transform(np.array([[next_scaled]], dtype=np.float32))[0, 0]
+    )
+    last_price = float(values[-1])
+
+    return {
+        "predicted_next_price": predicted_next_price,
+        "last_price": last_price,
+        "last_timestamp": index[-1] if index is not None else None,
+        "model": model,
+        "scaler": scaler,
+        "losses": losses,
+    }
+
+def failed_row(ticker: str, n_points, error: Exception) -> dict:
+    """Evaluation row of a ticker that could not be evaluated."""
+    return {"ticker": ticker, "n_points": n_points, **{name: np.nan for name in METRIC_COLUMNS}, "status": "failed", "error": str(error)}
+
+def _sorted_evaluations(rows: list[dict]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=EVALUATION_COLUMNS).sort_values(
+        by=["status", "directional_accuracy", "r2"],
+        ascending=[True, False, False],
+        na_position="last",
+    ).reset_index(drop=True)
+
+class PackedSeries:
+    """
+    Scaled closes of many tickers back to back in one float32 buffer with one window view over all of it.
+    Every ticker is scaled by a MinMaxScaler fitted on its own training part, windows are addressed by start row
+    and none of them crosses from one ticker into the next.
+    """
+    def __init__(self, histories: dict, sequence_length: int, test_size: float):
+        self.sequence_length = sequence_length
+        self.tickers, self.failed = [], []
+        scaled, self.values, self.scalers, self.splits, offsets = [], [], [], [], []
+        offset = 0
+        for ticker, dataset in histories.items():
+            try:
+                values, _ = close_values(dataset)
+                split_idx = _split(values, sequence_length, test_size)
+            except Exception as exc:
+                self.failed.append(failed_row(ticker, int(len(dataset)) if dataset is not None else np.nan, exc))
+                continue
+            scaler = MinMaxScaler().fit(values[:split_idx].reshape(-1, 1))
+            self.tickers.append(ticker)
+            self.values.append(values)
+            self.scalers.append(scaler)
+            self.splits.append(split_idx)
+            scaled.append(scaler.transform(values.reshape(-1, 1)).astype(np.float32).reshape(-1))
+            offsets.append(offset)
+            offset += len(values)
+
+        self.flat = np.concatenate(scaled) if scaled else np.zeros(sequence_length + 1, dtype=np.float32)
+        self.windows, self.targets = build_sequences(self.flat, sequence_length)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        lengths = np.asarray([len(values) for values in self.values], dtype=np.int64)
+        splits = np.asarray(self.splits, dtype=np.int64)
+        # window starts of every ticker, the first split - sequence_length of them are training windows
+        self.train_rows, self.train_ids = self._rows(self.offsets, splits - sequence_length)
+        self.test_rows, self.test_ids = self._rows(self.offsets + splits - sequence_length, lengths - splits)
+
+    @staticmethod
+    def _rows(starts: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        ids = np.repeat(np.arange(len(counts)), counts)
+        first = np.repeat(starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+        return first + np.arange(counts.sum()), ids
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+def evaluate_tickers(
+    histories: dict,
+    sequence_length=30,
+    test_size=0.2,
+    hidden_size=32,
+    num_layers=1,
+    dropout=0.0,
+    batch_size=512,
+    epochs=1,
+    learning_rate=1e-3,
+    per_ticker_heads=True,
+    device=None,
+    verbose=False,
+    seed=42,
+    failed: list | None = None,
+) -> pd.DataFrame:
+    """
+    One LSTM for all tickers: shuffled mini-batches mix the training windows of every ticker, each ticker keeps its
+    own scaler and (with per_ticker_heads) its own output head. All test windows are then predicted in large batches.
+    histories maps ticker to its price history. Returns one row per ticker with the metrics
+    train_evaluate_lstm_next_day reports, see EVALUATION_COLUMNS. failed holds failed_row rows of tickers that
+    could not be loaded, they are included in the result.
+    """
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+    packed = PackedSeries(histories, sequence_length, test_size)
+    if not len(packed):
+        return _sorted_evaluations(list(failed or []) + packed.failed)
+
+    model, _, device = _train_lstm_model(
+        windows=packed.windows,
+        targets=packed.targets,
+        rows=packed.train_rows,
+        hidden_size=hidden_size,
+        num_layers=num_layers,
+        dropout=dropout,
+        batch_size=batch_size,
+        epochs=epochs,
+        learning_rate=learning_rate,
+        device=device,
+        verbose=verbose,
+        ticker_ids=packed.train_ids if per_ticker_heads else None,
+        n_heads=len(packed) if per_ticker_heads else 1,
+        seed=seed,
+    )
+
+    predicted = _predict(model, packed.windows, packed.test_rows, device, packed.test_ids if per_ticker_heads else None)
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(packed.test_ids, minlength=len(packed)))])
+    rows = list(failed or []) + packed.failed
+    for i, ticker in enumerate(packed.tickers):
+        scaler, values, split_idx = packed.scalers[i], packed.values[i], packed.splits[i]
+        try:
+            predicted_prices = scaler.inverse_transform(predicted[bounds[i]:bounds[i + 1]].reshape(-1, 1)).flatten()
+            actual_prices = scaler.inverse_transform(packed.targets[packed.test_rows[bounds[i]:bounds[i + 1]]].reshape(-1, 1)).flatten()
+            metrics = price_metrics(actual_prices, predicted_prices, values[split_idx - 1:-1])
+            rows.append({"ticker": ticker, "n_points": len(values), **metrics, "status": "ok", "error": ""})
+        except Exception as exc:
+            rows.append(failed_row(ticker, len(values), exc))
+    return _sorted_evaluations(rows)
+
+def _init_evaluator(threads: int) -> None:
+    torch.set_num_threads(threads)
+
+def _evaluate_one(ticker: str, dataset, kwargs: dict) -> dict:
+    try:
+        result = train_evaluate_lstm_next_day(dataset=dataset, verbose=False, **kwargs)
+        return {"ticker": ticker, "n_points": int(len(dataset)), **result["metrics"], "status": "ok", "error": ""}
+    except Exception as exc:
+        return failed_row(ticker, np.nan, exc)
+
+def evaluate_each(histories: dict, processes: int | None = None, on_done=None, failed: list | None = None, **kwargs) -> pd.DataFrame:
+    """
+    One LSTM per ticker like train_evaluate_lstm_next_day, with the tickers spread over a process pool and the
+    cores split between the processes. kwargs go to train_evaluate_lstm_next_day.
+    on_done(ticker, n_done, n_total) is called after every ticker, failed rows are included like in evaluate_tickers.
+    """
+    rows = list(failed or [])
+    if not histories:
+        return _sorted_evaluations(rows)
+    cpus = os.cpu_count() or 1
+    processes = max(1, min(processes or cpus, len(histories), cpus))
+    with ProcessPoolExecutor(processes, initializer=_init_evaluator, initargs=(max(1, cpus // processes),)) as pool:
+        futures = [pool.submit(_evaluate_one, ticker, dataset, kwargs) for ticker, dataset in histories.items()]
+        for n_done, future in enumerate(futures, start=1):
+            rows.append(future.result())
+            if on_done is not None:
+                on_done(rows[-1]["ticker"], n_done, len(futures))
+    return _sorted_evaluations(rows)
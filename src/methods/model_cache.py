@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+import joblib
+import numpy as np
+import sklearn
+
+from .fundamentals_cache import CACHE_DIR
+
+MODEL_CACHE_DIR = os.path.join(CACHE_DIR, "models")
+# least recently used models are deleted once the cache is bigger than this
+MAX_BYTES = 2*1024*1024*1024
+
+def fingerprint(X: np.ndarray, y: np.ndarray, params: dict) -> str:
+    """Hash of exactly what a model is fitted on: training rows, targets, hyperparameters and the sklearn version."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps({"params": params, "sklearn": sklearn.__version__, "shape": X.shape}, sort_keys=True, default=str).encode())
+    digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+class ModelCache:
+    """
+    Fitted models on disk, one compressed joblib file per fingerprint.
+    Reading a model marks it as used, evict() deletes the least recently used ones beyond max_bytes.
+    """
+    def __init__(self, path: str = MODEL_CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.joblib")
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._file(key))
+
+    def get(self, key: str):
+        path = self._file(key)
+        try:
+            model = joblib.load(path)
+        except (FileNotFoundError, EOFError):
+            return None
+        os.utime(path)
+        return model
+
+    def put(self, key: str, model) -> None:
+        tmp_path = f"{self._file(key)}.{os.getpid()}.tmp"
+        joblib.dump(model, tmp_path, compress=3)
+        os.replace(tmp_path, self._file(key))
+
+    def size(self) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(self.path) if entry.name.endswith(".joblib"))
+
+    def evict(self) -> int:
+        """Delete least recently used models until the cache fits in max_bytes, returns models deleted."""
+        entries = sorted(
+            (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+            for entry in os.scandir(self.path) if entry.name.endswith(".joblib")
+        )
+        total = sum(size for _, size, _ in entries)
+        deleted = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            deleted += 1
+        return deleted
+
+@lru_cache(maxsize=None)
+def default_model_cache() -> ModelCache | None:
+    """Process wide cache used by training.train_many, disabled by setting STOCK_PREDICTOR_NO_CACHE."""
+    if os.environ.get("STOCK_PREDICTOR_NO_CACHE"):
+        return None
+    return ModelCache()
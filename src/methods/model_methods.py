@@ -2,82 +2,90 @@ import pandas as pd
 import numpy as np
 from methods.scraper import *
 
-def get_raw_data(ticker: str, frequency: str="quarterly") -> pd.DataFrame:
-    data = Ticker(ticker).key_financial_ratios(frequency=frequency)
+def get_raw_data(ticker: str, frequency: str="quarterly", cache_only: bool=False) -> pd.DataFrame:
+    data = Ticker(ticker).key_financial_ratios(frequency=frequency, cache_only=cache_only)
     return data
 
+def _to_float(values: np.ndarray) -> np.ndarray:
+    # strip "%" from strings and treat "" and "-" as missing, float() every cell like the scraped tables need
+    values = values.copy()
+    is_str = np.array([isinstance(value, str) for value in values.ravel()], dtype=bool).reshape(values.shape)
+    if is_str.any():
+        cleaned = np.char.replace(values[is_str].astype(str), "%", "")
+        values[is_str] = np.where((cleaned == "") | (cleaned == "-"), np.nan, cleaned.astype(object))
+    return values.astype(float)
+
+def _fill_gaps(values: np.ndarray) -> np.ndarray:
+    """
+    Fill each gap in a column from its nearest valid neighbours: the average of both, or the left one when the gap
+    touches the last row or the right edge is the last row, or the right one when the gap starts at row 0 or 1.
+    Columns without any valid value are left as they are.
+    """
+    n = len(values)
+    rows = np.arange(n)[:, None]
+    valid = ~np.isnan(values)
+    # index of the nearest valid row above and below every cell, -1 and n when there is none
+    prev = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+    after = np.minimum.accumulate(np.where(valid, rows, n)[::-1], axis=0)[::-1]
+    missing = ~valid & ((prev >= 0) | (after < n))
+    if not missing.any():
+        return values
+
+    cols = np.nonzero(missing)[1]
+    prev, after = prev[missing], after[missing]
+    left = values[np.clip(prev, 0, n - 1), cols]
+    right = values[np.clip(after, 0, n - 1), cols]
+    use_right = (prev == -1) | ((prev == 0) & (after < n))
+    use_left = ~use_right & ((after == n) | (after == n - 1))
+    filled = np.where(use_right, right, np.where(use_left, left, (left + right)/2))
+
+    values = values.copy()
+    # round() rather than np.round, they disagree on some .xx5 ties
+    values[missing] = [round(value, 2) for value in filled.tolist()]
+    return values
+
 def imputer(df: pd.DataFrame, max_nans_share: float) -> pd.DataFrame:
     symbol = df.loc[df.index[0], "Ticker"]
-    df = df.drop("Ticker", axis=1)
-    
-    # go through all data points and count nans
-    row_nans = [0 for _ in df.index]
-    col_nans = [0 for _ in df.columns]
-    i = 0
-    for row in df.index:
-        j = 0
-        for column in df.columns:
-            val = df.loc[row, column]
-            if type(val) == str:
-                val = val.replace("%", "") # type: ignore
-            if val == '' or val == "-":
-                val = np.nan
-                df.loc[row, column] = np.nan
-            if np.isnan(float(val)): # type: ignore
-                row_nans[i] += 1
-                col_nans[j] += 1
-            else:
-                df.loc[row, column] = float(val) # type: ignore
-            j += 1
-        i += 1
-                
+    # Ticker is left out of the matrix rather than dropped from the frame, which copies every column
+    keep = np.asarray(df.columns != "Ticker")
+    all_columns, dtypes = df.columns[keep], df.dtypes[keep]
+    values = _to_float(df.to_numpy(dtype=object)[:, keep])
+
     # delete rows and columns with too many nans or missing price
-    drop_rows = []
-    for i in range(len(df.index)):
-        if row_nans[i]/len(df.columns) > max_nans_share or np.isnan(df.loc[df.index[i], "Close Price"]): # type: ignore
-            drop_rows.append(df.index[i])
-    df = df.drop(drop_rows)
-    drop_cols = []
-    for j in range(len(df.columns)):
-        if (col_nans[j]-len(drop_rows))/len(df.index) > max_nans_share:
-            drop_cols.append(df.columns[j])
-    df = df.drop(drop_cols, axis=1)
+    nans = np.isnan(values)
+    row_nans = nans.sum(axis=1)
+    col_nans = nans.sum(axis=0)
+    drop_rows = (row_nans/len(all_columns) > max_nans_share) | nans[:, all_columns.get_loc("Close Price")]
+    n_rows = int((~drop_rows).sum())
+    if n_rows == 0:
+        raise ValueError(f"No rows of {symbol} left after dropping rows with more than {max_nans_share:.0%} nans or no price")
+    # every dropped row is taken off a column's nan count, whether or not it had a nan in that column
+    drop_cols = (col_nans - drop_rows.sum())/n_rows > max_nans_share
+    values = values[~drop_rows][:, ~drop_cols]
+    columns = all_columns[~drop_cols]
 
     # impute last nan values
-    for j in range(len(df.columns)):
-        if df.columns[j] in ["Future Change%"]:
-            continue
-        impute_indices = []
-        for i in range(len(df.index)):
-            if np.isnan(df.iloc[i, j]): # type: ignore
-                impute_indices = [i]
-                u = i-1 if i != 0 else 0
-                l = i+1 if i != len(df.index)-1 else len(df.index)-1
-                while np.isnan(df.iloc[i, j]): # type: ignore
-                    if np.isnan(df.iloc[u, j]) == False and np.isnan(df.iloc[l, j]) == False: # type: ignore
-                        for k in impute_indices:
-                            df.iloc[k, j] = round((df.iloc[u, j]+df.iloc[l, j])/2, 2) # type: ignore
-                    if np.isnan(df.iloc[u, j]) == False and l == len(df.index)-1: # type: ignore
-                        for k in impute_indices:
-                            df.iloc[k, j] = round(df.iloc[u, j], 2) # type: ignore
-                    if u == 0 and np.isnan(df.iloc[l, j]) == False: # type: ignore
-                        for k in impute_indices:
-                            df.iloc[k, j] = round(df.iloc[l, j], 2) # type: ignore
-                    if np.isnan(df.iloc[u, j]): # type: ignore
-                        impute_indices.append(u) # type: ignore
-                        if u != 0:
-                            u += -1 
-                    if np.isnan(df.iloc[l, j]): # type: ignore
-                        impute_indices.append(l) # type: ignore
-                        if l != len(df.index)-1:
-                            l += 1
+    impute = np.asarray(columns != "Future Change%")
+    values[:, impute] = _fill_gaps(values[:, impute])
 
-    df.insert(0, "Ticker", symbol)
-    return df
+    # scraped ratio columns stay object columns holding floats like the row by row version left them,
+    # training.prepare_features turns those into category codes and the published models were trained on them
+    imputed = pd.DataFrame(values.astype(object), index=df.index[~drop_rows], columns=columns)
+    for j, dtype in enumerate(dtypes[~drop_cols]):
+        if pd.api.types.is_numeric_dtype(dtype):
+            imputed.isetitem(j, values[:, j])
+    imputed.insert(0, "Ticker", symbol)
+    return imputed
 
-def get_data(ticker: str, frequency: str="quarterly") -> pd.DataFrame:
-    data = get_raw_data(ticker=ticker, frequency=frequency)
+def get_data(ticker: str, frequency: str="quarterly", cache_only: bool=False) -> pd.DataFrame:
+    data = get_raw_data(ticker=ticker, frequency=frequency, cache_only=cache_only)
+    data = add_targets(data, ticker)
+    data = imputer(data, max_nans_share=0.3)
+
+    return data
 
+def add_targets(data: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    """Ticker, Close Price and Future Change% columns in front of a parsed ratio table, inserted into data."""
     # get future pice change targets
     earning_prices = []
     for row in data.index:
@@ -94,6 +102,4 @@ def get_data(ticker: str, frequency: str="quarterly") -> pd.DataFrame:
     data.insert(0, "Ticker", ticker)
     data = data.drop("Last Close Price", axis=1)
 
-    data = imputer(data, max_nans_share=0.3)
-
     return data
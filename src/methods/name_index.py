@@ -0,0 +1,67 @@
+import atexit
+import json
+import os
+import threading
+
+from .fundamentals_cache import CACHE_DIR
+
+INDEX_PATH = os.path.join(CACHE_DIR, "first_names.json")
+# gender_guesser labels that count toward the leadership score, "andy" (androgynous) has no score
+GENDER_SCORES = {"female": 1, "mostly_female": 0.5, "unknown": 0, "mostly_male": -0.5, "male": -1}
+
+def first_name(name: str) -> str:
+    # officer names start with a salutation, e.g. "Mr. Timothy D. Cook"
+    parts = name.split()
+    return parts[1] if len(parts) > 1 else ""
+
+class FirstNameIndex:
+    """
+    Persistent first name -> gender_guesser label index.
+    The detector is only loaded for names the index has not seen yet, new names are saved at exit.
+    """
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        self.labels = {}
+        self.dirty = False
+        self._detector = None
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.labels = json.load(f)
+
+    def label(self, first: str) -> str:
+        label = self.labels.get(first)
+        if label is None:
+            with self._lock:
+                if self._detector is None:
+                    from gender_guesser.detector import Detector
+                    self._detector = Detector()
+                label = self.labels[first] = self._detector.get_gender(first)
+                self.dirty = True
+        return label
+
+    def labels_for(self, firsts) -> dict:
+        """Labels of many first names at once, unseen names are looked up once each."""
+        return {first: self.label(first) for first in set(firsts)}
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.labels, f, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+_index = None
+_index_lock = threading.Lock()
+def get_index() -> FirstNameIndex:
+    """Process wide index, loaded on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FirstNameIndex()
+            atexit.register(_index.save)
+    return _index
@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+PANEL_DIR = os.path.join(current_dir, "..", "..", "data", "model_results", "quarterly_panel")
+PICKLE_PATH = os.path.join(current_dir, "..", "..", "data", "model_results", "quarterly_data_cache.pkl")
+# position of a period within its ticker, 0 is the most recent one
+ROW_COLUMN = "Row"
+
+class PanelStore:
+    """
+    Quarterly model data as one long table, a row per ticker and period with typed float feature columns.
+    Stored as Parquet partitioned by ticker (Ticker=<symbol>/data.parquet), so a ticker can be replaced on its own
+    and reads only touch the tickers and columns they ask for.
+    """
+    def __init__(self, path: str = PANEL_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _dir(self, ticker: str) -> str:
+        return os.path.join(self.path, f"Ticker={quote(ticker, safe='')}")
+
+    def _file(self, ticker: str) -> str:
+        return os.path.join(self._dir(ticker), "data.parquet")
+
+    def tickers(self) -> list[str]:
+        return sorted(
+            unquote(name[len("Ticker="):]) for name in os.listdir(self.path)
+            if name.startswith("Ticker=") and os.path.exists(os.path.join(self.path, name, "data.parquet"))
+        )
+
+    def _files(self) -> list[str]:
+        return [self._file(ticker) for ticker in self.tickers()]
+
+    def __contains__(self, ticker: str) -> bool:
+        return os.path.exists(self._file(ticker))
+
+    def upsert(self, frame: pd.DataFrame) -> None:
+        """Store a get_data frame, replacing whatever was stored for its ticker."""
+        ticker = str(frame["Ticker"].iloc[0])
+        table = frame_to_table(frame)
+        os.makedirs(self._dir(ticker), exist_ok=True)
+        tmp_path = self._file(ticker) + ".tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self._file(ticker))
+
+    def delete(self, ticker: str) -> None:
+        shutil.rmtree(self._dir(ticker), ignore_errors=True)
+
+    def read(self, tickers: list[str] | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        The long panel, optionally limited to some tickers and feature columns.
+        Ticker, the period columns and Row are always included, features a ticker lacks are NaN.
+        """
+        files = [self._file(ticker) for ticker in tickers if ticker in self] if tickers is not None else self._files()
+        if not files:
+            return pd.DataFrame()
+        dataset = self._dataset(files)
+        keys = ["Ticker"] + [name for name in _index_columns(dataset.schema) if name in dataset.schema.names] + [ROW_COLUMN]
+        wanted = keys + [column for column in (columns if columns is not None else dataset.schema.names) if column not in keys]
+        missing = [column for column in wanted if column not in dataset.schema.names]
+        table = dataset.to_table(columns=[column for column in wanted if column not in missing])
+        df = table.to_pandas()
+        for column in missing:
+            df[column] = float("nan")
+        return df[wanted].sort_values(["Ticker", ROW_COLUMN], kind="stable").reset_index(drop=True)
+
+    def _dataset(self, files: list[str]) -> ds.Dataset:
+        # every ticker keeps only the columns that survived its imputation, so the schemas are unified
+        schema = pa.unify_schemas([pq.read_schema(file) for file in files]).append(pa.field("Ticker", pa.string()))
+        partitioning = ds.partitioning(pa.schema([("Ticker", pa.string())]), flavor="hive")
+        return ds.dataset(files, schema=schema, format="parquet", partitioning=partitioning, partition_base_dir=self.path)
+
+    def frames(self, tickers: list[str] | None = None, columns: list[str] | None = None) -> list[pd.DataFrame]:
+        """
+        Per ticker frames shaped like get_data returns them, in ticker order, reading only the requested columns.
+        Columns a ticker does not have are left out rather than filled.
+        """
+        tickers = self.tickers() if tickers is None else [ticker for ticker in tickers if ticker in self]
+        frames = []
+        for ticker in tickers:
+            file = self._file(ticker)
+            schema = pq.read_schema(file)
+            index = _index_columns(schema)
+            features = [name for name in schema.names if name not in index and name != ROW_COLUMN]
+            if columns is not None:
+                features = [name for name in features if name in set(columns)]
+            df = pq.read_table(file, columns=index + [ROW_COLUMN] + features).to_pandas()
+            df = df.sort_values(ROW_COLUMN).drop(columns=ROW_COLUMN).set_index(index)
+            # back to the object columns get_data returns, training.prepare_features encodes those as categories
+            text = [name for name in _object_columns(schema) if name in df.columns]
+            df[text] = df[text].astype(object)
+            df.insert(0, "Ticker", ticker)
+            frames.append(df)
+        return frames
+
+def _index_columns(schema: pa.Schema) -> list[str]:
+    metadata = schema.metadata or {}
+    return json.loads(metadata.get(b"index_columns", b"[]"))
+
+def _object_columns(schema: pa.Schema) -> list[str]:
+    metadata = schema.metadata or {}
+    return json.loads(metadata.get(b"object_columns", b"[]"))
+
+def frame_to_table(frame: pd.DataFrame) -> pa.Table:
+    """
+    Typed table of one get_data frame: period index levels as strings, Row, then float features.
+    Features that were object columns are listed in the metadata so frames can restore them.
+    """
+    df = frame.drop(columns="Ticker")
+    index = df.index.to_frame(index=False)
+    names = list(df.index.names)
+    # scraped frames carry the level names ("Fiscal Quarter", "Period Ending") as the columns name
+    header = df.columns.name if isinstance(df.columns.name, tuple) else (df.columns.name,)
+    if all(name is None for name in names) and len(header) == len(names):
+        names = list(header)
+    index.columns = [str(name) if name is not None else f"Period {i}" for i, name in enumerate(names)]
+    object_columns = [str(name) for name, dtype in df.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+    features = df.reset_index(drop=True).apply(pd.to_numeric, errors="coerce").astype("float64")
+    data = {name: pa.array(index[name].astype(str).tolist(), pa.string()) for name in index.columns}
+    data[ROW_COLUMN] = pa.array(range(len(df)), pa.int32())
+    data.update({str(name): pa.array(features[name].to_numpy(), pa.float64()) for name in features.columns})
+    return pa.table(data).replace_schema_metadata({
+        "index_columns": json.dumps(list(index.columns)), "object_columns": json.dumps(object_columns),
+    })
+
+def migrate_pickle(pickle_path: str = PICKLE_PATH, store: PanelStore | None = None) -> int:
+    """Copy every frame of the old list-of-frames pickle into the panel store, returns frames written."""
+    store = PanelStore() if store is None else store
+    with open(pickle_path, "rb") as f:
+        frames = pickle.load(f)
+    for frame in frames:
+        store.upsert(frame)
+    return len(frames)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect the quarterly panel store or migrate the old pickle into it.")
+    parser.add_argument("--path", default=PANEL_DIR, help="panel store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = commands.add_parser("migrate", help="copy quarterly_data_cache.pkl into the store")
+    migrate_parser.add_argument("--pickle", default=PICKLE_PATH)
+    commands.add_parser("inspect", help="list stored tickers with their periods and features")
+    args = parser.parse_args(argv)
+
+    store = PanelStore(args.path)
+    if args.command == "migrate":
+        n = migrate_pickle(args.pickle, store)
+        print(f"Migrated {n} frames to {args.path}", file=sys.stderr)
+    elif args.command == "inspect":
+        panel = store.read()
+        if panel.empty:
+            print("Store is empty.")
+            return
+        features = panel.columns[panel.columns.get_loc(ROW_COLUMN) + 1:]
+        summary = panel.groupby("Ticker").agg(Periods=(ROW_COLUMN, "size"))
+        summary["Features"] = panel.groupby("Ticker")[list(features)].apply(lambda g: int(g.notna().any().sum()))
+        with pd.option_context("display.max_rows", None):
+            print(summary)
+        print(f"{len(summary)} tickers, {len(panel)} rows, {len(features)} feature columns", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
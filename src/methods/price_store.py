@@ -0,0 +1,159 @@
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import yfinance as yf
+
+from .fundamentals_cache import CACHE_DIR
+
+STORE_DIR = os.path.join(CACHE_DIR, "prices")
+# a stored series is checked for new trading days once it is older than this
+REFRESH_AFTER = 12*60*60
+BATCH_SIZE = 100
+# a stored close that no longer matches the download was re-adjusted for a split or dividend
+ADJUSTMENT_RTOL = 1e-6
+
+_PERIOD = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+def period_start(range: str, today: pd.Timestamp | None = None) -> pd.Timestamp | None:
+    """First date covered by a yfinance style period, None for "max"."""
+    today = pd.Timestamp.today().normalize() if today is None else today
+    if range == "max":
+        return None
+    if range == "ytd":
+        return pd.Timestamp(year=today.year, month=1, day=1)
+    match = _PERIOD.match(range)
+    if match is None:
+        raise ValueError(f"Unsupported range '{range}', use e.g. 5d, 1wk, 6mo, 1y, ytd or max")
+    n, unit = int(match.group(1)), match.group(2)
+    offset = {"d": pd.DateOffset(days=n), "wk": pd.DateOffset(weeks=n), "mo": pd.DateOffset(months=n), "y": pd.DateOffset(years=n)}[unit]
+    return today - offset
+
+def _column_view(table: pa.Table, name: str) -> np.ndarray:
+    column = table.column(name)
+    if column.num_chunks == 1:
+        return column.chunk(0).to_numpy(zero_copy_only=True)
+    return column.to_numpy()
+
+class PriceStore:
+    """
+    Local daily close prices, one Arrow IPC file per ticker read through a memory map.
+    New tickers are filled with batched multi-ticker downloads, known ones only get the missing days appended.
+    The download of a known ticker starts at its last stored day, when that close changed the prices were re-adjusted
+    and the whole history is downloaded again.
+    """
+    def __init__(self, path: str = STORE_DIR, refresh_after: float = REFRESH_AFTER):
+        self.path = path
+        self.refresh_after = refresh_after
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, symbol: str) -> str:
+        return os.path.join(self.path, f"{symbol.replace('/', '_')}.arrow")
+
+    def load(self, symbol: str) -> tuple[np.ndarray, np.ndarray] | None:
+        """Dates and closes of symbol as read-only views on the memory mapped file, None when nothing is stored."""
+        path = self._file(symbol)
+        if not os.path.exists(path):
+            return None
+        # the map stays alive as long as the returned arrays reference it
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        if table.num_rows == 0:
+            # written by an older version for a symbol the download had no prices for
+            return None
+        return _column_view(table, "Date"), _column_view(table, "Close")
+
+    def _write(self, symbol: str, dates: np.ndarray, close: np.ndarray) -> None:
+        table = pa.table({"Date": pa.array(dates.astype("datetime64[ns]")), "Close": pa.array(close, type=pa.float64())})
+        # unique per writer, two refreshes of one symbol must not share a temp file
+        tmp_path = f"{self._file(symbol)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, self._file(symbol))
+
+    def is_stale(self, symbol: str, now: float | None = None) -> bool:
+        path = self._file(symbol)
+        now = time.time() if now is None else now
+        return not os.path.exists(path) or now - os.path.getmtime(path) > self.refresh_after
+
+    def _download(self, symbols: list[str], **kwargs) -> pd.DataFrame:
+        data = yf.download(symbols, rounding=False, progress=False, auto_adjust=True, group_by="column", **kwargs)
+        if data is None or data.empty:
+            return pd.DataFrame()
+        return data["Close"]
+
+    def refresh(self, symbols: list[str], force: bool = False) -> None:
+        """Download missing history for all stale symbols in batches of BATCH_SIZE tickers."""
+        stale = [symbol for symbol in dict.fromkeys(symbols) if force or self.is_stale(symbol)]
+        stored = {symbol: self.load(symbol) for symbol in stale}
+        new = [symbol for symbol in stale if stored[symbol] is None]
+        known = [symbol for symbol in stale if stored[symbol] is not None]
+        self._fill(new)
+
+        # tickers sharing a last stored day are appended with one download starting at that day, which is compared
+        last_days = {symbol: stored[symbol][0][-1] for symbol in known} # type: ignore
+        by_start = {}
+        for symbol, last_day in last_days.items():
+            by_start.setdefault(pd.Timestamp(last_day), []).append(symbol)
+        adjusted = []
+        for start, group in by_start.items():
+            for i in range(0, len(group), BATCH_SIZE):
+                batch = group[i:i + BATCH_SIZE]
+                closes = self._download(batch, start=start.strftime("%Y-%m-%d"))
+                for symbol in batch:
+                    if not self._append(symbol, closes[symbol].dropna() if symbol in closes.columns else pd.Series(dtype=float)):
+                        adjusted.append(symbol)
+        self._fill(adjusted)
+
+    def _fill(self, symbols: list[str]) -> None:
+        """Download and write the full history of symbols."""
+        for i in range(0, len(symbols), BATCH_SIZE):
+            batch = symbols[i:i + BATCH_SIZE]
+            closes = self._download(batch, period="max")
+            for symbol in batch:
+                series = closes[symbol].dropna() if symbol in closes.columns else pd.Series(dtype=float)
+                # delisted and unknown symbols come back as an all NaN column, nothing is stored for them
+                if not series.empty:
+                    self._write(symbol, series.index.to_numpy(), series.to_numpy(dtype=float))
+
+    def _append(self, symbol: str, new: pd.Series) -> bool:
+        """Append the days after the stored ones, False when the overlapping day was re-adjusted and nothing was written."""
+        loaded = self.load(symbol)
+        if loaded is None:
+            if not new.empty:
+                self._write(symbol, new.index.to_numpy(), new.to_numpy(dtype=float))
+            return True
+        dates, close = loaded
+        overlap = new.index.to_numpy() == dates[-1]
+        if overlap.any() and not np.isclose(new.to_numpy(dtype=float)[overlap][0], close[-1], rtol=ADJUSTMENT_RTOL, atol=0.0):
+            return False
+        new = new[new.index.to_numpy() > dates[-1]]
+        if new.empty:
+            os.utime(self._file(symbol))  # checked, nothing to add
+            return True
+        self._write(symbol, np.concatenate([dates, new.index.to_numpy()]), np.concatenate([close, new.to_numpy(dtype=float)]))
+        return True
+
+    def history(self, symbol: str, range: str = "ytd", refresh: bool = True) -> pd.Series:
+        """Close prices of symbol for a yfinance style range, sliced from the memory mapped arrays without copying."""
+        if refresh and self.is_stale(symbol):
+            self.refresh([symbol])
+        loaded = self.load(symbol)
+        if loaded is None:
+            raise ValueError(f"No price history available for {symbol}")
+        dates, close = loaded
+        start = period_start(range)
+        first = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, "ns")))
+        return pd.Series(close[first:], index=pd.DatetimeIndex(dates[first:], name="Date"), name=("Close", symbol), copy=False)
+
+_store = None
+def price_store() -> PriceStore:
+    """Process wide store under the cache dir."""
+    global _store
+    if _store is None:
+        _store = PriceStore()
+    return _store
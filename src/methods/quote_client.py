@@ -0,0 +1,265 @@
+import asyncio
+import datetime
+import json
+import os
+
+import pandas as pd
+
+from .fetcher import BACKOFF_BASE, BACKOFF_CAP, MAX_RETRIES, backoff_delay
+from .snapshot import StockSnapshot
+
+BASE_URL = os.environ.get("YAHOO_QUERY_URL", "https://query2.finance.yahoo.com")
+COOKIE_URL = "https://fc.yahoo.com"
+CONCURRENCY = 16
+# symbols per v7 quote request, the endpoint takes a comma separated list
+QUOTE_BATCH = 50
+TIMEOUT = 20
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "application/json",
+}
+# what yfinance's Ticker.info, .calendar and .insider_purchases read, fetched in one quoteSummary call
+INFO_MODULES = ["financialData", "quoteType", "defaultKeyStatistics", "assetProfile", "summaryDetail"]
+MODULES = INFO_MODULES + ["calendarEvents", "netSharePurchaseActivity"]
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+def _format(key, value):
+    if isinstance(value, dict) and "raw" in value and "fmt" in value:
+        return value["fmt"] if key in {"regularMarketTime", "postMarketTime"} else value["raw"]
+    if isinstance(value, list):
+        return [_format(None, item) for item in value]
+    if isinstance(value, dict):
+        return {k: _format(k, item) for k, item in value.items()}
+    if isinstance(value, str):
+        return value.replace("\xa0", " ")
+    return value
+
+def parse_info(summary: dict | None, quote: dict | None, symbol: str) -> dict:
+    """Flattened info dict from quoteSummary modules and the v7 quote, shaped like yfinance's Ticker.info."""
+    merged = {}
+    for result in (summary, quote):
+        if result:
+            merged.update({**result, "symbol": symbol})
+    info = {}
+    for key, value in merged.items():
+        if isinstance(value, dict):
+            for inner_key, inner_value in value.items():
+                if inner_value is not None:
+                    info[inner_key] = 86400 if inner_key == "maxAge" and inner_value == 1 else inner_value
+        elif value is not None:
+            info[key] = value
+    return {key: _format(key, value) for key, value in info.items()}
+
+def parse_calendar(events: dict | None) -> dict:
+    """Ticker.calendar from the calendarEvents module."""
+    calendar = {}
+    if not events:
+        return calendar
+    if "dividendDate" in events:
+        calendar["Dividend Date"] = datetime.datetime.fromtimestamp(events["dividendDate"]).date()
+    if "exDividendDate" in events:
+        calendar["Ex-Dividend Date"] = datetime.datetime.fromtimestamp(events["exDividendDate"]).date()
+    earnings = events.get("earnings")
+    if earnings is not None:
+        calendar["Earnings Date"] = [datetime.datetime.fromtimestamp(date).date() for date in earnings.get("earningsDate", [])]
+        for key, name in [
+            ("earningsHigh", "Earnings High"), ("earningsLow", "Earnings Low"), ("earningsAverage", "Earnings Average"),
+            ("revenueHigh", "Revenue High"), ("revenueLow", "Revenue Low"), ("revenueAverage", "Revenue Average"),
+        ]:
+            calendar[name] = earnings.get(key, None)
+    return calendar
+
+def parse_insider(data: dict | None) -> pd.DataFrame:
+    """Ticker.insider_purchases from the netSharePurchaseActivity module."""
+    data = data or {}
+    return pd.DataFrame({
+        "Insider Purchases Last " + data.get("period", ""): [
+            "Purchases", "Sales", "Net Shares Purchased (Sold)", "Total Insider Shares Held",
+            "% Net Shares Purchased (Sold)", "% Buy Shares", "% Sell Shares",
+        ],
+        "Shares": [
+            data.get("buyInfoShares"), data.get("sellInfoShares"), data.get("netInfoShares"),
+            data.get("totalInsiderShares"), data.get("netPercentInsiderShares"),
+            data.get("buyPercentInsiderShares"), data.get("sellPercentInsiderShares"),
+        ],
+        "Trans": [data.get("buyInfoCount"), data.get("sellInfoCount"), data.get("netInfoCount"), pd.NA, pd.NA, pd.NA, pd.NA],
+    }).convert_dtypes()
+
+class QuoteSummaryClient:
+    """
+    Asyncio client for the Yahoo endpoints a StockSnapshot is built from, on one pooled httpx client (HTTP/2 when
+    the h2 package is installed). At most concurrency requests are in flight, rate limited and failed requests
+    are retried with the fetcher's jittered backoff. base_url can point at a local server serving recorded payloads,
+    with record_dir every response is written there as <symbol>.json for such a server.
+    """
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        cookie_url: str | None = COOKIE_URL,
+        concurrency: int = CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        timeout: float = TIMEOUT,
+        record_dir: str | None = None,
+    ):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("QuoteSummaryClient needs httpx, install it with: pip install 'httpx[http2]'")
+        self.httpx = httpx
+        self.base_url = base_url.rstrip("/")
+        self.cookie_url = cookie_url
+        self.max_retries = max_retries
+        self.record_dir = record_dir
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.crumb = None
+        self._crumb_fetched = False
+        self._crumb_lock = asyncio.Lock()
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        try:
+            self.client = httpx.AsyncClient(http2=True, limits=limits, timeout=timeout, headers=HEADERS, follow_redirects=True)
+        except ImportError:
+            self.client = httpx.AsyncClient(limits=limits, timeout=timeout, headers=HEADERS, follow_redirects=True)
+
+    async def __aenter__(self) -> "QuoteSummaryClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def _get_crumb(self, refresh: bool = False) -> str | None:
+        async with self._crumb_lock:
+            if self._crumb_fetched and not refresh:
+                return self.crumb
+            if self.cookie_url is not None:
+                try:
+                    # only sets the session cookie the crumb belongs to
+                    await self.client.get(self.cookie_url)
+                except self.httpx.HTTPError:
+                    pass
+            attempts = 0
+            while True:
+                attempts += 1
+                response = await self.client.get(f"{self.base_url}/v1/test/getcrumb")
+                if response.status_code != 429 and "Too Many Requests" not in response.text:
+                    break
+                if attempts > self.max_retries:
+                    raise RuntimeError("429 Too Many Requests while getting crumb")
+                await asyncio.sleep(backoff_delay(attempts - 1, BACKOFF_BASE, BACKOFF_CAP))
+            self.crumb = response.text if response.status_code == 200 and "<html>" not in response.text else None
+            self._crumb_fetched = True
+            return self.crumb
+
+    async def _get_json(self, path: str, params: dict) -> dict:
+        attempts = 0
+        refreshed = False
+        while True:
+            attempts += 1
+            crumb = await self._get_crumb()
+            try:
+                async with self.semaphore:
+                    response = await self.client.get(f"{self.base_url}{path}", params={**params, **({"crumb": crumb} if crumb else {})})
+            except self.httpx.TransportError:
+                if attempts > self.max_retries:
+                    raise
+                await asyncio.sleep(backoff_delay(attempts - 1, BACKOFF_BASE, BACKOFF_CAP))
+                continue
+            if response.status_code in (401, 403) and not refreshed:
+                # the crumb expired with the cookie
+                refreshed = True
+                await self._get_crumb(refresh=True)
+                continue
+            if response.status_code in RETRY_STATUS and attempts <= self.max_retries:
+                await asyncio.sleep(backoff_delay(attempts - 1, BACKOFF_BASE, BACKOFF_CAP))
+                continue
+            if response.status_code != 200:
+                raise RuntimeError(f"{response.status_code} {response.reason_phrase} for {path}")
+            return response.json()
+
+    async def quote_summary(self, symbol: str) -> dict:
+        """The raw quoteSummary result with MODULES for symbol."""
+        payload = await self._get_json(
+            f"/v10/finance/quoteSummary/{symbol}",
+            {"modules": ",".join(MODULES), "corsDomain": "finance.yahoo.com", "formatted": "false", "symbol": symbol},
+        )
+        results = (payload.get("quoteSummary") or {}).get("result") or []
+        if not results:
+            error = (payload.get("quoteSummary") or {}).get("error") or {}
+            raise RuntimeError(error.get("description", f"No quote summary for {symbol}"))
+        return results[0]
+
+    async def quotes(self, symbols: list[str]) -> dict:
+        """
+        Raw v7 quotes by symbol, QUOTE_BATCH symbols per request.
+        The symbols of a batch that failed map to its exception, symbols Yahoo had no quote for are left out.
+        """
+        batches = [symbols[i:i + QUOTE_BATCH] for i in range(0, len(symbols), QUOTE_BATCH)]
+        payloads = await asyncio.gather(
+            *(self._get_json("/v7/finance/quote", {"symbols": ",".join(batch), "formatted": "false"}) for batch in batches),
+            return_exceptions=True,
+        )
+        quotes = {}
+        for batch, payload in zip(batches, payloads):
+            if isinstance(payload, Exception):
+                quotes.update(dict.fromkeys(batch, payload))
+                continue
+            for quote in (payload.get("quoteResponse") or {}).get("result") or []:
+                quotes[quote.get("symbol")] = quote
+        return quotes
+
+    def _record(self, symbol: str, summary: dict, quote: dict | None) -> None:
+        os.makedirs(self.record_dir, exist_ok=True) # type: ignore
+        with open(os.path.join(self.record_dir, f"{symbol}.json"), "w", encoding="utf-8") as f: # type: ignore
+            json.dump({"quoteSummary": summary, "quote": quote}, f)
+
+    async def snapshot(self, symbol: str, quote: dict | None = None) -> StockSnapshot:
+        summary = await self.quote_summary(symbol)
+        if self.record_dir is not None:
+            self._record(symbol, summary, quote)
+        info = parse_info({key: value for key, value in summary.items() if key in INFO_MODULES}, quote, symbol)
+        return StockSnapshot(symbol, info, parse_insider(summary.get("netSharePurchaseActivity")), parse_calendar(summary.get("calendarEvents")))
+
+    async def snapshots(self, symbols: list[str], on_done=None) -> dict:
+        """
+        StockSnapshots by symbol, the requests of all symbols overlap. A symbol that failed maps to its exception,
+        so does one without a v7 quote: its info would lack the prices and moving averages Stock reads.
+        on_done(symbol, result, n_done, n_total) is called as each symbol finishes.
+        """
+        quotes = await self.quotes(symbols)
+        results = {}
+
+        async def one(symbol):
+            quote = quotes.get(symbol)
+            try:
+                if isinstance(quote, Exception):
+                    raise quote
+                if quote is None:
+                    raise RuntimeError(f"No quote for {symbol}")
+                result = await self.snapshot(symbol, quote)
+            except Exception as e:
+                result = e
+            results[symbol] = result
+            if on_done is not None:
+                on_done(symbol, result, len(results), len(symbols))
+
+        await asyncio.gather(*(one(symbol) for symbol in symbols))
+        return results
+
+def fetch_snapshots(symbols: list[str], cache=None, on_done=None, **client_args) -> dict:
+    """
+    Blocking helper around QuoteSummaryClient.snapshots. With a FundamentalsCache the payloads are stored there,
+    so Stock(symbol) afterwards reads them from the cache, or pass the snapshot: Stock(symbol, snapshot=...).
+    Only complete snapshots are cached, failed symbols map to their exception.
+    """
+    async def run():
+        async with QuoteSummaryClient(**client_args) as client:
+            return await client.snapshots(symbols, on_done=on_done)
+
+    results = asyncio.run(run())
+    if cache is not None:
+        for symbol, snapshot in results.items():
+            if isinstance(snapshot, StockSnapshot):
+                cache.put(symbol, {"info": snapshot.info, "insider": snapshot.insider, "calendar": snapshot.calendar})
+    return results
@@ -0,0 +1,174 @@
+import pandas as pd
+import numpy as np
+from . import screener_methods
+from .screener_methods import Stock, load_owned_tickers
+from .name_index import GENDER_SCORES, first_name, get_index
+from .fundamentals_cache import default_cache
+
+def raw_frame(stocks: list[Stock]) -> pd.DataFrame:
+    """Stack Stock.raw_inputs() of already fetched stocks into one frame."""
+    return pd.DataFrame([stock.raw_inputs() for stock in stocks])
+
+def _numeric(raw: pd.DataFrame, column: str) -> np.ndarray:
+    return pd.to_numeric(raw[column], errors="coerce").to_numpy(dtype=float)
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    # np.round scales by 100 first, which can tip values sitting on a .xx5 tie the other way than round()
+    rounded = np.round(values, 2)
+    scaled = values*100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(value, 2) for value in values[near_tie].tolist()]
+    return rounded
+
+def _officer_field(officers: list, key: str) -> list:
+    return [person.get(key) if isinstance(person, dict) else None for person in officers]
+
+def _officer_gender_scores(names: list) -> np.ndarray:
+    # one index lookup per distinct name, names without a scored label add nothing like in Stock
+    firsts = {name: first_name(name) for name in set(names) if isinstance(name, str)}
+    labels = get_index().labels_for(firsts.values())
+    lookup = {name: -GENDER_SCORES[labels[first]] for name, first in firsts.items() if labels[first] in GENDER_SCORES}
+    return np.array([lookup.get(name, 0.0) if isinstance(name, str) else 0.0 for name in names], dtype=float)
+
+def _title_multiplier(title) -> int:
+    if not isinstance(title, str):
+        return 1
+    if "CEO" in title:
+        return 5
+    if "CFO" in title or "CTO" in title:
+        return 3
+    return 1
+
+def leadership_scores(officers: pd.Series) -> pd.Series:
+    """
+    Stock.leadership_score for a series of companyOfficers lists, all officers scored in one pass.
+    Officers are summed in list order so the result matches the per-object score exactly.
+    An empty or missing list, where Stock divides by zero, scores NaN here, score_frame raises for those instead.
+    """
+    mean, spread, weight = screener_methods.LEADERSHIP_PARAMS
+    lists = [people if isinstance(people, list) else [] for people in officers]
+    counts = np.array([len(people) for people in lists], dtype=np.int64)
+    flat = [person for people in lists for person in people]
+    n_officers = len(flat)
+    if n_officers == 0:
+        return pd.Series(np.nan, index=officers.index)
+
+    ages = pd.to_numeric(pd.Series(_officer_field(flat, "age"), dtype=object), errors="coerce").to_numpy(dtype=float)
+    person_scores = np.nan_to_num(np.tanh((ages-mean)/(spread/2)), nan=0.0)
+    person_scores += _officer_gender_scores(_officer_field(flat, "name"))
+    person_scores *= np.array([_title_multiplier(title) for title in _officer_field(flat, "title")])
+
+    # one column per officer position so the sum runs in the same order as the python loop
+    rows = np.repeat(np.arange(len(lists)), counts)
+    positions = np.arange(n_officers) - np.repeat(np.cumsum(counts) - counts, counts)
+    matrix = np.zeros((len(lists), int(counts.max())))
+    matrix[rows, positions] = person_scores
+    score = np.zeros(len(lists))
+    for position in range(matrix.shape[1]):
+        score = score + matrix[:, position]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.where(counts > 0, score/counts, np.nan)
+    return pd.Series(np.tanh(score/(10/2)) * weight, index=officers.index)
+
+def cached_leadership_scores(tickers: list[str] | None = None, cache=None) -> pd.Series:
+    """Rescore leadership from the cached companyOfficers lists without touching the network."""
+    cache = default_cache() if cache is None else cache
+    officers = {ticker: payload.get("companyOfficers") for ticker, payload in cache.get_group("officers", tickers).items()}
+    return leadership_scores(pd.Series(officers, dtype=object))
+
+def score_frame(raw: pd.DataFrame, momentum_method: str | None = None, buy_threshold: float | None = None) -> pd.DataFrame:
+    """
+    Score a whole universe at once, raw has one row per ticker with the keys of Stock.raw_inputs().
+    A precomputed "leadership_score" column is used instead of rescoring "officers" when present.
+    Returns the same columns and values as concatenated Stock.summary() rows, and like Stock.summary() raises
+    ZeroDivisionError for tickers without company officers.
+    """
+    momentum_method = screener_methods.momentum_method if momentum_method is None else momentum_method
+    buy_threshold = screener_methods.BUY_THRESHOLD if buy_threshold is None else buy_threshold
+
+    PE = _numeric(raw, "PE")
+    ROA = _numeric(raw, "ROA")
+    EPS = _numeric(raw, "EPS")
+    PB = _numeric(raw, "PB")
+    DE = _numeric(raw, "DE")
+    insider_buy = _numeric(raw, "insider_buy")
+    d50_momentum = _numeric(raw, "d50_momentum")
+    d200_momentum = _numeric(raw, "d200_momentum")
+
+    # value score
+    median, spread, weight = screener_methods.PE_PARAMS
+    PE_score = -np.tanh((PE-median)/(spread/2))*weight
+    PE_score = np.where(PE >= 0, PE_score, -PE_score)
+    median, spread, weight = screener_methods.ROA_PARAMS
+    ROA_score = np.tanh((ROA-median)/(spread/2))*weight
+    median, spread, weight = screener_methods.EPS_PARAMS
+    EPS_score = np.tanh((EPS-median)/(spread/2))*weight
+    median, spread, weight = screener_methods.PB_PARAMS
+    PB_score = -np.tanh((PB-median)/(spread/2))*weight
+    median, spread, weight = screener_methods.DE_PARAMS
+    DE_score = np.where(np.isnan(DE), 0.0, -np.tanh((DE-median)/(spread/2))*weight)
+    if "leadership_score" in raw.columns:
+        leadership_score = _numeric(raw, "leadership_score")
+    else:
+        no_officers = [symbol for symbol, people in zip(raw["symbol"], raw["officers"]) if not isinstance(people, list) or not people]
+        if no_officers:
+            raise ZeroDivisionError(f"No company officers to score leadership for: {', '.join(map(str, no_officers))}")
+        leadership_score = leadership_scores(raw["officers"]).to_numpy(dtype=float)
+    insider_buy_score = insider_buy*0.005
+    value_score = PE_score + ROA_score + EPS_score + PB_score + DE_score + leadership_score + insider_buy_score
+
+    # momentum score, NaN momentum gives a NaN score like in Stock, whose except branch never sees a float
+    if momentum_method == "none":
+        d50_momentum_score = np.zeros(len(raw))
+        d200_momentum_score = np.zeros(len(raw))
+    else:
+        if momentum_method == "mult":
+            d50_weight = np.abs(value_score)*0.33 + 0.025
+            d200_weight = np.abs(value_score)*0.45 + 0.1
+        else:
+            d50_weight = d200_weight = 0.3
+        median, spread = screener_methods.D50_MOMENTUM_PARAMS
+        d50_momentum_score = np.tanh((d50_momentum-median)/(spread/2)) * d50_weight
+        median, spread = screener_methods.D200_MOMENTUM_PARAMS
+        d200_momentum_score = np.tanh((d200_momentum-median)/(spread/2)) * d200_weight
+    momentum_score = d50_momentum_score + d200_momentum_score
+    final_score = value_score + momentum_score
+    signal = np.select([final_score >= buy_threshold, final_score < 0], ["Buy", "Sell"], "Hold")
+
+    if "owned" in raw.columns:
+        owned = raw["owned"].to_numpy(dtype=bool)
+    else:
+        owned = raw["symbol"].isin(load_owned_tickers()).to_numpy()
+
+    return pd.DataFrame({
+        "Ticker": raw["symbol"].to_numpy(),
+        "Name": raw["name"].to_numpy(),
+        "Earnings": raw["earnings"].to_numpy(),
+        "1d Change": _round2(_numeric(raw, "change")),
+        "Signal": signal,
+        "Final Score": np.round(final_score, 2),
+        "Value Score": np.round(value_score, 2),
+        "Momentum Score": np.round(momentum_score, 2),
+        "50d Momentum Score": np.round(d50_momentum_score, 2),
+        "200d Momentum Score": np.round(d200_momentum_score, 2),
+        "Leadership Score": np.round(leadership_score, 2),
+        "P/E Score": np.round(PE_score, 2),
+        "ROA Score": np.round(ROA_score, 2),
+        "P/B Score": np.round(PB_score, 2),
+        "D/E Score": np.round(DE_score, 2),
+        "Insider Buy Score": _round2(insider_buy_score),
+        "P/E": _round2(PE),
+        "ROA%": _round2(ROA),
+        "EPS": _round2(EPS),
+        "P/B": _round2(PB),
+        "D/E": _round2(DE),
+        "Insider Buy%": _round2(insider_buy),
+        "50d Average Change%": _round2(d50_momentum),
+        "200d Average Change%": _round2(d200_momentum),
+        "Sector": raw["sector"].to_numpy(),
+        "Industry": raw["industry"].to_numpy(),
+        "Country": raw["country"].to_numpy(),
+        "Owned": owned
+        })
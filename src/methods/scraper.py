@@ -1,9 +1,51 @@
 import pandas as pd
-import re
+import os
 import warnings
 import io
+import threading
+import requests
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
-from .selenium_patch import PatchedSeleniumInterface
+from .selenium_patch import QUARTER_HEADER, PatchedSeleniumInterface
+from .html_cache import default_html_cache
+
+# overridable so the scraper can be pointed at a local copy of the site
+BASE_URL = os.environ.get("STOCKANALYSIS_BASE_URL", "https://stockanalysis.com")
+HTTP_TIMEOUT = 15
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+_local = threading.local()
+def http_session() -> requests.Session:
+    """Keep-alive session, one per thread since requests sessions are not thread safe."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+        session.headers.update(HTTP_HEADERS)
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    return session
+
+# host -> semaphore capping concurrent fetches, shared across processes by the dataset builder
+HOST_LIMITS = {}
+
+@contextmanager
+def host_limit(url: str):
+    semaphore = HOST_LIMITS.get(urlparse(url).netloc)
+    if semaphore is None:
+        yield
+        return
+    with semaphore:
+        yield
+
+def is_quarterly(data: pd.DataFrame) -> bool:
+    """Whether a transposed ratio table has quarterly periods as rows."""
+    return any(QUARTER_HEADER.search(str(period)) for period in data.index)
 
 class Ticker:
     EXCHANGE_SUFFIX_MAP = {
@@ -24,16 +66,19 @@ class Ticker:
         ".WA": "wse",  # Warsaw
     }
 
-    def __init__(self, ticker: str) -> None:
+    def __init__(self, ticker: str, cache=None) -> None:
         self.ticker = ticker
         self.selenium_interface = None
+        self.cache = cache if cache is not None else default_html_cache()
+        # "cache", "http" or "browser", whichever served the last key_financial_ratios call
+        self.source = None
 
     def _get_url(self, ticker: str) -> str:
         # Handling different ticker formats for stockanalysis.com
         # Format: https://stockanalysis.com/quote/{exchange}/{ticker}/financials/ratios/
         # Or US: https://stockanalysis.com/stocks/{ticker}/financials/ratios/
         
-        base = "https://stockanalysis.com"
+        base = BASE_URL
         normalized_ticker = ticker.strip().upper()
 
         for suffix, exchange in self.EXCHANGE_SUFFIX_MAP.items():
@@ -46,24 +91,69 @@ class Ticker:
         us_symbol = normalized_ticker.replace('-', '.')
         return f"{base}/stocks/{us_symbol}/financials/ratios/"
 
-    def key_financial_ratios(self, frequency: str = "annual") -> pd.DataFrame:
-        """
-        Retrieve the key financial ratios for the given ticker from stockanalysis.com.
-        """
-        url = self._get_url(self.ticker)
-        
+    def _browser_html(self, url: str, frequency: str) -> str:
         if not hasattr(self, "selenium_interface") or self.selenium_interface is None:
             self.selenium_interface = PatchedSeleniumInterface(use_custom_user_agent=True)
-            
+
         if frequency == "quarterly":
-            url += "?p=quarterly"
             # Use the toggling method for quarterly requests to ensure we click the button if URL params are ignored
             soup = self.selenium_interface.get_html_content_with_quarterly_toggle(url)
         else:
             soup = self.selenium_interface.get_html_content(url)
-        
+        return str(soup)
+
+    def _http_ratios(self, url: str, frequency: str) -> tuple[str, pd.DataFrame] | None:
+        """
+        Html and ratio table straight from the server rendered page, None when the page needs the browser,
+        i.e. the request fails, there is no table or the quarterly toggle was not applied.
+        The embedded page data holds the same values as the rendered table, so only the table is read.
+        """
+        try:
+            response = http_session().get(url, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            data = self._parse_ratios(response.text, url)
+        except Exception:
+            return None
+        if frequency == "quarterly" and not is_quarterly(data):
+            return None
+        return response.text, data
+
+    def key_financial_ratios(self, frequency: str = "annual", use_browser: bool = False, cache_only: bool = False) -> pd.DataFrame:
+        """
+        Retrieve the key financial ratios for the given ticker from stockanalysis.com.
+        A cached page younger than the cache TTL is parsed without fetching. Otherwise the page is fetched
+        over plain http first, the browser is only used when that fails or use_browser is set.
+        With cache_only the newest cached page is parsed whatever its age and nothing is fetched.
+        """
+        url = self._get_url(self.ticker)
+        if frequency == "quarterly":
+            url += "?p=quarterly"
+
+        if self.cache is not None:
+            html = self.cache.get(url, frequency, max_age=float("inf") if cache_only else None)
+            if html is not None:
+                self.source = "cache"
+                return self._parse_ratios(html, url)
+        if cache_only:
+            raise Exception(f"No cached page for {self.ticker}. URL: {url}")
+
+        with host_limit(url):
+            fetched = None if use_browser else self._http_ratios(url, frequency)
+            if fetched is None:
+                html = self._browser_html(url, frequency)
+        if fetched is not None:
+            self.source = "http"
+            html, data = fetched
+        else:
+            self.source = "browser"
+            data = self._parse_ratios(html, url)
+
+        if self.cache is not None:
+            self.cache.put(url, frequency, html)
+        return data
+
+    def _parse_ratios(self, soup_str: str, url: str) -> pd.DataFrame:
         # Validation checks
-        soup_str = str(soup)
         if not soup_str or len(soup_str) < 100:
             raise Exception(f"Failed to retrieve valid HTML content for {self.ticker}. URL: {url}. Content length: {len(soup_str) if soup_str else 0}")
 
@@ -3,11 +3,27 @@ import numpy as np
 import yfinance as yf
 import matplotlib.pyplot as plt
 import os
-from gender_guesser.detector import Detector
+from collections import Counter
+from functools import lru_cache, wraps
+from .snapshot import StockSnapshot
+from .fundamentals_cache import default_cache
+from .name_index import GENDER_SCORES, first_name, get_index
+from .price_store import price_store
 
 momentum_method = "mult" #add or mult or none
 BUY_THRESHOLD = 0.5
 
+# (median, spread, weight) of the tanh scores, medians chosen from data
+PE_PARAMS = (18.7, 18.7, 1.0)
+ROA_PARAMS = (4.325, 4.325, 1.1)
+EPS_PARAMS = (4, 4, 0.0)
+PB_PARAMS = (1.875, 2, 0.15)
+DE_PARAMS = (0.58, 0.58, 0.15)
+LEADERSHIP_PARAMS = (57.15, 20, 1.0)
+# (median, spread) of the momentum scores, weights depend on momentum_method
+D50_MOMENTUM_PARAMS = (0, 0.1)
+D200_MOMENTUM_PARAMS = (0, 0.2)
+
 def get_gettables(symbol="AAPL") -> pd.DataFrame:
     return pd.DataFrame(yf.Ticker(symbol).info.values(), yf.Ticker(symbol).info.keys()) # type: ignore
 
@@ -19,20 +35,60 @@ def mult_if_positive(x: float, y: float) -> float:
     else:
         return 0
 
-_detector = Detector()
 def g_detector(name: str) -> int:
-    n = name.split()[1] if len(name.split()) > 1 else ""
-    dict = {"female": 1, "mostly_female": 0.5, "unknown": 0, "mostly_male": -0.5, "male": -1}
-    return dict[_detector.get_gender(n)]
+    # raises KeyError for androgynous names, which leadership_score skips
+    return GENDER_SCORES[get_index().label(first_name(name))]
+
+@lru_cache(maxsize=None)
+def age_score(age: float, mean: float, spread: float) -> float:
+    return np.tanh((age-mean)/(spread/2))
 
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 data_path = os.path.join(current_dir, "..", "..", "data", "tickers", "owned_tickers.csv")
+
+@lru_cache(maxsize=None)
+def load_owned_tickers(path: str = data_path) -> frozenset:
+    # read once per process, call load_owned_tickers.cache_clear() after editing the csv
+    return frozenset(pd.read_csv(path)["Ticker"].to_list())
+
+# attributes the scores are computed from, reassigning any of them drops the cached scores
+SCORE_INPUTS = {"snapshot", "info", "insider", "PE", "ROA", "EPS", "PB", "d50_momentum", "d200_momentum"}
+
+def score_weights() -> tuple:
+    """Every module setting the scores depend on, cached scores are dropped when any of them changes."""
+    return (
+        momentum_method, BUY_THRESHOLD, PE_PARAMS, ROA_PARAMS, EPS_PARAMS, PB_PARAMS, DE_PARAMS, LEADERSHIP_PARAMS,
+        D50_MOMENTUM_PARAMS, D200_MOMENTUM_PARAMS,
+    )
+
+def score_component(func):
+    """
+    Property that is computed once per Stock and cached until the inputs or weights change.
+    """
+    name = func.__name__
+
+    @wraps(func)
+    def getter(self):
+        weights = score_weights()
+        if self._weights != weights:
+            self.invalidate()
+            self._weights = weights
+        if name not in self._scores:
+            self.evaluations[name] += 1
+            self._scores[name] = func(self)
+        return self._scores[name]
+    return property(getter)
+
 class Stock:
-    def __init__(self, symbol):
+    def __init__(self, symbol, snapshot: StockSnapshot | None = None):
+        self._scores = {}
+        self._weights = score_weights()
+        self.evaluations = Counter()
         self.symbol = symbol
-        self.info = yf.Ticker(symbol).info
-        self.insider = yf.Ticker(symbol).insider_purchases
+        self.snapshot = snapshot if snapshot is not None else StockSnapshot.fetch(symbol, cache=default_cache())
+        self.info = self.snapshot.info
+        self.insider = self.snapshot.insider
         self.PE = self.info["trailingPE"]
         self.ROA = self.info["returnOnAssets"]*100
         self.EPS = self.info["epsTrailingTwelveMonths"]
@@ -41,21 +97,33 @@ class Stock:
         self.exp_PE = 22
         if symbol in ["HVID.CO", "LOLB.CO"] and self.PE < 3:
             self.PE = 11.3
-        self.owned_tickers = pd.read_csv(data_path)["Ticker"].to_list()
+        self.owned_tickers = load_owned_tickers()
         self.change = (self.info["currentPrice"]/self.info["previousClose"]-1)*100
         self.d50_momentum = self.info["fiftyDayAverageChangePercent"]
         self.d200_momentum = self.info["twoHundredDayAverageChangePercent"]
 
+    def __setattr__(self, name, value):
+        if name in SCORE_INPUTS and "_scores" in self.__dict__:
+            self._scores.clear()
+        super().__setattr__(name, value)
+
+    def invalidate(self) -> None:
+        """Drop all cached scores, e.g. after mutating self.info in place."""
+        self._scores.clear()
+
+    def profile(self) -> dict:
+        """Number of times each score component has been evaluated."""
+        return dict(self.evaluations)
+
     @property
     def latest_earnings_date(self):
         try:
-            return yf.Ticker(self.symbol).calendar.get("Earnings Date")[0].strftime("%d-%m-%Y") # type: ignore
+            return self.snapshot.calendar.get("Earnings Date")[0].strftime("%d-%m-%Y") # type: ignore
         except:
             return np.nan
 
     def price_history(self, range="ytd"):
-        price = yf.download(self.symbol, period=range, rounding=False, progress=False, auto_adjust=True)[('Close', self.symbol)] # type: ignore
-        return price
+        return price_store().history(self.symbol, range)
     
     def price_graph(self, range="ytd"):
         price = self.price_history(range)
@@ -90,11 +158,9 @@ class Stock:
 
     # score calculation
     # value score 
-    @property
+    @score_component
     def PE_score(self) -> float:
-        median = 18.7 # chosen from data by median
-        spread = median
-        weight = 1.0
+        median, spread, weight = PE_PARAMS
 
         score = -np.tanh((self.PE-median)/(spread/2))*weight # 1 at mean-spread and -1 at mean+spread
         if self.PE >= 0:
@@ -102,42 +168,32 @@ class Stock:
         else:
             return -score
         
-    @property
+    @score_component
     def ROA_score(self) -> float:
-        median = 4.325 # chosen from data by median
-        spread = median
-        weight = 1.1
+        median, spread, weight = ROA_PARAMS
         return np.tanh((self.ROA-median)/(spread/2))*weight # -1 at mean-spread and 1 at mean+spread
 
-    @property
+    @score_component
     def EPS_score(self) -> float:
-        median = 4 # chosen from data by median
-        spread = median
-        weight = 0.0
+        median, spread, weight = EPS_PARAMS
         return np.tanh((self.EPS-median)/(spread/2))*weight # -1 at mean-spread and 1 at mean+spread
 
-    @property
+    @score_component
     def PB_score(self) -> float:
-        median = 1.875 # chosen from data by median
-        spread = 2
-        weight = 0.15
+        median, spread, weight = PB_PARAMS
         return -np.tanh((self.PB-median)/(spread/2))*weight # 1 at mean-spread and -1 at mean+spread
     
-    @property
+    @score_component
     def DE_score(self) -> float:
-        median = 0.58
-        spread = 0.58
-        weight = 0.15
+        median, spread, weight = DE_PARAMS
         if (np.isnan(self.DE)):
             return 0
         else:
             return -np.tanh((self.DE-median)/(spread/2))*weight # 1 at mean-spread and -1 at mean+spread
     
-    @property
+    @score_component
     def leadership_score(self) -> float:
-        mean = 57.15 # chosen from data by median
-        spread = 20
-        weight = 1.0
+        mean, spread, weight = LEADERSHIP_PARAMS
 
         score = 0
         people = self.info["companyOfficers"]
@@ -145,7 +201,7 @@ class Stock:
             person_score = 0
             try:
                 age = people[person]["age"]
-                person_score += np.tanh((age-mean)/(spread/2))
+                person_score += age_score(age, mean, spread)
             except:
                 Exception
             try:
@@ -167,12 +223,12 @@ class Stock:
         score = score/len(people)
         return np.tanh(score/(10/2)) * weight
 
-    @property
+    @score_component
     def insider_buy_score(self) -> float:
         return self.insider_buy*0.005
     
     # larger scores for final score calculation
-    @property
+    @score_component
     def value_score(self) -> float:
         return np.sum([self.PE_score, 
                        self.ROA_score,
@@ -182,10 +238,9 @@ class Stock:
                        self.leadership_score,
                        self.insider_buy_score])
     
-    @property
+    @score_component
     def d50_momentum_score(self) -> float:
-        median = 0 # chosen from data by median
-        spread = 0.1
+        median, spread = D50_MOMENTUM_PARAMS
         if momentum_method == "none":
             return 0
         elif momentum_method == "mult": # add or mult
@@ -198,10 +253,9 @@ class Stock:
             return 0
         
        
-    @property
+    @score_component
     def d200_momentum_score(self) -> float:
-        median = 0 # chosen from data by median
-        spread = 0.2
+        median, spread = D200_MOMENTUM_PARAMS
         if momentum_method == "none":
             return 0
         elif momentum_method == "mult": # add or mult
@@ -213,16 +267,16 @@ class Stock:
         except:
             return 0
         
-    @property
+    @score_component
     def momentum_score(self) -> float:
         return self.d50_momentum_score+self.d200_momentum_score
 
     # final score
-    @property
+    @score_component
     def final_score(self) -> float:
         return self.value_score+self.momentum_score
     
-    @property
+    @score_component
     def signal(self) -> str:
         _final_score = self.final_score
         if _final_score >= BUY_THRESHOLD:
@@ -263,4 +317,26 @@ class Stock:
             "Country": self.info["country"],
             "Owned": self.owned
             }])
-        return df
\ No newline at end of file
+        return df
+
+    def raw_inputs(self) -> dict:
+        """Unscored inputs of this stock, one row of the frame methods.scoring.score_frame takes."""
+        return {
+            "symbol": self.symbol,
+            "name": self.name,
+            "earnings": self.latest_earnings_date,
+            "change": self.change,
+            "PE": self.PE,
+            "ROA": self.ROA,
+            "EPS": self.EPS,
+            "PB": self.PB,
+            "DE": self.DE,
+            "insider_buy": self.insider_buy,
+            "d50_momentum": self.d50_momentum,
+            "d200_momentum": self.d200_momentum,
+            "officers": self.info["companyOfficers"],
+            "sector": self.info["sector"],
+            "industry": self.info["industry"],
+            "country": self.info["country"],
+            "owned": self.owned
+            }
@@ -0,0 +1,96 @@
+import re
+import shlex
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# columns plain search terms look in
+TEXT_COLUMNS = ["Ticker", "Name", "Sector", "Industry", "Country", "Signal"]
+# short names for column:term and numeric filters, any column also works by its name without spaces or symbols
+ALIASES = {
+    "score": "Final Score",
+    "value": "Value Score",
+    "momentum": "Momentum Score",
+    "change": "1d Change",
+    "pe": "P/E",
+    "roa": "ROA%",
+    "pb": "P/B",
+    "de": "D/E",
+    "insider": "Insider Buy%",
+}
+COMPARISON = re.compile(r"^(.+?)(>=|<=|!=|>|<|=)(-?(?:\d+\.?\d*|\.\d+))$")
+OPERATORS = {
+    ">=": np.greater_equal, "<=": np.less_equal, "!=": np.not_equal,
+    ">": np.greater, "<": np.less, "=": np.equal,
+}
+
+def normalize(text: str) -> str:
+    """Lowercase without accents, so "nestle" finds "Nestlé"."""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+def _key(name: str) -> str:
+    return re.sub(r"[^0-9a-z]", "", normalize(name))
+
+class SearchIndex:
+    """
+    Search over a results frame, built once per results set.
+    Keeps a normalized text column per searchable column, one joined text per row and the numeric columns as floats,
+    so a query is a few vectorized masks instead of stringifying the frame.
+    Queries are whitespace separated terms that must all match:
+        novo              plain text in Ticker, Name, Sector, Industry, Country or Signal
+        sector:tech       text in one column, "quotes" keep spaces together
+        score>0.5         numeric filter with >, >=, <, <=, = or !=
+    """
+    def __init__(self, df: pd.DataFrame):
+        self.index = df.index
+        self.columns = {_key(column): column for column in df.columns}
+        self.columns.update({alias: column for alias, column in ALIASES.items() if column in df.columns})
+        self.text = {
+            column: pd.Series([normalize(value) if pd.notna(value) else "" for value in df[column]], index=df.index)
+            for column in df.columns if not pd.api.types.is_numeric_dtype(df[column]) or pd.api.types.is_bool_dtype(df[column])
+        }
+        self.numbers = {
+            column: pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+            for column in df.columns if pd.api.types.is_numeric_dtype(df[column])
+        }
+        text_columns = [self.text[column] for column in TEXT_COLUMNS if column in self.text]
+        self.joined = pd.Series(
+            ["\t".join(values) for values in zip(*text_columns)] if text_columns else [""]*len(df), index=df.index,
+        )
+
+    def column(self, name: str) -> str:
+        column = self.columns.get(_key(name))
+        if column is None:
+            raise ValueError(f"Unknown column '{name}'")
+        return column
+
+    def _term_mask(self, term: str) -> np.ndarray:
+        comparison = COMPARISON.match(term)
+        if comparison is not None:
+            name, operator, number = comparison.groups()
+            column = self.column(name)
+            if column not in self.numbers:
+                raise ValueError(f"'{column}' is not numeric")
+            with np.errstate(invalid="ignore"):
+                return OPERATORS[operator](self.numbers[column], float(number)) & ~np.isnan(self.numbers[column])
+        if ":" in term:
+            name, text = term.split(":", 1)
+            column = self.column(name)
+            values = self.text.get(column)
+            if values is None:
+                values = pd.Series([f"{value:g}" for value in self.numbers[column]], index=self.index)
+            return values.str.contains(normalize(text), regex=False).to_numpy()
+        return self.joined.str.contains(normalize(term), regex=False).to_numpy()
+
+    def mask(self, query: str) -> np.ndarray:
+        """Rows matching every term of query, raises ValueError for unknown or non numeric columns."""
+        try:
+            terms = shlex.split(query)
+        except ValueError:
+            terms = query.split()
+        mask = np.ones(len(self.index), dtype=bool)
+        for term in terms:
+            mask &= self._term_mask(term)
+        return mask
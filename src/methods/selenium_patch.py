@@ -3,21 +3,231 @@ import stockdex.macrotrends_interface
 import stockdex.justetf_interface
 import stockdex.digrin_interface 
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
+import atexit
 import os
+import queue
+import re
 import sys
+import threading
 import pandas as pd
 from bs4 import BeautifulSoup
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import urlparse
 import warnings
 
-import time
-
 from selenium.webdriver.common.by import By 
 
+POOL_SIZE = 2
+# a driver is restarted after this many pages to keep chrome's memory in check
+MAX_PAGES_PER_DRIVER = 50
+PAGE_TIMEOUT = 20
+CLICK_TIMEOUT = 5
+
+CONSENT_TEXTS = ["Consent", "Agreed", "Accept", "Allow all", "I agree"]
+# client rendered ratio pages draw their table after readyState is complete
+TABLE = (By.TAG_NAME, "table")
+# column headers of a quarterly ratio table, e.g. "Q3 2024"
+QUARTER_HEADER = re.compile(r"\bQ[1-4]\b")
+
+@lru_cache(maxsize=None)
+def resolve_driver_path() -> str | None:
+    """Chromedriver executable, resolved once per process. None lets Selenium find it on PATH."""
+    # 1. Check system locations for chromedriver (best for aarch64 Linux)
+    if sys.platform != "win32":
+        system_driver_paths = [
+            "/usr/bin/chromedriver",
+            "/usr/local/bin/chromedriver",
+            "/usr/lib/chromium-browser/chromedriver",
+            "/usr/lib64/chromium-browser/chromedriver",
+            "/usr/bin/chromium-driver"
+        ]
+        for path in system_driver_paths:
+            if os.path.exists(path):
+                return path
+
+    # 2. Try webdriver-manager on non-Windows (fallback for Linux)
+    if sys.platform != "win32":
+        try:
+            return ChromeDriverManager().install()
+        except Exception as e:
+            print(f"WebDriverManager failed: {e}")
+
+    # 3. If nothing works, let Selenium try to find it (for Linux/PATH)
+    return None
+
+def wait_until_ready(driver: webdriver.Chrome, timeout: float = PAGE_TIMEOUT) -> None:
+    WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
+
+def wait_for_element(driver: webdriver.Chrome, locator: tuple, timeout: float = PAGE_TIMEOUT) -> bool:
+    """Wait until an element matching locator is in the page, False when none showed up within timeout."""
+    try:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located(locator))
+        return True
+    except TimeoutException:
+        return False
+
+def _click(driver: webdriver.Chrome, element) -> None:
+    try:
+        element.click()
+    except Exception:
+        driver.execute_script("arguments[0].click();", element)
+
+def dismiss_consent(driver: webdriver.Chrome) -> bool:
+    """Click away a cookie consent banner if one is shown, returns whether anything was clicked."""
+    # Common text: "Consent", "Agreed", "Accept", "Allow all"
+    for text in CONSENT_TEXTS:
+        try:
+            buttons = [btn for btn in driver.find_elements(By.XPATH, f"//button[contains(text(), '{text}')]") if btn.is_displayed()]
+        except WebDriverException:
+            continue
+        if buttons:
+            _click(driver, buttons[0])
+            _wait_gone(driver, buttons[0])
+            return True
+
+    # Also try class for Google Funding Choices
+    fc_buttons = driver.find_elements(By.CLASS_NAME, "fc-cta-consent")
+    for btn in fc_buttons:
+        driver.execute_script("arguments[0].click();", btn)
+    if fc_buttons:
+        _wait_gone(driver, fc_buttons[0])
+    return bool(fc_buttons)
+
+def _first_table_html(driver: webdriver.Chrome) -> str | None:
+    tables = driver.find_elements(By.TAG_NAME, "table")
+    return tables[0].get_attribute("outerHTML") if tables else None
+
+def _has_quarterly_columns(table_html: str | None) -> bool:
+    # only the header row names the periods
+    return table_html is not None and QUARTER_HEADER.search(table_html.split("</thead>")[0]) is not None
+
+def _wait_gone(driver: webdriver.Chrome, element, timeout: float = CLICK_TIMEOUT) -> None:
+    try:
+        WebDriverWait(driver, timeout).until(EC.invisibility_of_element(element))
+    except TimeoutException:
+        pass
+
+class PooledDriver:
+    """A Chrome session with the number of pages it has served and the hosts whose consent banner is handled."""
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.pages = 0
+        self.consented_hosts = set()
+
+    def get(self, url: str, handle_consent: bool = False, wait_for: tuple | None = None) -> None:
+        """Load url, with wait_for also until an element matching that locator is rendered."""
+        self.driver.get(url)
+        wait_until_ready(self.driver)
+        if wait_for is not None:
+            # a page without it, e.g. a missing ticker, is returned as it is and the parser reports it
+            wait_for_element(self.driver, wait_for)
+        self.pages += 1
+        host = urlparse(url).netloc
+        if handle_consent and host not in self.consented_hosts:
+            # the consent cookie lives for the whole session, so each host is only handled once
+            dismiss_consent(self.driver)
+            self.consented_hosts.add(host)
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+class DriverPool:
+    """
+    Long-lived headless Chrome sessions, checked out per page and returned afterwards.
+    At most size sessions exist at once. A session is restarted after max_pages pages
+    or as soon as it raises a WebDriverException.
+    """
+    def __init__(self, chrome_options: Options, size: int = POOL_SIZE, max_pages: int = MAX_PAGES_PER_DRIVER):
+        self.chrome_options = chrome_options
+        self.max_pages = max_pages
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._drivers = set()
+        self.started = 0
+
+    def _new_driver(self) -> PooledDriver:
+        path = resolve_driver_path()
+        service = Service(executable_path=path) if path else Service()
+        try:
+            driver = webdriver.Chrome(service=service, options=self.chrome_options)
+        except Exception as e:
+            if "executable needs to be in PATH" in str(e) or "Service" in str(e) or "Unsupported platform" in str(e):
+                 raise Exception("Could not find a valid chromedriver. Please run 'sudo dnf install chromedriver' (Fedora) or 'sudo apt install chromium-driver' (Debian/Ubuntu) to install it for aarch64.") from e
+            if "SessionNotCreatedException" in str(e) or "session not created" in str(e).lower():
+                 print(f"Session creation failed. Service path: {service.path if service.path else 'default'}")
+            raise e
+        pooled = PooledDriver(driver)
+        with self._lock:
+            self._drivers.add(pooled)
+            self.started += 1
+        return pooled
+
+    def _discard(self, pooled: PooledDriver) -> None:
+        with self._lock:
+            self._drivers.discard(pooled)
+        pooled.quit()
+
+    @contextmanager
+    def checkout(self):
+        """Borrow a session for the duration of the with block."""
+        self._slots.acquire()
+        pooled = None
+        try:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                pooled = self._new_driver()
+            yield pooled
+        except WebDriverException:
+            # crashed or hung session, the next checkout starts a fresh one
+            if pooled is not None:
+                self._discard(pooled)
+                pooled = None
+            raise
+        finally:
+            if pooled is not None:
+                if pooled.pages >= self.max_pages:
+                    self._discard(pooled)
+                else:
+                    self._idle.put(pooled)
+            self._slots.release()
+
+    def close(self) -> None:
+        """Quit every session, idle or not."""
+        with self._lock:
+            drivers, self._drivers = self._drivers, set()
+        for pooled in drivers:
+            pooled.quit()
+        self._idle = queue.LifoQueue()
+
+_pools = {}
+_pools_lock = threading.Lock()
+def get_pool(chrome_options: Options, key) -> DriverPool:
+    """Process wide pool per options variant, closed at exit."""
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = DriverPool(chrome_options)
+            atexit.register(_pools[key].close)
+        return _pools[key]
+
 class PatchedSeleniumInterface(stockdex.selenium_interface.selenium_interface):
+    """
+    stockdex selenium interface backed by a shared DriverPool, so pages reuse running browsers
+    instead of starting Chrome per url.
+    """
     def __init__(self, use_custom_user_agent: bool = False):
+        self.use_custom_user_agent = use_custom_user_agent
         self.chrome_options = Options()
         self.chrome_options.add_argument("--headless")
         self.chrome_options.add_argument("--no-sandbox")
@@ -35,88 +245,25 @@ class PatchedSeleniumInterface(stockdex.selenium_interface.selenium_interface):
             from stockdex.lib import get_user_agent
             self.chrome_options.add_argument(f"user-agent={get_user_agent}")
 
+    @property
+    def pool(self) -> DriverPool:
+        return get_pool(self.chrome_options, self.use_custom_user_agent)
+
     def _get_service(self):
-        # 1. Check system locations for chromedriver (best for aarch64 Linux)
-        if sys.platform != "win32":
-            system_driver_paths = [
-                "/usr/bin/chromedriver",
-                "/usr/local/bin/chromedriver",
-                "/usr/lib/chromium-browser/chromedriver",
-                "/usr/lib64/chromium-browser/chromedriver",
-                "/usr/bin/chromium-driver"
-            ]
-            for path in system_driver_paths:
-                if os.path.exists(path):
-                    return Service(executable_path=path)
-        
-        # 2. Try webdriver-manager on non-Windows (fallback for Linux)
-        if sys.platform != "win32":
-            try:
-                return Service(ChromeDriverManager().install())
-            except Exception as e:
-                print(f"WebDriverManager failed: {e}")
-        
-        # 3. If nothing works, let Selenium try to find it (for Linux/PATH)
-        return Service()
+        path = resolve_driver_path()
+        return Service(executable_path=path) if path else Service()
 
     def get_html_content(self, url: str) -> str:
-        service = self._get_service()
-        try:
-            driver = webdriver.Chrome(service=service, options=self.chrome_options)
-        except Exception as e:
-            if "executable needs to be in PATH" in str(e) or "Service" in str(e) or "Unsupported platform" in str(e):
-                 raise Exception("Could not find a valid chromedriver. Please run 'sudo dnf install chromedriver' (Fedora) or 'sudo apt install chromium-driver' (Debian/Ubuntu) to install it for aarch64.") from e
-            if "SessionNotCreatedException" in str(e) or "session not created" in str(e).lower():
-                 print(f"Session creation failed. Service path: {service.path if service.path else 'default'}")
-            raise e
+        with self.pool.checkout() as pooled:
+            pooled.get(url, wait_for=TABLE)
+            page_source = pooled.driver.page_source
 
-        try:
-            driver.get(url)
-            time.sleep(2) # Allow page to render
-            page_source = driver.page_source
-        finally:
-            driver.quit()
-        
         return BeautifulSoup(page_source, "html.parser") # type: ignore
 
     def get_html_content_with_quarterly_toggle(self, url: str) -> BeautifulSoup:
-        service = self._get_service()
-        try:
-            driver = webdriver.Chrome(service=service, options=self.chrome_options)
-        except Exception as e:
-            raise Exception(f"Failed to create Chrome driver: {e}")
-
-        try:
-            driver.get(url)
-            time.sleep(2) # Initial load
-
-            # Try to handle consent banner first
-            # Common text: "Consent", "Agreed", "Accept", "Allow all"
-            consent_texts = ["Consent", "Agreed", "Accept", "Allow all", "I agree"]
-            for text in consent_texts:
-                try:
-                    buttons = driver.find_elements(By.XPATH, f"//button[contains(text(), '{text}')]")
-                    for btn in buttons:
-                        if btn.is_displayed():
-                            try:
-                                btn.click()
-                            except:
-                                driver.execute_script("arguments[0].click();", btn)
-                            time.sleep(1)
-                            break
-                except:
-                    pass
-            
-            # Also try class for Google Funding Choices
-            try:
-                fc_buttons = driver.find_elements(By.CLASS_NAME, "fc-cta-consent")
-                if fc_buttons:
-                    for btn in fc_buttons:
-                        driver.execute_script("arguments[0].click();", btn)
-                    time.sleep(1)
-            except:
-                pass
-
+        with self.pool.checkout() as pooled:
+            pooled.get(url, handle_consent=True, wait_for=TABLE)
+            driver = pooled.driver
 
             # Try to click "Quarterly" button
             # 1. Look for <button>Quarterly</button>
@@ -131,30 +278,31 @@ class PatchedSeleniumInterface(stockdex.selenium_interface.selenium_interface):
                 if divs:
                     target_btn = divs[0]
 
-            if target_btn:
+            before = _first_table_html(driver)
+            # ?p=quarterly usually renders the quarters already, then there is nothing to click or wait for
+            if target_btn and not _has_quarterly_columns(before):
+                _click(driver, target_btn)
+                # wait for the table to be re-rendered with quarterly columns
                 try:
-                    target_btn.click()
-                except:
-                    driver.execute_script("arguments[0].click();", target_btn)
-                time.sleep(2)
+                    WebDriverWait(driver, CLICK_TIMEOUT).until(lambda d: _has_quarterly_columns(_first_table_html(d)))
+                except TimeoutException:
+                    pass
 
             page_source = driver.page_source
-        finally:
-            driver.quit()
         
         return BeautifulSoup(page_source, "html.parser")
 
     def just_etf_get_html_after_click(self, url: str, button_xpath: str):
-        service = self._get_service()
-        driver = webdriver.Chrome(service=service, options=self.chrome_options)
-        try:
-            driver.get(url)
+        with self.pool.checkout() as pooled:
+            pooled.get(url)
+            driver = pooled.driver
             x_path = '//*[@id="CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll"]'
-            self.click_on_element(x_path, driver)
+            host = urlparse(url).netloc
+            if host not in pooled.consented_hosts:
+                self.click_on_element(x_path, driver)
+                pooled.consented_hosts.add(host)
             self.click_on_element(button_xpath, driver)
             return BeautifulSoup(driver.page_source, "html.parser")
-        finally:
-            driver.quit()
 
 # Patch logic for finding table data (fixes UnboundLocalError and SyntaxWarning)
 def patched_find_table_in_url(self, text_to_look_for: str, soup: BeautifulSoup) -> pd.DataFrame:
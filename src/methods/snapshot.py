@@ -0,0 +1,44 @@
+import pandas as pd
+import yfinance as yf
+from .fundamentals_cache import INFO_GROUPS, join_info
+
+class StockSnapshot:
+    """
+    Raw yfinance payloads for one symbol, fetched through a single shared Ticker.
+    """
+    def __init__(self, symbol: str, info: dict, insider: pd.DataFrame, calendar=None, ticker=None):
+        self.symbol = symbol
+        self.info = info
+        self.insider = insider
+        self.calendar = calendar
+        self.ticker = ticker
+
+    @classmethod
+    def fetch(cls, symbol: str, session=None, cache=None) -> "StockSnapshot":
+        """
+        Fetch info, insider purchases and calendar for symbol in one pass.
+        With a FundamentalsCache only the payloads that are missing or past their TTL go to the network.
+        """
+        cached = cache.get(symbol) if cache is not None else {}
+        fetched = {}
+        ticker = yf.Ticker(symbol, session=session)
+
+        if all(group in cached for group in INFO_GROUPS):
+            info = join_info(cached)
+        else:
+            info = fetched["info"] = ticker.info
+        if "insider" in cached:
+            insider = cached["insider"]
+        else:
+            insider = fetched["insider"] = ticker.insider_purchases
+        if "calendar" in cached:
+            calendar = cached["calendar"]
+        else:
+            try:
+                calendar = fetched["calendar"] = ticker.calendar
+            except Exception:
+                calendar = None
+
+        if cache is not None and fetched:
+            cache.put(symbol, fetched)
+        return cls(symbol, info, insider, calendar, ticker)
@@ -0,0 +1,216 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+
+from .model_cache import ModelCache, default_model_cache, fingerprint
+
+RF_PARAMS = {
+    "n_estimators": 1000,
+    "max_depth": None,
+    "min_samples_split": 5,
+    "min_samples_leaf": 2,
+    "bootstrap": False,
+    "criterion": "squared_error",
+}
+TARGET_COL = "Future Change%"
+DROP_COLS = ["Ticker", "Close Price", TARGET_COL]
+RESULT_COLUMNS = [
+    "Ticker", "Prediction Row Index", "Validation Actual", "Validation Predicted", "Predicted Future Change%",
+    "Train Rows", "Features", "Cached", "Seconds",
+]
+
+def prepare_features(df: pd.DataFrame, target_col: str = TARGET_COL, drop_cols: list[str] = DROP_COLS):
+    """Feature frame and target of one ticker, row 0 is the period to predict and row 1 the validation period."""
+    if df is None or len(df) < 3 or target_col not in df.columns:
+        return None
+
+    work = df.copy()
+    y = pd.to_numeric(work[target_col], errors="coerce")
+    X = work.drop(columns=drop_cols, errors="ignore").copy()
+
+    if X.empty:
+        return None
+
+    for col in X.columns:
+        if not pd.api.types.is_numeric_dtype(X[col]):
+            X[col] = pd.factorize(X[col].astype(str))[0]
+        X[col] = pd.to_numeric(X[col], errors="coerce")
+
+    if "Close Price" in work.columns:
+        close_price = pd.to_numeric(work["Close Price"], errors="coerce")
+        X["row_order"] = np.arange(len(X), dtype=float)
+        X["close_price_chg1"] = close_price.pct_change().fillna(0.0)
+        X["close_price_ma3"] = close_price.rolling(3).mean().bfill().fillna(close_price)
+
+    X = X.replace([np.inf, -np.inf], np.nan).fillna(0.0)
+    y = y.replace([np.inf, -np.inf], np.nan).fillna(0.0)
+
+    if len(X) < 3 or y.nunique() < 2:
+        return None
+
+    return work, X, y
+
+class PackedFeatures:
+    """
+    Feature matrices and targets of many tickers in two flat float64 buffers, tasks only carry offsets into them.
+    The buffers live in shared memory so worker processes read them without pickling.
+    """
+    def __init__(self, frames: list[pd.DataFrame]):
+        self.tickers, self.row_labels, self.validation_actual, self.blocks = [], [], [], []
+        matrices, targets = [], []
+        x_offset = y_offset = 0
+        for df in frames:
+            prepared = prepare_features(df)
+            if prepared is None:
+                continue
+            work, X, y = prepared
+            # the model needs at least two training rows with different targets
+            if len(X) - 2 < 2 or y.iloc[2:].nunique() < 2:
+                continue
+            matrix = X.to_numpy(dtype=np.float64)
+            self.tickers.append(work.iloc[0]["Ticker"] if "Ticker" in work.columns else "UNKNOWN")
+            self.row_labels.append(work.index[0])
+            self.validation_actual.append(float(y.iloc[1]))
+            self.blocks.append((x_offset, matrix.shape[0], matrix.shape[1], y_offset))
+            matrices.append(matrix.ravel())
+            targets.append(y.to_numpy(dtype=np.float64))
+            x_offset += matrix.size
+            y_offset += len(y)
+
+        self.x_size, self.y_size = x_offset, y_offset
+        self.x = self._share(np.concatenate(matrices) if matrices else np.zeros(1))
+        self.y = self._share(np.concatenate(targets) if targets else np.zeros(1))
+
+    @staticmethod
+    def _share(values: np.ndarray) -> shared_memory.SharedMemory:
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 8))
+        np.ndarray(values.shape, dtype=np.float64, buffer=shm.buf)[:] = values
+        return shm
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def fingerprint(self, i: int, params: dict) -> str:
+        """Fingerprint of the training rows of ticker i, rows 0 and 1 are only predicted and left out."""
+        X, y = block_arrays(self.blocks[i], self.x, self.y)
+        return fingerprint(X[2:], y[2:], params)
+
+    def data_fingerprint(self) -> str:
+        """Fingerprint of every value and the ticker order, it changes whenever the frames do."""
+        x = np.ndarray((self.x_size,), dtype=np.float64, buffer=self.x.buf)
+        y = np.ndarray((self.y_size,), dtype=np.float64, buffer=self.y.buf)
+        return fingerprint(x, y, {"tickers": self.tickers, "blocks": self.blocks})
+
+    def close(self) -> None:
+        for shm in (self.x, self.y):
+            shm.close()
+            shm.unlink()
+
+def block_arrays(block: tuple, x: shared_memory.SharedMemory, y: shared_memory.SharedMemory) -> tuple[np.ndarray, np.ndarray]:
+    """Feature matrix and targets of one PackedFeatures block as views on the shared buffers."""
+    x_offset, n_rows, n_cols, y_offset = block
+    return (
+        np.ndarray((n_rows, n_cols), dtype=np.float64, buffer=x.buf, offset=x_offset*8),
+        np.ndarray((n_rows,), dtype=np.float64, buffer=y.buf, offset=y_offset*8),
+    )
+
+# per worker process: attached shared buffers and the forest settings, set by init_worker
+worker = {}
+
+def init_worker(x_name: str, y_name: str, rf_params: dict, n_jobs: int, cache: ModelCache | None) -> None:
+    """ProcessPoolExecutor initializer attaching the PackedFeatures buffers, used by train_many and methods.tuning."""
+    worker["x"] = shared_memory.SharedMemory(name=x_name)
+    worker["y"] = shared_memory.SharedMemory(name=y_name)
+    worker["rf_params"] = {**rf_params, "n_jobs": n_jobs}
+    worker["cache"] = cache
+
+def _fit_one(i: int, block: tuple, key: str | None) -> tuple:
+    start = time.perf_counter()
+    X, y = block_arrays(block, worker["x"], worker["y"])
+    cache = worker["cache"]
+    model = cache.get(key) if cache is not None else None
+    cached = model is not None
+    if not cached:
+        model = RandomForestRegressor(**worker["rf_params"])
+        model.fit(X[2:], y[2:])
+        if cache is not None:
+            cache.put(key, model)
+    predicted = model.predict(X[:2])
+    return i, float(predicted[1]), float(predicted[0]), cached, time.perf_counter() - start
+
+def plan_workers(n_tasks: int, processes: int | None = None, cpus: int | None = None) -> tuple[int, int]:
+    """
+    Processes and forest n_jobs so that processes*n_jobs stays within the cores.
+    Many tickers get one core each, a handful of tickers share the cores through n_jobs.
+    """
+    cpus = cpus or os.cpu_count() or 1
+    processes = max(1, min(processes or cpus, n_tasks, cpus))
+    return processes, max(1, cpus // processes)
+
+def train_many(
+    frames: list[pd.DataFrame],
+    rf_params: dict = RF_PARAMS,
+    processes: int | None = None,
+    on_done: Callable | None = None,
+    cache: ModelCache | None = None,
+) -> pd.DataFrame:
+    """
+    Fit one random forest per ticker across a process pool. Train on rows 2 and up, validate on row 1, predict row 0.
+    The biggest fits are submitted first so the last ones to finish are short.
+    Models are kept in the ModelCache (the default one unless given) under a fingerprint of their training rows
+    and parameters, so a ticker is only refitted when its training data or the parameters changed.
+    on_done(ticker, n_done, n_total) is called in this process after every ticker.
+    Returns one row per trained ticker with its validation and prediction, see RESULT_COLUMNS.
+    """
+    cache = cache if cache is not None else default_model_cache()
+    packed = PackedFeatures(frames)
+    try:
+        if not len(packed):
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        processes, n_jobs = plan_workers(len(packed), processes)
+        rf_params = {key: value for key, value in rf_params.items() if key != "n_jobs"}
+        n_estimators = rf_params.get("n_estimators", 100)
+        keys = [packed.fingerprint(i, rf_params) for i in range(len(packed))] if cache is not None else [None]*len(packed)
+        # cached models only need a load and a predict, they go last
+        order = sorted(
+            range(len(packed)),
+            key=lambda i: (keys[i] is not None and keys[i] in cache, -packed.blocks[i][1]*packed.blocks[i][2]*n_estimators),
+        )
+
+        validation, prediction, seconds = np.full(len(packed), np.nan), np.full(len(packed), np.nan), np.zeros(len(packed))
+        cached = np.zeros(len(packed), dtype=bool)
+        initargs = (packed.x.name, packed.y.name, rf_params, n_jobs, cache)
+        with ProcessPoolExecutor(processes, initializer=init_worker, initargs=initargs) as pool:
+            futures = [pool.submit(_fit_one, i, packed.blocks[i], keys[i]) for i in order]
+            for n_done, future in enumerate(as_completed(futures), start=1):
+                i, validation[i], prediction[i], cached[i], seconds[i] = future.result()
+                if on_done is not None:
+                    on_done(packed.tickers[i], n_done, len(packed))
+        if cache is not None:
+            cache.evict()
+
+        return pd.DataFrame({
+            "Ticker": packed.tickers,
+            "Prediction Row Index": packed.row_labels,
+            "Validation Actual": packed.validation_actual,
+            "Validation Predicted": validation,
+            "Predicted Future Change%": prediction,
+            "Train Rows": [block[1] - 2 for block in packed.blocks],
+            "Features": [block[2] for block in packed.blocks],
+            "Cached": cached,
+            "Seconds": seconds,
+        }, columns=RESULT_COLUMNS)
+    finally:
+        packed.close()
+
+def validation_r2(results: pd.DataFrame) -> float:
+    if len(results) < 2:
+        return float("nan")
+    return r2_score(results["Validation Actual"], results["Validation Predicted"])
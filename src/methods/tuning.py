@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import ParameterSampler
+from sklearn.neural_network import MLPRegressor
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import MinMaxScaler
+
+from .training import PackedFeatures, block_arrays, init_worker, plan_workers, worker
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+TRIALS_PATH = os.path.join(current_dir, "..", "..", "data", "model_results", "search_trials.csv")
+TRIAL_COLUMNS = ["Trial", "Rung", "Tickers", "Seed", "Data", "R²", "MSE", "MAE", "CPU Seconds", "Model", "Params"]
+# each rung keeps the best 1/ETA of the configurations and grows the ticker subset ETA times
+ETA = 3
+MIN_TICKERS = 20
+
+def _build_model(config: dict):
+    params = {key: value for key, value in config.items() if key != "model"}
+    if config.get("model", "rf") == "mlp":
+        return make_pipeline(MinMaxScaler(), MLPRegressor(**params))
+    return RandomForestRegressor(**params)
+
+def trial_id(config: dict) -> str:
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+def sample_configs(space: dict, n: int, seed: int = 0, model: str = "rf") -> list[dict]:
+    """n random configurations from lists or scipy distributions, like RandomizedSearchCV samples them."""
+    return [{"model": model, **params} for params in ParameterSampler(space, n, random_state=seed)]
+
+def _fit_config(i: int, block: tuple, config: dict) -> tuple:
+    start = time.process_time()
+    X, y = block_arrays(block, worker["x"], worker["y"])
+    model = _build_model({**config, **({"n_jobs": worker["rf_params"]["n_jobs"]} if config.get("model", "rf") == "rf" else {})})
+    model.fit(X[2:], y[2:])
+    return i, float(model.predict(X[1:2])[0]), time.process_time() - start
+
+def load_trials(path: str = TRIALS_PATH) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=TRIAL_COLUMNS)
+    # hex ids, read as text so one that happens to look like a number stays a string
+    trials = pd.read_csv(path, dtype={"Trial": str, "Data": str}, float_precision="round_trip")
+    if list(trials.columns) != TRIAL_COLUMNS:
+        # written before a column was added, rewritten so appended rows line up with the header
+        trials = trials.reindex(columns=TRIAL_COLUMNS)
+        trials.to_csv(path, index=False)
+    return trials
+
+def _append_trial(path: str, row: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pd.DataFrame([row], columns=TRIAL_COLUMNS).to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+def successive_halving(
+    frames: list[pd.DataFrame],
+    configs: list[dict],
+    min_tickers: int = MIN_TICKERS,
+    eta: int = ETA,
+    processes: int | None = None,
+    seed: int = 0,
+    path: str | None = TRIALS_PATH,
+    on_rung: Callable | None = None,
+) -> pd.DataFrame:
+    """
+    Successive halving over per ticker models: every configuration is scored by the validation R² across a random
+    subset of tickers (train on rows 2 and up, predict row 1 like training.train_many), the best 1/eta survive and
+    are scored again on eta times as many tickers until one is left or all tickers are used.
+    Features are prepared once and shared with the worker processes, the subsets are nested so a survivor only fits
+    the tickers it has not seen. Every scored trial is appended to the csv at path, trials already stored there for
+    the same rung size, seed and data (a fingerprint of the prepared features and the ticker order) are read back
+    instead of refitted.
+    configs are dicts of model ("rf" or "mlp") and its parameters, see sample_configs.
+    on_rung(rung, n_tickers, trials) is called after every rung.
+    Returns the trials of this search, last rung first and best first within a rung.
+    """
+    packed = PackedFeatures(frames)
+    try:
+        if not len(packed) or not configs:
+            return pd.DataFrame(columns=TRIAL_COLUMNS)
+        order = np.random.default_rng(seed).permutation(len(packed))
+        actual = np.asarray(packed.validation_actual)
+        data = packed.data_fingerprint()[:16]
+        stored = load_trials(path) if path is not None else pd.DataFrame(columns=TRIAL_COLUMNS)
+        stored = stored[(stored["Seed"] == seed) & (stored["Data"] == data)].drop_duplicates(["Trial", "Tickers"], keep="last").set_index(["Trial", "Tickers"])
+
+        # validation predictions per (trial, ticker), reused as the subsets grow
+        predicted, cpu_seconds = {}, {}
+        survivors = {trial_id(config): config for config in configs}
+        processes, n_jobs = plan_workers(len(survivors)*min(min_tickers, len(packed)), processes)
+        initargs = (packed.x.name, packed.y.name, {}, n_jobs, None)
+        rungs, rung = [], 0
+        with ProcessPoolExecutor(processes, initializer=init_worker, initargs=initargs) as pool:
+            while True:
+                n_tickers = min(len(packed), min_tickers*eta**rung)
+                subset = order[:n_tickers]
+                tasks = [
+                    (trial, i) for trial in survivors if (trial, n_tickers) not in stored.index
+                    for i in subset if (trial, i) not in predicted
+                ]
+                futures = {pool.submit(_fit_config, i, packed.blocks[i], survivors[trial]): trial for trial, i in tasks}
+                for future in as_completed(futures):
+                    i, value, seconds = future.result()
+                    predicted[futures[future], i] = value
+                    cpu_seconds[futures[future]] = cpu_seconds.get(futures[future], 0.0) + seconds
+
+                rung_trials = []
+                for trial, config in survivors.items():
+                    if (trial, n_tickers) in stored.index:
+                        row = {"Trial": trial, "Tickers": n_tickers, **stored.loc[(trial, n_tickers)].to_dict()}
+                    else:
+                        values = np.array([predicted[trial, i] for i in subset])
+                        row = {
+                            "Trial": trial, "Rung": rung, "Tickers": n_tickers, "Seed": seed, "Data": data,
+                            "R²": r2_score(actual[subset], values) if n_tickers > 1 else np.nan,
+                            "MSE": mean_squared_error(actual[subset], values),
+                            "MAE": mean_absolute_error(actual[subset], values),
+                            "CPU Seconds": round(cpu_seconds.get(trial, 0.0), 2),
+                            "Model": config.get("model", "rf"),
+                            "Params": json.dumps({key: value for key, value in config.items() if key != "model"}, sort_keys=True, default=str),
+                        }
+                        if path is not None:
+                            _append_trial(path, row)
+                    rung_trials.append(row)
+                rung_trials.sort(key=lambda row: -np.nan_to_num(row["R²"], nan=-np.inf))
+                rungs.append(rung_trials)
+                if on_rung is not None:
+                    on_rung(rung, n_tickers, pd.DataFrame(rung_trials, columns=TRIAL_COLUMNS))
+                if len(survivors) == 1 or n_tickers == len(packed):
+                    break
+                survivors = {row["Trial"]: survivors[row["Trial"]] for row in rung_trials[:max(1, len(rung_trials) // eta)]}
+                rung += 1
+        return pd.DataFrame([row for rung_trials in reversed(rungs) for row in rung_trials], columns=TRIAL_COLUMNS)
+    finally:
+        packed.close()